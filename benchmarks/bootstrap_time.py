@@ -0,0 +1,76 @@
+"""Güven aralığı hesaplama süresi ölçümü
+
+Bitiş ekranlarında ve uyum analizinde kullanılan güven aralığı fonksiyonları
+yapay verilerle, yapılandırılmış bootstrap örneklem sayısı (varsayılan 10.000)
+ile çalıştırılır. Ölçülenler:
+  - vtt_ms: doğruluk/duyarlılık/özgüllük için kesin binom + bootstrap aralıkları
+  - apa_ms: beş APA özelliğinin ortalama puan aralıkları
+  - agreement_ms: çok değerlendiricili Fleiss' kappa ve Krippendorff's alpha aralıkları
+
+Kullanım:
+    python benchmarks/bootstrap_time.py --answers 500 --output bootstrap_time.json
+
+Bitiş ekranı ölçümlerinden biri bütçeyi aşarsa çıkış kodu 1 olur.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np  # noqa: E402
+
+from core.config import BOOTSTRAP_RESAMPLES  # noqa: E402
+from core.confidence import (  # noqa: E402
+    agreement_confidence_intervals,
+    mean_confidence_intervals,
+    vtt_confidence_intervals,
+)
+
+FINISH_SCREEN_BUDGET_MS = 500
+
+def timed(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Güven aralığı hesaplama süresi ölçümü")
+    parser.add_argument('--answers', type=int, default=500, help="Oturumdaki cevap sayısı")
+    parser.add_argument('--raters', type=int, default=20)
+    parser.add_argument('--images', type=int, default=1000)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    true_real = rng.random(args.answers) < 0.5
+    classified_real = np.where(rng.random(args.answers) < 0.8, true_real, ~true_real)
+    scores = rng.integers(1, 6, size=(args.answers, 5)).astype(np.uint8)
+    truth = rng.integers(1, 6, size=args.images)
+    ratings = np.clip(truth + rng.integers(-1, 2, size=(5, args.raters, args.images)), 1, 5).astype(np.uint8)
+    
+    report = {
+        'resamples': BOOTSTRAP_RESAMPLES,
+        'answers': args.answers,
+        'vtt_ms': timed(lambda: vtt_confidence_intervals(true_real, classified_real), args.repeats),
+        'apa_ms': timed(lambda: mean_confidence_intervals(scores), args.repeats),
+        'agreement_ms': timed(lambda: agreement_confidence_intervals(ratings), args.repeats),
+    }
+    report['failures'] = [name for name in ('vtt_ms', 'apa_ms') if report[name] > FINISH_SCREEN_BUDGET_MS]
+    
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    sys.exit(1 if report['failures'] else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""Kıyaslama ve yük testleri için yerel, bellek içi sahte Google Drive servisi
+
+googleapiclient istemcisinin uygulamada kullanılan yüzeyini taklit eder:
+files().list/get/create/update, files().get_media (MediaIoBaseDownload ile uyumlu)
+ve changes().getStartPageToken/list. Çağrı sayıları ve aktarılan bayt miktarı
+ölçüm için tutulur. İsteğe bağlı gecikme ile ağ gidiş-dönüşleri canlandırılabilir.
+"""
+import hashlib
+import io
+import itertools
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from unittest import mock
+
+import httplib2
+from PIL import Image
+
+REAL_FOLDER_ID = "1XJgpXqdVSfOIriECXwXuwccs3N0KiqQ_"
+SYNTHETIC_FOLDER_ID = "1iGykeA2-cG68wj-4xZDXLp6CH4DcisLo"
+RESULTS_FOLDER_ID = "1Zjh8EDGnUAJGor4sVxIyMllw1zswlWQA"
+
+def make_png(seed, size=512):
+    """Tohuma göre farklı, gri tonlamalı bir PNG görüntü üret"""
+    img = Image.new('L', (size, size), color=seed % 251)
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+class _Call:
+    def __init__(self, fn):
+        self.fn = fn
+    
+    def execute(self, *args, **kwargs):
+        return self.fn()
+
+class _MediaHttp:
+    def __init__(self, drive):
+        self.drive = drive
+    
+    def request(self, uri, method='GET', headers=None, body=None, **kwargs):
+        data = self.drive.get_blob(uri.rsplit('/', 1)[-1])
+        return httplib2.Response({'status': 200, 'content-length': str(len(data))}), data
+
+class _MediaRequest:
+    """MediaIoBaseDownload'un beklediği HttpRequest alanlarını sağlar"""
+    
+    def __init__(self, drive, file_id):
+        self.http = _MediaHttp(drive)
+        self.uri = 'fake://drive/' + file_id
+        self.headers = {}
+
+class _Files:
+    def __init__(self, drive):
+        self.drive = drive
+    
+    def list(self, q=None, pageSize=100, pageToken=None, fields=None, **kwargs):
+        def run():
+            self.drive.count('list')
+            folder_id = q.split("'")[1]
+            files = self.drive.folders.get(folder_id, [])
+            start = int(pageToken or 0)
+            page = files[start:start + min(pageSize, self.drive.max_page_size)]
+            response = {'files': [dict(f) for f in page]}
+            if start + len(page) < len(files):
+                response['nextPageToken'] = str(start + len(page))
+            return response
+        return _Call(run)
+    
+    def get(self, fileId=None, fields=None, **kwargs):
+        def run():
+            self.drive.count('get')
+            for files in self.drive.folders.values():
+                for f in files:
+                    if f['id'] == fileId:
+                        return dict(f)
+            raise KeyError(fileId)
+        return _Call(run)
+    
+    def get_media(self, fileId=None, **kwargs):
+        return _MediaRequest(self.drive, fileId)
+    
+    def create(self, body=None, media_body=None, fields=None, **kwargs):
+        def run():
+            self.drive.count('create')
+            file_id = f"upload{next(self.drive.ids)}"
+            self.drive.record_upload(file_id, body.get('name'), media_body)
+            return {'id': file_id}
+        return _Call(run)
+    
+    def update(self, fileId=None, body=None, media_body=None, fields=None, **kwargs):
+        def run():
+            self.drive.count('update')
+            self.drive.record_upload(fileId, (body or {}).get('name'), media_body)
+            return {'id': fileId}
+        return _Call(run)
+
+class _Changes:
+    def __init__(self, drive):
+        self.drive = drive
+    
+    def getStartPageToken(self, **kwargs):
+        return _Call(lambda: {'startPageToken': '1'})
+    
+    def list(self, pageToken=None, **kwargs):
+        def run():
+            self.drive.count('changes')
+            return {'changes': [], 'newStartPageToken': pageToken}
+        return _Call(run)
+
+class FakeDrive:
+    """Bellek içi sahte Drive servisi (iş parçacığı güvenli sayaçlarla)"""
+    
+    def __init__(self, n_real=200, n_synthetic=200, image_size=512, latency=0.0, max_page_size=100):
+        self.latency = latency
+        self.max_page_size = max_page_size
+        self.calls = Counter()
+        self.bytes_downloaded = 0
+        self.bytes_uploaded = 0
+        self.uploads = {}
+        self.ids = itertools.count()
+        self.lock = threading.Lock()
+        self.blobs = {}
+        self.folders = {RESULTS_FOLDER_ID: []}
+        
+        for folder_id, prefix, count, offset in [
+            (REAL_FOLDER_ID, 'real', n_real, 0),
+            (SYNTHETIC_FOLDER_ID, 'synth', n_synthetic, 100000),
+        ]:
+            files = []
+            for i in range(count):
+                file_id = f"{prefix}{i:05d}"
+                data = make_png(i + offset, image_size)
+                self.blobs[file_id] = data
+                files.append({
+                    'id': file_id,
+                    'name': f"{file_id}.png",
+                    'mimeType': 'image/png',
+                    'size': str(len(data)),
+                    'md5Checksum': hashlib.md5(data).hexdigest(),
+                    'modifiedTime': '2025-01-01T00:00:00.000Z',
+                })
+            self.folders[folder_id] = files
+    
+    def count(self, name):
+        with self.lock:
+            self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+    
+    def get_blob(self, file_id):
+        self.count('get_media')
+        data = self.blobs[file_id]
+        with self.lock:
+            self.bytes_downloaded += len(data)
+        return data
+    
+    def record_upload(self, file_id, name, media_body):
+        size = media_body.size() if media_body is not None and hasattr(media_body, 'size') else 0
+        with self.lock:
+            self.bytes_uploaded += size or 0
+            self.uploads[file_id] = name
+    
+    def stats(self):
+        """Çağrı sayıları ve aktarılan baytların anlık görüntüsü"""
+        with self.lock:
+            return {
+                'calls': dict(self.calls),
+                'bytes_downloaded': self.bytes_downloaded,
+                'bytes_uploaded': self.bytes_uploaded,
+            }
+    
+    def files(self):
+        return _Files(self)
+    
+    def changes(self):
+        return _Changes(self)
+
+@contextmanager
+def patched_drive(drive):
+    """Uygulamanın Drive istemcisi yerine verilen sahte servisi kullanmasını sağla
+    
+    Hizmet hesabı kimlik bilgisi oluşturma ve istemci kurulumu yamalanır; uygulama
+    kodunun geri kalanı olduğu gibi çalışır.
+    """
+    with mock.patch('google.oauth2.service_account.Credentials.from_service_account_info',
+                    return_value=mock.Mock(name='credentials')), \
+         mock.patch('googleapiclient.discovery.build_from_document', return_value=drive), \
+         mock.patch('googleapiclient.discovery.build', return_value=drive):
+        yield drive
+
+# AppTest ile kullanılacak sahte hizmet hesabı (gerçek bir anahtar içermez)
+FAKE_SERVICE_ACCOUNT = {'type': 'service_account', 'client_email': 'benchmark@example.com'}
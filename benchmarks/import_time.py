@@ -0,0 +1,112 @@
+"""Soğuk başlangıç ve yeniden çalıştırma (rerun) süresi ölçümü
+
+Uygulama betiği Streamlit'in AppTest aracıyla, her ölçüm için temiz bir Python
+sürecinde çalıştırılır. Ölçülenler:
+  - streamlit_import_ms: streamlit'in kendisinin içe aktarılma süresi
+  - first_run_ms: betiğin ilk çalıştırılması (uygulamanın kendi içe aktarmaları dahil)
+  - rerun_ms: başlangıç ekranının sonraki yeniden çalıştırmalarının medyanı
+  - heavy_modules: ilk çalıştırmadan sonra yüklenmiş olan ağır kütüphaneler
+
+Kullanım:
+    python benchmarks/import_time.py --runs 5 --output import_time.json
+
+Bütçe aşılırsa veya ağır kütüphanelerden biri başlangıçta yüklenirse çıkış kodu 1 olur.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'streamlit_app.py'))
+
+# Başlangıçta yüklenmemesi gereken kütüphaneler (numpy listede yok: st.image onu zaten yükler)
+HEAVY_MODULES = ['pandas', 'matplotlib', 'seaborn', 'googleapiclient']
+
+def measure_once(reruns):
+    """Bu süreç içinde tek bir soğuk başlangıç ölçümü yap ve sonucu yazdır"""
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    streamlit_import_ms = (time.perf_counter() - start) * 1000
+    
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    # secrets.toml olmadan st.secrets erişimi hata verir; kimlik bilgisi içermeyen bir değer ver
+    at.secrets['benchmark'] = True
+    start = time.perf_counter()
+    at.run()
+    first_run_ms = (time.perf_counter() - start) * 1000
+    heavy_modules = [name for name in HEAVY_MODULES if name in sys.modules]
+    
+    rerun_times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        rerun_times.append((time.perf_counter() - start) * 1000)
+    
+    print(json.dumps({
+        'streamlit_import_ms': streamlit_import_ms,
+        'first_run_ms': first_run_ms,
+        'rerun_ms': statistics.median(rerun_times) if rerun_times else None,
+        'heavy_modules': heavy_modules,
+        'exceptions': [str(e.value) for e in at.exception],
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help="Soğuk başlangıç ölçüm sayısı")
+    parser.add_argument('--reruns', type=int, default=20, help="Ölçüm başına yeniden çalıştırma sayısı")
+    parser.add_argument('--budget-first-run-ms', type=float, default=1000.0)
+    parser.add_argument('--budget-rerun-ms', type=float, default=150.0)
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        measure_once(args.reruns)
+        return 0
+    
+    samples = []
+    for _ in range(args.runs):
+        # Uygulama çalışma dizinine sonuç klasörü açtığı için geçici dizinde çalıştır
+        with tempfile.TemporaryDirectory() as cwd:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', '--reruns', str(args.reruns)],
+                cwd=cwd, capture_output=True, text=True, check=True
+            ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    
+    summary = {
+        'python': sys.version.split()[0],
+        'runs': args.runs,
+        'streamlit_import_ms': statistics.median(s['streamlit_import_ms'] for s in samples),
+        'first_run_ms': statistics.median(s['first_run_ms'] for s in samples),
+        'rerun_ms': statistics.median(s['rerun_ms'] for s in samples),
+        'heavy_modules': sorted({m for s in samples for m in s['heavy_modules']}),
+        'exceptions': sorted({e for s in samples for e in s['exceptions']}),
+        'budget': {'first_run_ms': args.budget_first_run_ms, 'rerun_ms': args.budget_rerun_ms},
+    }
+    
+    failures = []
+    if summary['first_run_ms'] > args.budget_first_run_ms:
+        failures.append(f"ilk çalıştırma {summary['first_run_ms']:.0f} ms > {args.budget_first_run_ms:.0f} ms")
+    if summary['rerun_ms'] > args.budget_rerun_ms:
+        failures.append(f"yeniden çalıştırma {summary['rerun_ms']:.0f} ms > {args.budget_rerun_ms:.0f} ms")
+    if summary['heavy_modules']:
+        failures.append(f"başlangıçta yüklenen ağır kütüphaneler: {', '.join(summary['heavy_modules'])}")
+    if summary['exceptions']:
+        failures.append(f"betik hataları: {summary['exceptions']}")
+    summary['failures'] = failures
+    
+    text = json.dumps(summary, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""Çok okuyuculu sunucu modu için yük testi: eşzamanlı okuyucuların tıklama gecikmesi
+
+Sahte Drive servisiyle gerçek bir Streamlit sunucusu alt süreçte başlatılır ve N
+okuyucu, tarayıcının kullandığı WebSocket protokolüyle (BackMsg/ForwardMsg) aynı
+anda bağlanıp VTT veya APA oturumlarını tıklayarak ilerletir. Bir tıklamanın
+gecikmesi, butonun gönderilmesinden sonraki çalıştırmanın (st.rerun dahil) bitiş
+mesajına kadar geçen süredir. Görüntü baytları (media uç noktası) indirilmez;
+ölçülen, sunucunun betik çalıştırma ve CPU işleri (görüntü türevi, grafikler)
+üzerindeki yüküdür.
+
+Gereksinim: websockets (pip install -r benchmarks/requirements.txt)
+
+Kullanım:
+    python benchmarks/load_test.py --readers 20 --test vtt --clicks 30 --output load_test.json
+    python benchmarks/load_test.py --readers 20 --worker-processes 0   # süreç havuzu kapalı
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(os.path.dirname(BENCHMARK_DIR), "streamlit_app.py")
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+TESTS = {
+    'vtt': ('Görsel Turing Testi', ['Gerçek', 'Sentetik']),
+    'apa': ('Anatomik Olabilirlik Değerlendirmesi', ['Değerlendirmeyi Gönder ve İlerle']),
+}
+BUSY_TEXT = "Sunucu şu anda çok yoğun"
+
+# script_finished durumları (ForwardMsg.ScriptFinishedStatus)
+FINISHED_EARLY_FOR_RERUN = 2
+
+def serve(port, worker_processes, image_size, latency):
+    """Alt süreç: sahte Drive ile Streamlit sunucusunu başlat (bloklar)"""
+    import core.config
+    
+    # core.workers ilk içe aktarıldığında havuz boyutunu bu değerden alır
+    core.config.WORKER_PROCESSES = worker_processes
+    
+    from fake_drive import FakeDrive, patched_drive
+    from streamlit.web import bootstrap
+    
+    drive = FakeDrive(n_real=500, n_synthetic=500, image_size=image_size, latency=latency)
+    flag_options = {
+        'server.port': port,
+        'server.address': '127.0.0.1',
+        'server.headless': True,
+        'server.fileWatcherType': 'none',
+        'server.runOnSave': False,
+        'browser.gatherUsageStats': False,
+        'global.developmentMode': False,
+        'logger.level': 'error',
+    }
+    with patched_drive(drive):
+        bootstrap.load_config_options(flag_options=flag_options)
+        bootstrap.run(APP_PATH, False, [], flag_options)
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(workdir, port, args):
+    """Sunucu alt sürecini başlat ve sağlık uç noktası yanıt verene kadar bekle"""
+    os.makedirs(os.path.join(workdir, '.streamlit'), exist_ok=True)
+    with open(os.path.join(workdir, '.streamlit', 'secrets.toml'), 'w', encoding='utf-8') as f:
+        f.write('[google_service_account]\ntype = "service_account"\nclient_email = "benchmark@example.com"\n')
+    
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', str(port),
+         '--worker-processes', str(args.worker_processes),
+         '--image-size', str(args.image_size), '--drive-latency', str(args.drive_latency)],
+        cwd=workdir,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Sunucu başlatılamadı (çıkış kodu {process.returncode})")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Sunucu 60 saniyede hazır olmadı")
+
+class Reader:
+    """Tek bir okuyucu oturumu: WebSocket üzerinden betik çalıştırır ve widget'ları izler"""
+    
+    def __init__(self, url, name):
+        self.url = url
+        self.name = name
+        self.websocket = None
+        self.widgets = {}  # (tür, etiket/anahtar) -> widget id
+        self.values = {}  # widget id -> WidgetState alanı ve değeri (sonraki çalıştırmalarda da gönderilir)
+        self.texts = []
+        self.exceptions = []
+    
+    async def connect(self):
+        import websockets
+        
+        self.websocket = await websockets.connect(self.url, subprotocols=['streamlit'], max_size=None)
+    
+    async def run(self, trigger=None):
+        """Widget durumlarıyla (ve varsa tetiklenen butonla) betiği çalıştır ve bitmesini bekle"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        
+        msg = BackMsg()
+        msg.rerun_script.query_string = ''
+        for widget_id, (field, value) in self.values.items():
+            state = msg.rerun_script.widget_states.widgets.add(id=widget_id)
+            setattr(state, field, value)
+        if trigger is not None:
+            msg.rerun_script.widget_states.widgets.add(id=trigger, trigger_value=True)
+        
+        self.widgets = {}
+        self.texts = []
+        await self.websocket.send(msg.SerializeToString())
+        await self._receive_until_finished()
+    
+    async def _receive_until_finished(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.websocket.recv())
+            kind = msg.WhichOneof('type')
+            if kind == 'delta':
+                self._record_delta(msg.delta)
+            elif kind == 'script_finished':
+                if msg.script_finished == FINISHED_EARLY_FOR_RERUN:
+                    # st.rerun(): sunucu yeni çalıştırmayı kendisi başlatır
+                    self.widgets = {}
+                    self.texts = []
+                    continue
+                return
+    
+    def _record_delta(self, delta):
+        if delta.WhichOneof('type') != 'new_element':
+            return
+        element = delta.new_element
+        kind = element.WhichOneof('type')
+        if kind in ('button', 'text_input', 'radio', 'checkbox'):
+            widget = getattr(element, kind)
+            self.widgets[(kind, widget.label)] = widget.id
+        elif kind == 'exception':
+            self.exceptions.append(element.exception.message)
+        elif kind == 'alert':
+            self.texts.append(element.alert.body)
+    
+    def widget(self, kind, label):
+        return self.widgets.get((kind, label))
+    
+    async def close(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+
+async def simulate_reader(url, index, test, clicks, latencies, summary):
+    """Bir okuyucuyu başlat ve clicks kez cevap butonuna bas"""
+    label, answer_labels = TESTS[test]
+    reader = Reader(url, f"yuk{index:03d}")
+    await reader.connect()
+    try:
+        await reader.run()
+        if test != 'vtt':
+            radio = reader.widget('radio', "Hangi testi yapmak istiyorsunuz?")
+            reader.values[radio] = ('string_value', label)
+            await reader.run()
+        reader.values[reader.widget('text_input', "Radyolog Kimliği:")] = ('string_value', reader.name)
+        await reader.run()
+        await reader.run(trigger=reader.widget('button', "Değerlendirmeyi Başlat"))
+        
+        for step in range(clicks):
+            answers = [reader.widget('button', answer) for answer in answer_labels]
+            answers = [widget_id for widget_id in answers if widget_id]
+            if not answers:
+                retry = reader.widget('button', "Yeniden Dene")
+                if retry is None:
+                    break
+                answers = [retry]
+            start = time.perf_counter()
+            await reader.run(trigger=answers[step % len(answers)])
+            latencies.append(time.perf_counter() - start)
+            summary['busy'] += sum(BUSY_TEXT in text for text in reader.texts)
+        summary['exceptions'] += len(reader.exceptions)
+    finally:
+        await reader.close()
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+async def run_load(port, args):
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    latencies = []
+    summary = {'busy': 0, 'exceptions': 0, 'failed_readers': 0}
+    
+    async def one(index):
+        # Okuyucular aynı anda değil, kısa aralıklarla bağlanır
+        await asyncio.sleep(index * args.ramp)
+        try:
+            await simulate_reader(url, index, args.test, args.clicks, latencies, summary)
+        except Exception as e:
+            summary['failed_readers'] += 1
+            print(f"okuyucu {index}: {e!r}", file=sys.stderr)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.readers)))
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'test': args.test,
+        'readers': args.readers,
+        'clicks_per_reader': args.clicks,
+        'worker_processes': args.worker_processes,
+        'image_size': args.image_size,
+        'clicks': len(latencies),
+        'throughput_clicks_per_s': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        'p90_ms': round(percentile(latencies, 90) * 1000, 1) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        'mean_ms': round(statistics.mean(latencies) * 1000, 1) if latencies else None,
+        'max_ms': round(max(latencies) * 1000, 1) if latencies else None,
+        'busy_notices': summary['busy'],
+        'exceptions': summary['exceptions'],
+        'failed_readers': summary['failed_readers'],
+        'elapsed_s': round(elapsed, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Eşzamanlı okuyucularla tıklama gecikmesi yük testi")
+    parser.add_argument('--readers', type=int, default=10, help="Eşzamanlı okuyucu sayısı")
+    parser.add_argument('--test', default='vtt', choices=list(TESTS))
+    parser.add_argument('--clicks', type=int, default=20, help="Okuyucu başına cevap sayısı")
+    parser.add_argument('--ramp', type=float, default=0.1, help="Okuyucuların bağlanma aralığı (saniye)")
+    parser.add_argument('--worker-processes', type=int, default=None,
+                        help="CPU iş havuzu süreç sayısı (0: betik iş parçacığında); varsayılan: config")
+    parser.add_argument('--image-size', type=int, default=1024, help="Sahte Drive görüntülerinin kenar uzunluğu")
+    parser.add_argument('--drive-latency', type=float, default=0.0, help="Sahte Drive çağrı gecikmesi (saniye)")
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker_processes is None:
+        from core.config import WORKER_PROCESSES
+        args.worker_processes = WORKER_PROCESSES
+    
+    if args.serve:
+        serve(args.serve, args.worker_processes, args.image_size, args.drive_latency)
+        return
+    
+    workdir = tempfile.mkdtemp(prefix='load_test_')
+    port = free_port()
+    server = start_server(workdir, port, args)
+    try:
+        report = asyncio.run(run_load(port, args))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Oturum büyüdükçe yeniden çalıştırma (rerun) süresini ölçen kıyaslama
+
+Sahte Drive servisiyle bir VTT ve bir APA oturumu başlatılır, ardından oturum
+durumuna 0'dan 500'e kadar yapay cevap yüklenerek her kontrol noktasında
+değerlendirme ekranının yeniden çalıştırma süresi (birkaç çalıştırmanın medyanı)
+ve sonuç deposunun (ResultStore) bellek boyutu ölçülür. Cevap sayısı arttıkça
+sürenin sabit kalması beklenir: kenar çubuğu istatistikleri her cevapta artımlı
+güncellenen RunningStats özetinden gelir, sonuçlar her çalıştırmada yeniden
+taranmaz. Durum değiştirildikten sonraki ilk çalıştırma özeti sonuçlardan bir kez
+yeniden kurduğu için ısınma sayılır ve ölçüme katılmaz.
+
+Kullanım:
+    python benchmarks/rerun_time.py --max-answers 500 --step 50 --output rerun_time.json
+"""
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(os.path.dirname(BENCHMARK_DIR), "streamlit_app.py")
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from fake_drive import FAKE_SERVICE_ACCOUNT, FakeDrive, patched_drive  # noqa: E402
+
+TESTS = {
+    'vtt': ('Görsel Turing Testi', ['Gerçek', 'Sentetik']),
+    'apa': ('Anatomik Olabilirlik Değerlendirmesi', ['Değerlendirmeyi Gönder ve İlerle']),
+}
+
+def start_session(test, drive):
+    from streamlit.testing.v1 import AppTest
+    
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.secrets['google_service_account'] = FAKE_SERVICE_ACCOUNT
+    at.run()
+    at.sidebar.radio(key='test_selection').set_value(TESTS[test][0]).run()
+    at.text_input(key='rad_id_input').input('benchmark').run()
+    at.checkbox(key='streaming_mode_input').uncheck().run()
+    at.button(key='start_button').click().run()
+    
+    # Şablon olarak kullanılacak gerçek bir cevap kaydı üret
+    labels = TESTS[test][1]
+    next(b for b in at.button if b.label in labels).click().run()
+    if at.exception:
+        raise RuntimeError([e.value for e in at.exception])
+    template_result = next(iter(at.session_state['results']))
+    template_image = dict(at.session_state['all_images'][0])
+    return at, template_result, template_image
+
+def grow_session(at, test, n_answers, template_result, template_image):
+    """Oturumu n_answers cevaplı ve henüz bitmemiş hale getir"""
+    from core.results import ResultStore
+    
+    state = at.session_state
+    
+    results = []
+    for i in range(n_answers):
+        result = copy.deepcopy(template_result)
+        result['image_id'] = f"bench{i:05d}"
+        result['image_path'] = f"bench{i:05d}.png"
+        if 'classified_as' in result:
+            result['true_type'] = 'gerçek' if i % 2 else 'sentetik'
+            result['classified_as'] = 'gerçek' if i % 3 else 'sentetik'
+            result['correct'] = result['true_type'] == result['classified_as']
+        results.append(result)
+    
+    images = [dict(template_image) for _ in range(n_answers + 10)]
+    state['results'] = ResultStore.from_records(test, results, capacity=len(images))
+    state['all_images'] = images
+    state['current_idx'] = n_answers
+    state['prefetcher'] = None
+
+def time_reruns(at, reruns):
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+        if at.exception:
+            raise RuntimeError([e.value for e in at.exception])
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Oturum büyüklüğüne göre rerun süresi kıyaslaması")
+    parser.add_argument('--max-answers', type=int, default=500)
+    parser.add_argument('--step', type=int, default=50)
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--tests', nargs='+', default=list(TESTS), choices=list(TESTS))
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+    
+    os.chdir(tempfile.mkdtemp(prefix='rerun_bench_'))
+    drive = FakeDrive(n_real=50, n_synthetic=50, image_size=256)
+    report = {}
+    
+    with patched_drive(drive):
+        for test in args.tests:
+            at, template_result, template_image = start_session(test, drive)
+            points = []
+            for n_answers in range(0, args.max_answers + 1, args.step):
+                grow_session(at, test, n_answers, template_result, template_image)
+                at.run()  # Durum değişikliğinden sonraki ilk çalıştırmayı ısınma say
+                rerun_ms = time_reruns(at, args.reruns)
+                results_bytes = at.session_state['results'].nbytes
+                points.append({'answers': n_answers, 'rerun_ms': round(rerun_ms, 1), 'results_bytes': results_bytes})
+                print(f"{test} answers={n_answers:4d} rerun_ms={rerun_ms:7.1f} results_bytes={results_bytes}")
+            first, last = points[0]['rerun_ms'], points[-1]['rerun_ms']
+            report[test] = {
+                'points': points,
+                'growth_ratio': round(last / first, 2) if first else None,
+            }
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps({test: data['growth_ratio'] for test, data in report.items()}))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+"""Uçtan uca değerlendirme akışı kıyaslaması: 100 görüntülük tam oturumlar
+
+Uygulama betiği AppTest ile sahte Drive servisine karşı çalıştırılır; giriş formu
+(initialize_app) doldurulur, değerlendirme başlatılır ve VTT'de Gerçek/Sentetik
+butonlarıyla, APA'da kaydırıcılar ayarlanıp gönderilerek tüm görüntüler
+cevaplanır; son cevap bitiş ekranını açar. Her oturum temiz bir Python sürecinde
+çalışır (en yüksek RSS oturuma özgü olsun diye). Her adım için kaydedilenler:
+  - ms: butona basıştan sonraki çalıştırmanın (st.rerun dahil) süresi
+  - drive_calls: adım süresince yapılan Drive çağrıları (türüne göre)
+  - bytes_downloaded / bytes_uploaded: adım süresince Drive'dan inen/çıkan bayt
+Arka planda çalışan indirme (akış modu) ve yükleme iş parçacıklarının trafiği
+o sırada çalışan adıma yazılır. Oturum özetinde cevap gecikmesi yüzdelikleri,
+toplam Drive trafiği (yükleme kuyruğu boşaldıktan sonra) ve en yüksek RSS yer alır.
+
+Kullanım:
+    python benchmarks/session_flow.py --output session_flow.json
+    python benchmarks/session_flow.py --tests vtt --modes streaming --drive-latency 0.05
+    python benchmarks/session_flow.py --baseline onceki.json --tolerance 0.25
+
+--baseline verilirse özetler önceki bir çıktıyla karşılaştırılır; bir ölçüm
+toleransın ötesinde kötüleşmişse veya betik hata verirse çıkış kodu 1 olur.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+APP_PATH = os.path.join(REPO_DIR, "streamlit_app.py")
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+
+TESTS = {
+    'vtt': 'Görsel Turing Testi',
+    'apa': 'Anatomik Olabilirlik Değerlendirmesi',
+}
+MODES = ['streaming', 'batch']
+APA_SUBMIT_LABEL = "Değerlendirmeyi Gönder ve İlerle"
+
+# Karşılaştırmada izlenen özet ölçümleri (hepsinde küçük değer daha iyi)
+TRACKED = ['start_ms', 'answer_p50_ms', 'answer_p90_ms', 'finish_ms',
+           'drive_call_total', 'bytes_downloaded', 'peak_rss_bytes']
+
+def peak_rss():
+    """Bu sürecin ve beklenmiş alt süreçlerinin en yüksek RSS değeri (bayt; ölçülemezse None)"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None, None
+        return psutil.Process().memory_info().peak_wset, None
+    
+    # Linux'ta KB, macOS'ta bayt
+    unit = 1 if sys.platform == 'darwin' else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit)
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def traffic_delta(before, after):
+    calls = Counter(after['calls'])
+    calls.subtract(before['calls'])
+    return {
+        'drive_calls': {name: count for name, count in calls.items() if count},
+        'bytes_downloaded': after['bytes_downloaded'] - before['bytes_downloaded'],
+        'bytes_uploaded': after['bytes_uploaded'] - before['bytes_uploaded'],
+    }
+
+def check(at):
+    if at.exception:
+        raise RuntimeError([e.value for e in at.exception])
+
+def answer_widgets(at, test, idx, rng):
+    """Sıradaki görüntünün cevap butonunu (APA'da kaydırıcıları da ayarlayarak) döndür"""
+    if test == 'vtt':
+        return at.button(key=f"{rng.choice(['real', 'synth'])}_{idx}")
+    
+    for slider in at.slider:
+        if slider.key and slider.key.startswith('slider_') and slider.key.endswith(f"_{idx}"):
+            slider.set_value(rng.randint(1, 5))
+    return next(b for b in at.button if b.label == APA_SUBMIT_LABEL)
+
+def run_session(drive, test, streaming, seed):
+    """Bu süreçte tek bir tam oturum çalıştır; dönüş: adımlar ve özet"""
+    from streamlit.testing.v1 import AppTest
+    
+    from fake_drive import FAKE_SERVICE_ACCOUNT
+    
+    rng = random.Random(seed)
+    steps = []
+    
+    def step(kind, index, action):
+        before = drive.stats()
+        start = time.perf_counter()
+        action()
+        elapsed = (time.perf_counter() - start) * 1000
+        check(at)
+        steps.append({'kind': kind, 'index': index, 'ms': round(elapsed, 2),
+                      **traffic_delta(before, drive.stats())})
+    
+    at = AppTest.from_file(APP_PATH, default_timeout=300)
+    at.secrets['google_service_account'] = FAKE_SERVICE_ACCOUNT
+    step('load', 0, at.run)
+    
+    # initialize_app: test seçimi, radyolog kimliği, yükleme modu
+    at.sidebar.radio(key='test_selection').set_value(TESTS[test]).run()
+    at.text_input(key='rad_id_input').input('kiyaslama').run()
+    mode = at.checkbox(key='streaming_mode_input')
+    (mode.check() if streaming else mode.uncheck()).run()
+    check(at)
+    step('start', 0, at.button(key='start_button').click().run)
+    
+    n_images = len(at.session_state['all_images'])
+    for idx in range(n_images):
+        if at.session_state['current_idx'] != idx:
+            raise RuntimeError(f"{idx}. adımda beklenmeyen görüntü sırası: {at.session_state['current_idx']}")
+        button = answer_widgets(at, test, idx, rng)
+        # Son cevap bitiş ekranını (istatistikler, grafikler, dosya yazımı) açar
+        step('finish' if idx == n_images - 1 else 'answer', idx, button.click().run)
+    
+    if not at.session_state['completed']:
+        raise RuntimeError("Oturum tamamlanmadı")
+    
+    # Sonuç dosyaları ve grafik yükleme kuyruğu üzerinden gider; boşalmasını bekle
+    from core.uploads import get_upload_queue
+    from core.workers import get_worker_pool
+    
+    before = drive.stats()
+    start = time.perf_counter()
+    drained = get_upload_queue().wait_idle(timeout=120)
+    steps.append({'kind': 'upload_drain', 'index': n_images, 'ms': round((time.perf_counter() - start) * 1000, 2),
+                  **traffic_delta(before, drive.stats())})
+    
+    # Süreç havuzunun alt süreçleri beklenerek kapatılır ki RSS'leri ölçülebilsin
+    pool = get_worker_pool()
+    if pool.executor is not None:
+        pool.executor.shutdown(wait=True)
+    pool.shutdown()
+    
+    self_rss, children_rss = peak_rss()
+    answers = [s['ms'] for s in steps if s['kind'] == 'answer']
+    totals = drive.stats()
+    return {
+        'test': test,
+        'mode': 'streaming' if streaming else 'batch',
+        'images': n_images,
+        'summary': {
+            'load_ms': steps[0]['ms'],
+            'start_ms': steps[1]['ms'],
+            'answer_p50_ms': round(percentile(answers, 50), 2),
+            'answer_p90_ms': round(percentile(answers, 90), 2),
+            'answer_p99_ms': round(percentile(answers, 99), 2),
+            'answer_mean_ms': round(statistics.mean(answers), 2),
+            'answer_max_ms': round(max(answers), 2),
+            'finish_ms': next(s['ms'] for s in steps if s['kind'] == 'finish'),
+            'drive_calls': dict(totals['calls']),
+            'drive_call_total': sum(totals['calls'].values()),
+            'bytes_downloaded': totals['bytes_downloaded'],
+            'bytes_uploaded': totals['bytes_uploaded'],
+            'uploads_drained': drained,
+            'peak_rss_bytes': self_rss,
+            'peak_rss_worker_bytes': children_rss,
+        },
+        'steps': steps,
+    }
+
+def child(args):
+    """Alt süreç: sahte Drive ile tek oturumu çalıştır ve sonucu stdout'un son satırına yaz"""
+    import core.config
+    
+    # core.workers ilk içe aktarıldığında havuz boyutunu bu değerden alır
+    if args.worker_processes is not None:
+        core.config.WORKER_PROCESSES = args.worker_processes
+    
+    from fake_drive import FakeDrive, patched_drive
+    
+    drive = FakeDrive(n_real=args.pool_images, n_synthetic=args.pool_images,
+                      image_size=args.image_size, latency=args.drive_latency)
+    with patched_drive(drive):
+        result = run_session(drive, args.child, args.child_mode == 'streaming', args.seed)
+    print(json.dumps(result))
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(sessions, baseline, tolerance):
+    """Özetleri önceki bir çıktıyla karşılaştır; dönüş: kötüleşme açıklamaları"""
+    previous = {(s['test'], s['mode']): s['summary'] for s in baseline.get('sessions', [])}
+    regressions = []
+    for session in sessions:
+        old = previous.get((session['test'], session['mode']))
+        if old is None:
+            continue
+        for name in TRACKED:
+            before, after = old.get(name), session['summary'].get(name)
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            session['summary'].setdefault('baseline_change', {})[name] = round(change, 3)
+            if change > tolerance:
+                regressions.append(f"{session['test']}/{session['mode']} {name}: {before} -> {after} (+{change:.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tests', nargs='+', default=list(TESTS), choices=list(TESTS))
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES,
+                        help="Görüntü yükleme modu: akış (ön yükleyici) veya toplu indirme")
+    parser.add_argument('--image-size', type=int, default=1024, help="Sahte Drive görüntülerinin kenar uzunluğu")
+    parser.add_argument('--pool-images', type=int, default=200, help="Sahte Drive klasörü başına görüntü sayısı")
+    parser.add_argument('--drive-latency', type=float, default=0.0, help="Sahte Drive çağrı gecikmesi (saniye)")
+    parser.add_argument('--worker-processes', type=int, default=None,
+                        help="CPU iş havuzu süreç sayısı (0: betik iş parçacığında); varsayılan: config")
+    parser.add_argument('--seed', type=int, default=0, help="Cevap seçimleri için rastgelelik tohumu")
+    parser.add_argument('--baseline', help="Karşılaştırılacak önceki JSON çıktısı")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="İzin verilen göreli kötüleşme (0.2 = %%20)")
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--child', choices=list(TESTS), help=argparse.SUPPRESS)
+    parser.add_argument('--child-mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        child(args)
+        return 0
+    
+    forwarded = ['--image-size', str(args.image_size), '--pool-images', str(args.pool_images),
+                 '--drive-latency', str(args.drive_latency), '--seed', str(args.seed)]
+    if args.worker_processes is not None:
+        forwarded += ['--worker-processes', str(args.worker_processes)]
+    
+    sessions = []
+    failures = []
+    for test in args.tests:
+        for mode in args.modes:
+            # Uygulama çalışma dizinine sonuç klasörü açtığı için geçici dizinde çalıştır
+            # (görüntü önbelleği de oraya düşer; her oturum soğuk önbellekle başlar)
+            with tempfile.TemporaryDirectory() as cwd:
+                env = dict(os.environ, TMPDIR=cwd, TEMP=cwd, TMP=cwd)
+                completed = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', test, '--child-mode', mode] + forwarded,
+                    cwd=cwd, env=env, capture_output=True, text=True
+                )
+            if completed.returncode != 0:
+                failures.append(f"{test}/{mode}: {completed.stderr.strip().splitlines()[-1:]}")
+                continue
+            session = json.loads(completed.stdout.strip().splitlines()[-1])
+            sessions.append(session)
+            summary = session['summary']
+            print(f"{test}/{mode}: start={summary['start_ms']:.0f} ms "
+                  f"p50={summary['answer_p50_ms']:.0f} ms p90={summary['answer_p90_ms']:.0f} ms "
+                  f"finish={summary['finish_ms']:.0f} ms drive_calls={summary['drive_call_total']} "
+                  f"down={summary['bytes_downloaded']} up={summary['bytes_uploaded']} "
+                  f"peak_rss={summary['peak_rss_bytes']}", file=sys.stderr)
+    
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            failures += compare(sessions, json.load(f), args.tolerance)
+    
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'parameters': {
+            'image_size': args.image_size,
+            'pool_images': args.pool_images,
+            'drive_latency': args.drive_latency,
+            'worker_processes': args.worker_processes,
+            'seed': args.seed,
+            'tolerance': args.tolerance if args.baseline else None,
+        },
+        'sessions': sessions,
+        'failures': failures,
+    }
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    print(json.dumps({f"{s['test']}/{s['mode']}": s['summary'] for s in sessions}, ensure_ascii=False))
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+    
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,7 @@
+"""Kardiyak Görüntü Değerlendirme Platformu çekirdeği
+
+Streamlit arayüzünden bağımsız, içe aktarılabilir modüller: depolama arka uçları
+(Drive, yerel dizin, S3), görüntü önbelleği ve manifesti, ön yükleme, oturum günlüğü ve puanlama. Arayüz kodu
+streamlit_app.py içindedir ve her tıklamada yalnızca bu modüllerin önceden
+içe aktarılmış fonksiyonlarını çağırır.
+"""
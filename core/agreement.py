@@ -0,0 +1,218 @@
+"""Çok değerlendiricili uyum analizi (APA puanları)
+
+Herhangi sayıda radyoloğun sonuç dosyası Drive görüntü ID'sine göre tek bir puan
+tensörüne (özellik x değerlendirici x görüntü) dönüştürülür; eksik puanlar 0 ile
+gösterilir. Tüm metrikler bu tensör üzerinde vektörel hesaplanır:
+
+- Çift bazında ağırlıklı Cohen's kappa matrisi: tüm çiftlerin karışıklık
+  matrisleri tek bir matris çarpımıyla elde edilir
+- Fleiss' kappa (görüntü başına değerlendirici sayısı değişebilir)
+- Krippendorff's alpha (sıralı/ordinal ölçek, eksik veriye dayanıklı)
+"""
+import os
+
+import numpy as np
+
+from core.config import APA_FEATURES
+from core.scoring import feature_key
+
+SCORE_CATEGORIES = 5  # 1-5 Likert ölçeği
+
+def result_image_keys(df):
+    """Sonuç satırlarının görüntü anahtarları: Drive ID, yoksa dosya adı
+    
+    Eski sonuç dosyalarında image_id boş olabilir; image_path ise geçici bir yol
+    olabileceğinden yalnızca dosya adı kullanılır.
+    """
+    import pandas as pd
+    
+    names = df['image_path'].astype(str).map(os.path.basename) if 'image_path' in df else pd.Series('', index=df.index)
+    if 'image_id' not in df:
+        return names
+    ids = df['image_id'].astype(str).replace('nan', '')
+    return ids.where(ids != '', names)
+
+def build_rating_tensor(frames, features=APA_FEATURES):
+    """Sonuç tablolarından (özellik, değerlendirici, görüntü) puan tensörü kur
+    
+    Değerlendirici radiologist_id sütunundan gelir; aynı radyoloğun birden fazla
+    dosyası tek değerlendirici sayılır ve aynı görüntüye verilen son puan geçerlidir.
+    Dönüş: (ratings uint8 dizisi, değerlendiriciler, görüntü anahtarları)
+    """
+    import pandas as pd
+    
+    columns = [feature_key(feature) for feature in features]
+    parts = []
+    for i, df in enumerate(frames):
+        if 'radiologist_id' in df:
+            raters = df['radiologist_id'].astype(str)
+        else:
+            raters = pd.Series(f"Radyolog {i + 1}", index=df.index)
+        part = pd.DataFrame({'rater': raters.values, 'image': result_image_keys(df).values})
+        for column in columns:
+            part[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype(np.uint8).values
+        parts.append(part)
+    
+    combined = pd.concat(parts, ignore_index=True)
+    rater_codes, raters = pd.factorize(combined['rater'], sort=True)
+    image_codes, images = pd.factorize(combined['image'], sort=True)
+    
+    ratings = np.zeros((len(columns), len(raters), len(images)), dtype=np.uint8)
+    for f, column in enumerate(columns):
+        # Sıralı atamada aynı hücreye yazılan son değer kalır
+        ratings[f, rater_codes, image_codes] = combined[column].values
+    ratings[ratings > SCORE_CATEGORIES] = 0
+    
+    return ratings, list(raters), list(images)
+
+def _one_hot(ratings):
+    """(değerlendirici, görüntü) puanlarını (değerlendirici, görüntü, kategori) 0/1 dizisine çevir"""
+    categories = np.arange(1, SCORE_CATEGORIES + 1, dtype=ratings.dtype)
+    return (ratings[..., np.newaxis] == categories).astype(np.float64)
+
+def agreement_weights(weights='linear'):
+    """Ağırlıklı kappa için uyumsuzluk ağırlıkları (K x K)"""
+    idx = np.arange(SCORE_CATEGORIES)
+    distance = np.abs(idx[:, np.newaxis] - idx[np.newaxis, :]).astype(np.float64)
+    if weights == 'linear':
+        return distance
+    if weights == 'quadratic':
+        return distance ** 2
+    return (distance > 0).astype(np.float64)
+
+def kappa_from_confusion(observed, weights='linear'):
+    """Karışıklık matris(ler)inden ağırlıklı kappa; (..., K, K) yığınlarını da kabul eder"""
+    counts = observed.sum(axis=(-2, -1))
+    row_marginals = observed.sum(axis=-1)
+    col_marginals = observed.sum(axis=-2)
+    w = agreement_weights(weights)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = row_marginals[..., :, np.newaxis] * col_marginals[..., np.newaxis, :] / counts[..., np.newaxis, np.newaxis]
+        kappa = 1 - (observed * w).sum(axis=(-2, -1)) / (expected * w).sum(axis=(-2, -1))
+    
+    return np.where(counts > 0, kappa, np.nan)
+
+def pairwise_weighted_kappa(ratings, weights='linear'):
+    """Tüm değerlendirici çiftleri için ağırlıklı Cohen's kappa matrisi (R x R)
+    
+    ratings: (değerlendirici, görüntü) dizisi, 0 eksik puan. Her çift yalnızca
+    ikisinin de puanladığı görüntüler üzerinden hesaplanır; ortak görüntüsü
+    olmayan veya tek kategori kullanan çiftler NaN olur.
+    """
+    n_raters, _ = ratings.shape
+    k = SCORE_CATEGORIES
+    one_hot = _one_hot(ratings)
+    flat = one_hot.transpose(0, 2, 1).reshape(n_raters * k, -1)
+    
+    # observed[a, b, i, j]: a'nın i, b'nin j puanı verdiği ortak görüntü sayısı
+    observed = (flat @ flat.T).reshape(n_raters, k, n_raters, k).transpose(0, 2, 1, 3)
+    return kappa_from_confusion(observed, weights)
+
+def pair_confusion_terms(rater_a, rater_b):
+    """İki değerlendiricinin ortak görüntüleri için görüntü başına karışıklık hücresi (N x K*K, 0/1)
+    
+    Satırların toplamı karışıklık matrisini verir; bootstrap'te satırlar yeniden
+    örnekleme ağırlıklarıyla toplanır.
+    """
+    both = (rater_a > 0) & (rater_b > 0)
+    cells = (rater_a[both].astype(np.int64) - 1) * SCORE_CATEGORIES + (rater_b[both].astype(np.int64) - 1)
+    terms = np.zeros((len(cells), SCORE_CATEGORIES * SCORE_CATEGORIES))
+    terms[np.arange(len(cells)), cells] = 1
+    return terms
+
+def category_counts(ratings):
+    """Her görüntünün kaç kez hangi kategoriyle puanlandığı (görüntü x kategori)"""
+    return _one_hot(ratings).sum(axis=0)
+
+def pairable_counts(ratings):
+    """En az iki puan almış görüntülerin kategori sayıları (görüntü x kategori)"""
+    counts = category_counts(ratings)
+    return counts[counts.sum(axis=1) >= 2]
+
+def fleiss_item_agreement(counts):
+    """Fleiss' kappa için görüntü başına gözlenen uyum oranı"""
+    per_item = counts.sum(axis=1)
+    return ((counts ** 2).sum(axis=1) - per_item) / (per_item * (per_item - 1))
+
+def fleiss_from_totals(agreement_total, item_total, category_totals):
+    """Toplam görüntü uyumu, görüntü sayısı ve kategori toplamlarından Fleiss' kappa (yığın destekli)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        proportions = category_totals / category_totals.sum(axis=-1, keepdims=True)
+        chance = (proportions ** 2).sum(axis=-1)
+        return (agreement_total / item_total - chance) / (1 - chance)
+
+def fleiss_kappa(ratings):
+    """Fleiss' kappa (nominal); en az iki puan almış görüntüler kullanılır"""
+    counts = pairable_counts(ratings)
+    if len(counts) == 0:
+        return float('nan')
+    return float(fleiss_from_totals(fleiss_item_agreement(counts).sum(), len(counts), counts.sum(axis=0)))
+
+def coincidence_terms(counts):
+    """Krippendorff rastlantı matrisine görüntü başına katkılar (görüntü x K*K)"""
+    per_item = counts.sum(axis=1)
+    scaled = counts / (per_item - 1)[:, np.newaxis]
+    terms = scaled[:, :, np.newaxis] * counts[:, np.newaxis, :]
+    idx = np.arange(SCORE_CATEGORIES)
+    terms[:, idx, idx] -= scaled
+    return terms.reshape(len(counts), -1)
+
+def alpha_from_coincidence(coincidence):
+    """Rastlantı matris(ler)inden sıralı Krippendorff's alpha; (..., K, K) yığınlarını da kabul eder"""
+    category_totals = coincidence.sum(axis=-1)
+    total = category_totals.sum(axis=-1)
+    
+    # Sıralı uzaklık: iki kategori arasındaki (yarım sınırlı) kümülatif frekansın karesi
+    cumulative = np.concatenate([np.zeros(category_totals.shape[:-1] + (1,)), np.cumsum(category_totals, axis=-1)], axis=-1)
+    idx = np.arange(SCORE_CATEGORIES)
+    low = np.minimum(idx[:, np.newaxis], idx[np.newaxis, :])
+    high = np.maximum(idx[:, np.newaxis], idx[np.newaxis, :])
+    span = cumulative[..., high + 1] - cumulative[..., low]
+    distance = (span - (category_totals[..., low] + category_totals[..., high]) / 2) ** 2
+    
+    expected = (category_totals[..., :, np.newaxis] * category_totals[..., np.newaxis, :] * distance).sum(axis=(-2, -1))
+    observed = (coincidence * distance).sum(axis=(-2, -1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(expected > 0, 1 - (total - 1) * observed / expected, np.nan)
+
+def krippendorff_alpha_ordinal(ratings):
+    """Sıralı ölçek için Krippendorff's alpha; en az iki puan almış görüntüler kullanılır"""
+    counts = pairable_counts(ratings)
+    if len(counts) == 0:
+        return float('nan')
+    coincidence = coincidence_terms(counts).sum(axis=0).reshape(SCORE_CATEGORIES, SCORE_CATEGORIES)
+    return float(alpha_from_coincidence(coincidence))
+
+def compute_agreement(frames, features=APA_FEATURES, weights='linear'):
+    """Her APA özelliği için çok değerlendiricili uyum metriklerini hesapla
+    
+    Dönüş: {'raters', 'images', 'ratings' (puan tensörü), 'features': {özellik: {'pairwise_kappa' (R x R),
+    'mean_pairwise_kappa', 'fleiss_kappa', 'krippendorff_alpha', 'rated_items',
+    'mean_scores' (değerlendirici başına), 'score_counts' (1-5)}}}
+    """
+    ratings, raters, images = build_rating_tensor(frames, features)
+    upper = np.triu_indices(len(raters), k=1)
+    
+    summary = {'raters': raters, 'images': images, 'ratings': ratings, 'features': {}}
+    for f, feature in enumerate(features):
+        feature_ratings = ratings[f]
+        rated = feature_ratings > 0
+        pairwise = pairwise_weighted_kappa(feature_ratings, weights=weights)
+        pair_values = pairwise[upper]
+        with np.errstate(invalid='ignore'):
+            mean_scores = np.where(rated.any(axis=1),
+                                   feature_ratings.sum(axis=1) / np.maximum(rated.sum(axis=1), 1),
+                                   np.nan)
+        
+        summary['features'][feature] = {
+            'pairwise_kappa': pairwise,
+            'mean_pairwise_kappa': float(np.nanmean(pair_values)) if np.isfinite(pair_values).any() else float('nan'),
+            'fleiss_kappa': fleiss_kappa(feature_ratings),
+            'krippendorff_alpha': krippendorff_alpha_ordinal(feature_ratings),
+            'rated_items': int((rated.sum(axis=0) >= 2).sum()),
+            'mean_scores': mean_scores,
+            'score_counts': np.bincount(feature_ratings[rated], minlength=SCORE_CATEGORIES + 1)[1:],
+        }
+    
+    return summary
@@ -0,0 +1,121 @@
+"""Sonuç grafikleri: bir kez çizilip PNG baytları olarak önbelleğe alınan figürler
+
+Figürler pyplot yerine doğrudan matplotlib.figure.Figure ile oluşturulur ve Agg
+tuvalinde çizilir; pyplot'un global figür kaydına girmedikleri için uzun süre
+çalışan sunucuda birikmezler ve çizimden sonra hemen serbest bırakılırlar.
+Bitiş ekranı grafikleri sonuçların içerik özetiyle (ResultStore.digest)
+anahtarlanır; aynı PNG baytları hem ekranda (st.image) hem Drive'a yüklenen
+dosyada kullanılır ve yeniden çalıştırmalarda grafikler yeniden çizilmez.
+Çizim CPU iş havuzunda (core/workers.py) yapılır.
+"""
+import io
+
+import streamlit as st
+
+from core.config import APA_FEATURES, CHART_CACHE_MAX_ENTRIES, CHART_DPI
+from core.metrics import span
+from core.workers import run_cpu
+
+def new_figure(figsize):
+    """pyplot'a kaydedilmeyen yeni bir figür"""
+    from matplotlib.figure import Figure
+    
+    return Figure(figsize=figsize)
+
+def figure_to_png(fig, dpi=CHART_DPI):
+    """Figürü Agg tuvalinde PNG baytlarına çiz ve figürü temizle"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    try:
+        FigureCanvasAgg(fig)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=dpi)
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+def vtt_summary_figure(accuracy, sensitivity, specificity):
+    """Görüntü türüne göre doğruluk (çubuk) ve genel doğru/yanlış oranı (pasta)"""
+    fig = new_figure((12, 10))
+    ax1, ax2 = fig.subplots(2, 1)
+    
+    # Üst grafik: Görüntü türüne göre doğruluk
+    ax1.bar(['Gerçek Görüntüler', 'Sentetik Görüntüler'], [sensitivity * 100, specificity * 100],
+            color=['#2986cc', '#e06666'])
+    ax1.set_ylim([0, 100])
+    ax1.set_ylabel('Doğruluk Oranı (%)')
+    ax1.set_title('Görüntü Türüne Göre Doğruluk')
+    
+    # Alt grafik: Doğru/Yanlış oranı pasta grafiği
+    ax2.pie([accuracy, 100 - accuracy], explode=(0.1, 0), labels=['Doğru', 'Yanlış'], autopct='%1.1f%%',
+            shadow=True, startangle=90, colors=['#60bd68', '#f15854'])
+    ax2.axis('equal')  # Daire şeklinde olmasını sağla
+    ax2.set_title('Genel Doğruluk Oranı')
+    
+    fig.tight_layout()
+    return fig
+
+def apa_mean_scores_figure(mean_scores):
+    """APA özelliklerinin ortalama puanları (değerleri yazılı çubuk grafik)"""
+    fig = new_figure((12, 8))
+    ax = fig.subplots()
+    values = [mean_scores[feature] for feature in APA_FEATURES]
+    bars = ax.bar(APA_FEATURES, values, color='#2986cc')
+    
+    # Çubukların üzerine değerleri ekle
+    for bar, val in zip(bars, values):
+        ax.text(bar.get_x() + bar.get_width() / 2, val + 0.1, f'{val:.2f}',
+                ha='center', va='bottom', fontweight='bold')
+    
+    ax.set_ylim([0, 5.5])
+    ax.set_ylabel('Ortalama Puan', fontsize=12)
+    ax.set_title('Anatomik Olabilirlik Puanları', fontsize=16)
+    ax.tick_params(axis='x', labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+    
+    fig.tight_layout()
+    return fig
+
+def apa_score_distribution_figure(score_distribution):
+    """Her özellik için 1-5 puanlarının yüzde dağılımı (ısı haritası)"""
+    import numpy as np
+    import seaborn as sns
+    
+    counts = np.array([score_distribution[feature] for feature in APA_FEATURES], dtype=float)
+    data_percent = counts / np.maximum(counts.sum(axis=1), 1)[:, np.newaxis] * 100
+    
+    fig = new_figure((10, 8))
+    ax = fig.subplots()
+    sns.heatmap(data_percent, annot=True, fmt='.1f', cmap='YlGnBu',
+                xticklabels=['1', '2', '3', '4', '5'], yticklabels=APA_FEATURES, ax=ax)
+    ax.set_title('Puan Dağılımı (% olarak)')
+    ax.set_xlabel('5 Basamaklı Likert Ölçeğinde Puan')
+    
+    fig.tight_layout()
+    return fig
+
+def render_vtt_charts(accuracy, sensitivity, specificity):
+    """VTT bitiş ekranı grafiklerinin PNG baytları (süreç havuzunda çalışır)"""
+    return {'summary': figure_to_png(vtt_summary_figure(accuracy, sensitivity, specificity))}
+
+def render_apa_charts(mean_scores, score_distribution):
+    """APA bitiş ekranı grafiklerinin PNG baytları (süreç havuzunda çalışır)"""
+    return {
+        'summary': figure_to_png(apa_mean_scores_figure(mean_scores)),
+        'distribution': figure_to_png(apa_score_distribution_figure(score_distribution)),
+    }
+
+@st.cache_data(max_entries=CHART_CACHE_MAX_ENTRIES, show_spinner=False)
+def finish_charts(test_type, results_digest, _stats):
+    """Bitiş ekranı grafiklerinin PNG baytları: {'summary': ..., ('distribution': ...)}
+    
+    Önbellek anahtarı test türü ve sonuçların içerik özetidir; _stats (RunningStats)
+    anahtara girmez, yalnızca özet ilk kez görüldüğünde çizim için okunur.
+    """
+    with span("chart.render", test=test_type):
+        if test_type == 'vtt':
+            metrics = _stats.vtt_metrics()
+            return run_cpu(render_vtt_charts, metrics['accuracy'], metrics['sensitivity'], metrics['specificity'])
+        
+        return run_cpu(render_apa_charts, _stats.apa_means(), _stats.apa_score_distribution())
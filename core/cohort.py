@@ -0,0 +1,263 @@
+"""Tüm Görsel Turing Testi oturumlarının kohort düzeyinde analizi
+
+Her sonuç dosyası (yerel klasör veya Drive sonuç klasörü) bir kez okunup küçük bir
+kısmi özete dönüştürülür: okuyucu başına karışıklık matrisi hücreleri, görüntü
+başına gösterim ve "gerçek" denme sayıları, okuyucu-görüntü cevapları. Özetler
+dosya sürümüyle (yerelde değiştirilme zamanı ve boyut, Drive'da md5/sürüm)
+önbellekte tutulur; yenilemede yalnızca yeni veya değişmiş dosyalar okunur ve
+kohort sonuçları yalnızca dosya kümesi değiştiğinde yeniden birleştirilir. Yerel
+Parquet oturumlarından okunması gerekenler tek bir sütunlu taramayla, yalnızca
+özetin kullandığı sütunlar okunarak yüklenir.
+"""
+import os
+import threading
+
+import numpy as np
+import streamlit as st
+
+from core.agreement import fleiss_kappa, pairwise_weighted_kappa, result_image_keys
+from core.confidence import clopper_pearson_interval
+from core.results import PARQUET_EXTENSION, read_results, read_results_by_file, read_results_dataset
+from core.scoring import REAL
+
+VTT_RESULT_PREFIX = "vtt_sonuclari_"
+RESULT_EXTENSIONS = ('.csv', PARQUET_EXTENSION)
+
+# Uyum hesabında sınıflandırmalar 1-5 ölçeğinin ilk iki kategorisine yerleştirilir
+SYNTHETIC_CODE = 1
+REAL_CODE = 2
+
+# Kısmi özetin okuduğu sonuç sütunları
+SUMMARY_COLUMNS = ['radiologist_id', 'image_path', 'image_id', 'true_type', 'classified_as', 'response_time']
+
+def session_name(file_name):
+    """Sonuç dosyasının uzantısız oturum adı (CSV ve Parquet kopyaları aynı adı taşır)"""
+    return os.path.splitext(os.path.basename(file_name))[0]
+
+def is_vtt_result_file(file_name):
+    """Dosya adı bir VTT sonuç dosyasına mı ait"""
+    name = os.path.basename(file_name)
+    return name.startswith(VTT_RESULT_PREFIX) and name.lower().endswith(RESULT_EXTENSIONS)
+
+def prefer_parquet(named_sources):
+    """(dosya adı, kaynak) çiftlerini oturum adına göre tekilleştir; Parquet kopyası CSV'ye tercih edilir"""
+    sessions = {}
+    for file_name, source in named_sources:
+        name = session_name(file_name)
+        if name in sessions and not file_name.lower().endswith(PARQUET_EXTENSION):
+            continue
+        sessions[name] = source
+    return sessions
+
+class LocalParquetSource:
+    """Yerel bir Parquet oturum dosyasının yükleyicisi
+    
+    Tek başına çağrıldığında dosyayı okur; CohortCache okunması gereken bu tür
+    kaynakları read_results_by_file ile tek taramada toplu okur.
+    """
+    
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+    
+    def __call__(self):
+        return read_results_dataset([self.path], 'vtt', columns=SUMMARY_COLUMNS)
+
+def load_sources(loads):
+    """{oturum adı: yükleyici} için {oturum adı: DataFrame veya hata} döndür
+    
+    Birden fazla yerel Parquet oturumu tek taramada okunur; tarama başarısız olursa
+    ya da bir dosyada satır yoksa o oturumlar tek tek okunur.
+    """
+    parquet = {name: load for name, load in loads.items() if isinstance(load, LocalParquetSource)}
+    scanned = {}
+    if len(parquet) > 1:
+        try:
+            scanned = read_results_by_file([load.path for load in parquet.values()], 'vtt', columns=SUMMARY_COLUMNS)
+        except Exception:
+            scanned = {}
+    
+    frames = {}
+    for name, load in loads.items():
+        df = scanned.get(load.path) if name in parquet else None
+        try:
+            frames[name] = df if df is not None else load()
+        except Exception as e:
+            frames[name] = e
+    return frames
+
+def local_result_sources(output_dir):
+    """Yerel sonuç klasöründeki VTT oturumları: {oturum adı: (sürüm, yükleyici)}"""
+    if not os.path.isdir(output_dir):
+        return {}
+    
+    named_sources = []
+    for entry in os.scandir(output_dir):
+        if not (entry.is_file() and is_vtt_result_file(entry.name)):
+            continue
+        stat = entry.stat()
+        version = f"local:{stat.st_mtime_ns}:{stat.st_size}"
+        if entry.name.lower().endswith(PARQUET_EXTENSION):
+            load = LocalParquetSource(entry.path)
+        else:
+            load = lambda path=entry.path: read_results(path)
+        named_sources.append((entry.name, (version, load)))
+    return prefer_parquet(named_sources)
+
+def summarize_vtt_results(df):
+    """Tek bir sonuç dosyasının birleştirilebilir kısmi özeti
+    
+    Dönüş: {'readers': okuyucu başına [n, doğru, dp, yn, dn, yp] sayıları,
+    'images': görüntü başına [gerçek mi, gösterim, gerçek denme],
+    'answers': okuyucu, görüntü, gerçek dendi mi, okuma süresi}
+    """
+    import pandas as pd
+    
+    true_real = (df['true_type'].astype(str) == REAL).to_numpy()
+    classified_real = (df['classified_as'].astype(str) == REAL).to_numpy()
+    answers = pd.DataFrame({
+        'reader': df['radiologist_id'].astype(str).to_numpy(),
+        'image': result_image_keys(df).to_numpy(),
+        'true_real': true_real,
+        'classified_real': classified_real,
+        'response_time': pd.to_numeric(df['response_time'], errors='coerce').to_numpy()
+                         if 'response_time' in df else np.nan,
+    })
+    
+    counts = pd.DataFrame({
+        'reader': answers['reader'],
+        'answers': 1,
+        'correct': true_real == classified_real,
+        'true_positive': true_real & classified_real,
+        'false_negative': true_real & ~classified_real,
+        'true_negative': ~true_real & ~classified_real,
+        'false_positive': ~true_real & classified_real,
+    })
+    readers = counts.groupby('reader').sum().astype(np.int64)
+    
+    images = answers.groupby('image').agg(
+        true_real=('true_real', 'first'),
+        shown=('true_real', 'size'),
+        classified_real=('classified_real', 'sum'),
+    )
+    
+    return {
+        'readers': readers,
+        'images': images,
+        'answers': answers[['reader', 'image', 'classified_real', 'response_time']],
+    }
+
+def _rate(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / np.maximum(denominator, 1), np.nan)
+
+def combine_vtt_summaries(summaries):
+    """Kısmi özetleri kohort sonuçlarında birleştir
+    
+    Dönüş: {'sessions', 'readers' (okuyucu başına doğruluk/duyarlılık/özgüllük),
+    'pooled' (toplam sayılar, doğruluk ve kesin binom aralığı), 'images' (sentetik
+    görüntüler için kandırma oranı dahil), 'response_times' (cevap başına okuyucu ve
+    okuma süresi), 'reader_ids', 'pairwise_kappa', 'fleiss_kappa'}
+    """
+    import pandas as pd
+    
+    if not summaries:
+        return None
+    
+    readers = pd.concat([s['readers'] for s in summaries]).groupby(level=0).sum()
+    readers['accuracy'] = _rate(readers['correct'], readers['answers'])
+    readers['sensitivity'] = _rate(readers['true_positive'], readers['true_positive'] + readers['false_negative'])
+    readers['specificity'] = _rate(readers['true_negative'], readers['true_negative'] + readers['false_positive'])
+    
+    totals = readers[['answers', 'correct', 'true_positive', 'false_negative', 'true_negative', 'false_positive']].sum()
+    pooled = {name: int(value) for name, value in totals.items()}
+    pooled['accuracy'] = pooled['correct'] / pooled['answers'] if pooled['answers'] else float('nan')
+    pooled['accuracy_interval'] = clopper_pearson_interval(pooled['correct'], pooled['answers'])
+    positives = pooled['true_positive'] + pooled['false_negative']
+    negatives = pooled['true_negative'] + pooled['false_positive']
+    pooled['sensitivity'] = pooled['true_positive'] / positives if positives else float('nan')
+    pooled['specificity'] = pooled['true_negative'] / negatives if negatives else float('nan')
+    
+    images = pd.concat([s['images'] for s in summaries]).groupby(level=0).agg(
+        true_real=('true_real', 'first'),
+        shown=('shown', 'sum'),
+        classified_real=('classified_real', 'sum'),
+    )
+    # Kandırma oranı: sentetik görüntünün gerçek sanılma oranı
+    images['fooling_rate'] = np.where(~images['true_real'], _rate(images['classified_real'], images['shown']), np.nan)
+    
+    # Okuyucular arası uyum: her okuyucunun bir görüntüye son cevabı
+    answers = pd.concat([s['answers'] for s in summaries], ignore_index=True)
+    response_times = answers[['reader', 'response_time']].dropna().rename(columns={'reader': 'radiologist_id'})
+    answers = answers.drop_duplicates(['reader', 'image'], keep='last')
+    reader_codes, reader_ids = pd.factorize(answers['reader'], sort=True)
+    image_codes, _ = pd.factorize(answers['image'])
+    ratings = np.zeros((len(reader_ids), image_codes.max() + 1 if len(image_codes) else 0), dtype=np.uint8)
+    ratings[reader_codes, image_codes] = np.where(answers['classified_real'].to_numpy(), REAL_CODE, SYNTHETIC_CODE)
+    
+    return {
+        'sessions': len(summaries),
+        'readers': readers,
+        'pooled': pooled,
+        'images': images,
+        'response_times': response_times,
+        'reader_ids': list(reader_ids),
+        'pairwise_kappa': pairwise_weighted_kappa(ratings, weights='nominal'),
+        'fleiss_kappa': fleiss_kappa(ratings),
+    }
+
+class CohortCache:
+    """Sonuç dosyalarının kısmi özetlerini sürümleriyle tutan, artımlı güncellenen önbellek
+    
+    update() {oturum adı: (sürüm, yükleyici)} alır; yalnızca yeni veya sürümü değişmiş
+    oturumların yükleyicisi çağrılır, kaynaklarda artık olmayan oturumlar çıkarılır.
+    Birleştirilmiş sonuç, oturum/sürüm kümesi değişmedikçe yeniden hesaplanmaz.
+    """
+    
+    def __init__(self):
+        self.summaries = {}  # oturum adı -> (sürüm, kısmi özet)
+        self.lock = threading.Lock()
+        self.combined = None
+        self.combined_state = None
+    
+    def update(self, sources):
+        """Kaynaklarla eşitle; dönüş: {'read', 'cached', 'removed', 'errors'}"""
+        stats = {'read': 0, 'cached': 0, 'removed': 0, 'errors': []}
+        
+        with self.lock:
+            for name in set(self.summaries) - set(sources):
+                del self.summaries[name]
+                stats['removed'] += 1
+            
+            stale = {}
+            for name, (version, load) in sources.items():
+                cached = self.summaries.get(name)
+                if cached is not None and cached[0] == version:
+                    stats['cached'] += 1
+                else:
+                    stale[name] = load
+            
+            for name, df in load_sources(stale).items():
+                if isinstance(df, Exception):
+                    stats['errors'].append((name, str(df)))
+                    continue
+                try:
+                    self.summaries[name] = (sources[name][0], summarize_vtt_results(df))
+                    stats['read'] += 1
+                except Exception as e:
+                    stats['errors'].append((name, str(e)))
+        
+        return stats
+    
+    def result(self):
+        """Birleştirilmiş kohort sonuçları (dosya kümesi değişmediyse önceki hesap)"""
+        with self.lock:
+            state = frozenset((name, version) for name, (version, _) in self.summaries.items())
+            if state != self.combined_state:
+                self.combined = combine_vtt_summaries([summary for _, summary in self.summaries.values()])
+                self.combined_state = state
+            return self.combined
+
+@st.cache_resource
+def get_cohort_cache():
+    """Oturumlar arasında paylaşılan kohort önbelleği"""
+    return CohortCache()
@@ -0,0 +1,213 @@
+"""Güven aralıkları: kesin (Clopper-Pearson) binom aralıkları ve vektörel bootstrap
+
+Bootstrap yeniden örneklemeleri Python döngüsüyle değil, tek bir (örnekleme x n)
+indeks matrisi olarak üretilir. İndeks matrisi np.bincount ile her örneklemede her
+gözlemin kaç kez seçildiğini gösteren bir ağırlık matrisine çevrilir; bu sayede
+her istatistik gözlem başına terimlerin ağırlıklı toplamına (tek bir matris
+çarpımına) indirgenir. Bellek sınırı için örneklemeler parçalar halinde işlenir.
+"""
+import numpy as np
+
+from core.agreement import (
+    SCORE_CATEGORIES,
+    alpha_from_coincidence,
+    coincidence_terms,
+    fleiss_from_totals,
+    fleiss_item_agreement,
+    category_counts,
+    kappa_from_confusion,
+    pair_confusion_terms,
+)
+from core.config import BOOTSTRAP_CHUNK_ELEMENTS, BOOTSTRAP_RESAMPLES, BOOTSTRAP_SEED, CONFIDENCE_LEVEL
+
+def _binomial_cdf(k, n, p):
+    """P(X <= k), X ~ Binom(n, p); p dizisi üzerinde vektörel"""
+    p = np.asarray(p, dtype=np.float64)
+    if k < 0:
+        return np.zeros_like(p)
+    if k >= n:
+        return np.ones_like(p)
+    i = np.arange(k + 1)
+    # log C(n, i) kümülatif toplamla: log C(n, i) = log C(n, i-1) + log(n-i+1) - log(i)
+    log_coefficients = np.concatenate([[0.0], np.cumsum(np.log(n - i[1:] + 1) - np.log(i[1:]))])
+    log_terms = (log_coefficients[:, np.newaxis]
+                 + i[:, np.newaxis] * np.log(p)[np.newaxis, :]
+                 + (n - i)[:, np.newaxis] * np.log1p(-p)[np.newaxis, :])
+    return np.exp(np.logaddexp.reduce(log_terms, axis=0))
+
+def clopper_pearson_interval(successes, trials, confidence=CONFIDENCE_LEVEL):
+    """Başarı oranı için kesin (Clopper-Pearson) binom güven aralığı; (alt, üst)"""
+    if trials <= 0:
+        return (float('nan'), float('nan'))
+    tail = (1 - confidence) / 2
+    
+    # Binom kuyruk olasılıkları p'ye göre monotondur; sınırlar ikiye bölme ile bulunur
+    # Alt sınır: P(X >= k | p) = tail, üst sınır: P(X <= k | p) = tail
+    low, high = np.zeros(2), np.ones(2)
+    for _ in range(60):
+        mid = (low + high) / 2
+        upper_tail = 1 - _binomial_cdf(successes - 1, trials, mid[:1])[0]
+        lower_tail = _binomial_cdf(successes, trials, mid[1:])[0]
+        low = np.where([upper_tail < tail, lower_tail > tail], mid, low)
+        high = np.where([upper_tail < tail, lower_tail > tail], high, mid)
+    
+    lower = 0.0 if successes == 0 else float((low[0] + high[0]) / 2)
+    upper = 1.0 if successes == trials else float((low[1] + high[1]) / 2)
+    return (lower, upper)
+
+def bootstrap_weights(n, n_resamples=BOOTSTRAP_RESAMPLES, seed=BOOTSTRAP_SEED,
+                      chunk_elements=BOOTSTRAP_CHUNK_ELEMENTS):
+    """n gözlem için bootstrap ağırlık matrislerini (örnekleme x n) parçalar halinde üret
+
+    Her parça tek bir indeks matrisinden elde edilir: w[b, i], i. gözlemin b.
+    örneklemede kaç kez seçildiğidir.
+    """
+    rng = np.random.default_rng(seed)
+    chunk = max(1, min(n_resamples, chunk_elements // max(n, 1)))
+    for start in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - start)
+        indices = rng.integers(0, n, size=(size, n))
+        offsets = (np.arange(size) * n)[:, np.newaxis]
+        counts = np.bincount((indices + offsets).ravel(), minlength=size * n)
+        yield counts.reshape(size, n).astype(np.float64)
+
+def bootstrap_sums(terms, n_resamples=BOOTSTRAP_RESAMPLES, seed=BOOTSTRAP_SEED):
+    """Gözlem başına terimlerin (n x m) her bootstrap örneklemindeki toplamları (örnekleme x m)"""
+    terms = np.asarray(terms, dtype=np.float64)
+    if terms.ndim == 1:
+        terms = terms[:, np.newaxis]
+    return np.concatenate([weights @ terms for weights in bootstrap_weights(len(terms), n_resamples, seed)])
+
+def percentile_interval(samples, confidence=CONFIDENCE_LEVEL):
+    """Bootstrap dağılımından yüzdelik güven aralığı; son eksen dışındaki eksenler korunur"""
+    tail = (1 - confidence) / 2 * 100
+    samples = np.asarray(samples, dtype=np.float64)
+    if not np.isfinite(samples).any():
+        nan = np.full(samples.shape[1:], np.nan)
+        return nan, nan
+    low, high = np.nanpercentile(samples, [tail, 100 - tail], axis=0)
+    return low, high
+
+def _interval(estimate, samples, confidence, exact=None):
+    low, high = percentile_interval(samples, confidence)
+    interval = {'estimate': float(estimate), 'bootstrap': (float(low), float(high))}
+    if exact is not None:
+        interval['exact'] = exact
+    return interval
+
+def vtt_confidence_intervals(true_real, classified_real, n_resamples=BOOTSTRAP_RESAMPLES,
+                             confidence=CONFIDENCE_LEVEL, seed=BOOTSTRAP_SEED):
+    """Doğruluk, duyarlılık ve özgüllük için kesin binom ve bootstrap aralıkları (oran olarak)
+
+    true_real / classified_real: her cevap için görüntünün gerçek olup olmadığı ve
+    gerçek olarak sınıflandırılıp sınıflandırılmadığı (bool dizileri).
+    Dönüş: {metrik: {'estimate', 'exact': (alt, üst), 'bootstrap': (alt, üst)}}
+    """
+    true_real = np.asarray(true_real, dtype=bool)
+    classified_real = np.asarray(classified_real, dtype=bool)
+    if len(true_real) == 0:
+        return {}
+    
+    # Gözlem başına terimler: [doğru, gerçek, doğru pozitif, sentetik, doğru negatif]
+    terms = np.column_stack([
+        true_real == classified_real,
+        true_real,
+        true_real & classified_real,
+        ~true_real,
+        ~true_real & ~classified_real,
+    ])
+    totals = terms.sum(axis=0)
+    sums = bootstrap_sums(terms, n_resamples, seed)
+    n = len(true_real)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        samples = {
+            'accuracy': sums[:, 0] / n,
+            'sensitivity': sums[:, 2] / sums[:, 1],
+            'specificity': sums[:, 4] / sums[:, 3],
+        }
+    counts = {
+        'accuracy': (totals[0], n),
+        'sensitivity': (totals[2], totals[1]),
+        'specificity': (totals[4], totals[3]),
+    }
+    
+    intervals = {}
+    for metric, (successes, trials) in counts.items():
+        estimate = successes / trials if trials else float('nan')
+        exact = clopper_pearson_interval(int(successes), int(trials), confidence)
+        intervals[metric] = _interval(estimate, samples[metric], confidence, exact=exact)
+    return intervals
+
+def mean_confidence_intervals(scores, n_resamples=BOOTSTRAP_RESAMPLES,
+                              confidence=CONFIDENCE_LEVEL, seed=BOOTSTRAP_SEED):
+    """Sütun ortalamaları (ör. APA özellik puanları, n x özellik) için bootstrap aralıkları
+
+    Dönüş: sütun başına {'estimate', 'bootstrap': (alt, üst)} listesi
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.ndim == 1:
+        scores = scores[:, np.newaxis]
+    if len(scores) == 0:
+        return []
+    samples = bootstrap_sums(scores, n_resamples, seed) / len(scores)
+    estimates = scores.mean(axis=0)
+    return [_interval(estimates[j], samples[:, j], confidence) for j in range(scores.shape[1])]
+
+def weighted_kappa_interval(rater_a, rater_b, weights='linear', n_resamples=BOOTSTRAP_RESAMPLES,
+                            confidence=CONFIDENCE_LEVEL, seed=BOOTSTRAP_SEED):
+    """İki değerlendirici arasındaki ağırlıklı kappa için bootstrap aralığı (ortak görüntüler üzerinden)"""
+    terms = pair_confusion_terms(np.asarray(rater_a), np.asarray(rater_b))
+    if len(terms) == 0:
+        return _interval(float('nan'), [np.nan], confidence)
+    k = SCORE_CATEGORIES
+    estimate = kappa_from_confusion(terms.sum(axis=0).reshape(k, k), weights)
+    samples = kappa_from_confusion(bootstrap_sums(terms, n_resamples, seed).reshape(-1, k, k), weights)
+    return _interval(estimate, samples, confidence)
+
+def agreement_confidence_intervals(ratings, n_resamples=BOOTSTRAP_RESAMPLES,
+                                   confidence=CONFIDENCE_LEVEL, seed=BOOTSTRAP_SEED):
+    """Her özellik için Fleiss' kappa ve sıralı Krippendorff's alpha bootstrap aralıkları
+
+    ratings: (özellik, değerlendirici, görüntü) puan tensörü. Yeniden örnekleme birimi
+    görüntüdür; tüm özellikler ve iki metrik aynı ağırlık matrisiyle tek seferde
+    hesaplanır. En az iki puan almamış görüntülerin terimleri sıfırdır.
+    Dönüş: özellik sırasıyla {'fleiss_kappa': aralık, 'krippendorff_alpha': aralık} listesi
+    """
+    ratings = np.asarray(ratings)
+    n_features, _, n_items = ratings.shape
+    k = SCORE_CATEGORIES
+    if n_items == 0:
+        return []
+    
+    # Özellik başına sütunlar: [görüntü uyumu, sayılır mı, kategori sayıları (K), rastlantı (K*K)]
+    blocks = []
+    for f in range(n_features):
+        counts = category_counts(ratings[f])
+        pairable = counts.sum(axis=1) >= 2
+        counts[~pairable] = 0
+        item_agreement = np.zeros(n_items)
+        coincidence = np.zeros((n_items, k * k))
+        if pairable.any():
+            item_agreement[pairable] = fleiss_item_agreement(counts[pairable])
+            coincidence[pairable] = coincidence_terms(counts[pairable])
+        blocks.append(np.column_stack([item_agreement, pairable, counts, coincidence]))
+    
+    width = 2 + k + k * k
+    terms = np.hstack(blocks)
+    totals = terms.sum(axis=0)
+    sums = bootstrap_sums(terms, n_resamples, seed)
+    
+    intervals = []
+    for f in range(n_features):
+        block = slice(f * width, (f + 1) * width)
+        total, sample = totals[block], sums[:, block]
+        fleiss_estimate = fleiss_from_totals(total[0], total[1], total[2:2 + k]) if total[1] else np.nan
+        fleiss_samples = fleiss_from_totals(sample[:, 0], sample[:, 1], sample[:, 2:2 + k])
+        alpha_estimate = alpha_from_coincidence(total[2 + k:].reshape(k, k))
+        alpha_samples = alpha_from_coincidence(sample[:, 2 + k:].reshape(-1, k, k))
+        intervals.append({
+            'fleiss_kappa': _interval(fleiss_estimate, fleiss_samples, confidence),
+            'krippendorff_alpha': _interval(alpha_estimate, alpha_samples, confidence),
+        })
+    return intervals
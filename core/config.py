@@ -0,0 +1,93 @@
+"""Uygulama genelindeki sabitler ve ayarlar"""
+import os
+import tempfile
+
+# Varsayılan dizin yolu (sadece sonuçlar için)
+DEFAULT_OUTPUT_DIR = os.path.join(os.curdir, "results")  # Çalışma dizinine göre; her işletim sisteminde geçerli
+
+# Görüntü havuzlarının kalıcı dizini (manifest) ve radyologların gördüğü görüntüler
+MANIFEST_PATH = os.path.join(DEFAULT_OUTPUT_DIR, "goruntu_manifesti.sqlite3")
+
+# Görüntü kaynağı ve sonuç hedefi (core/storage.py); secrets'taki [storage] tablosu geçersiz kılar
+STORAGE_BACKEND = "drive"  # "drive", "local" (yerel/ağ diski) veya "s3" (S3 uyumlu nesne deposu; boto3 gerekir)
+STORAGE_FOLDERS = {  # local/s3 arka uçlarında klasörler: kök dizine göre alt dizin / anahtar öneki
+    'real': "gercek",
+    'synthetic': "sentetik",
+    'results': "sonuclar",
+}
+LOCAL_STORAGE_ROOT = os.path.join(os.curdir, "goruntuler")  # [storage] root ile değiştirilebilir
+
+# Google Drive entegrasyonu için değişkenler
+SCOPES = ['https://www.googleapis.com/auth/drive.readonly', 'https://www.googleapis.com/auth/drive.file']
+
+DRIVE_HTTP_TIMEOUT = 60  # Saniye; Drive HTTP bağlantıları için zaman aşımı
+
+# Google Drive klasör ID'leri
+DEFAULT_REAL_FOLDER_ID = "1XJgpXqdVSfOIriECXwXuwccs3N0KiqQ_"  # Gerçek klasör ID'si
+DEFAULT_SYNTHETIC_FOLDER_ID = "1iGykeA2-cG68wj-4xZDXLp6CH4DcisLo"  # Sentetik klasör ID'si
+DEFAULT_RESULTS_FOLDER_ID = "1Zjh8EDGnUAJGor4sVxIyMllw1zswlWQA"  # Sonuçlar klasör ID'si
+
+# Eşzamanlı indirme ayarları
+DOWNLOAD_MAX_WORKERS = 8  # Aynı anda çalışan indirme iş parçacığı sayısı
+DOWNLOAD_MAX_RETRIES = 3  # Dosya başına yeniden deneme sayısı
+DOWNLOAD_RETRY_BACKOFF = 0.5  # İlk bekleme süresi (saniye), her denemede iki katına çıkar
+PREFETCH_WINDOW = 8  # Akış modunda mevcut görüntünün ilerisinde hazır tutulan görüntü sayısı
+
+# Oturumlar ve radyologlar arasında paylaşılan görüntü önbelleği
+IMAGE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "kardiyak_goruntu_onbellegi")
+IMAGE_CACHE_MAX_BYTES = 2 * 1024 ** 3  # 2 GB; aşıldığında en uzun süredir kullanılmayanlar silinir
+
+# Ekranda gösterilen görüntü türevleri (her iki test için aynı boyut ve filtre)
+DISPLAY_IMAGE_SIZE = (256, 256)
+DISPLAY_CACHE_MAX_ENTRIES = 2000  # Bellekte tutulan hazır PNG türevi sayısı (~50 KB/adet)
+
+# Drive klasör listeleme ayarları
+FILE_FIELDS = "id, name, mimeType, size, md5Checksum, modifiedTime"  # İstenen dosya alanları
+FOLDER_LISTING_PAGE_SIZE = 1000  # Drive API'nin izin verdiği en büyük sayfa boyutu
+FOLDER_LISTING_TTL = 300  # Saniye; bu süre dolunca liste değişiklikler API'si ile güncellenir
+
+# Sonuçların Drive ile toplu eşitlenmesi
+RESULT_SYNC_BATCH_SIZE = 10  # Bu kadar yeni sonuç biriktiğinde eşitle
+RESULT_SYNC_INTERVAL = 30  # Saniye; bekleyen sonuçlar en geç bu sürede eşitlenir
+
+# Drive'a arka planda yükleme kuyruğu (core/uploads.py)
+UPLOAD_QUEUE_DIR = os.path.join(DEFAULT_OUTPUT_DIR, "yukleme_kuyrugu")  # Kuyruk veritabanı ve içerik kopyaları
+UPLOAD_RETRY_BACKOFF = 2  # İlk bekleme süresi (saniye), her başarısız denemede iki katına çıkar
+UPLOAD_MAX_BACKOFF = 300  # Saniye; yeniden denemeler arasındaki en uzun bekleme
+UPLOAD_MAX_ATTEMPTS = 20  # Geçici hatada en fazla deneme; sonra yükleme bırakılır (kalıcı 4xx hemen bırakılır)
+UPLOAD_POLL_INTERVAL = 5  # Saniye; boş kuyrukta yeni iş kontrol aralığı
+
+# CPU yoğun işler için süreç havuzu (core/workers.py); 0 işleri betik iş parçacığında çalıştırır
+WORKER_PROCESSES = min(4, max(1, (os.cpu_count() or 2) - 1))
+WORKER_MAX_PENDING = 16  # Çalışanlara ek olarak sırada bekleyebilecek iş sayısı (kabul sınırı)
+WORKER_ADMISSION_TIMEOUT = 10  # Saniye; kabul sınırı doluyken bekleme, sonra "sunucu yoğun"
+WORKER_TASK_TIMEOUT = 120  # Saniye; tek bir işin en uzun süresi
+
+# Güven aralıkları
+CONFIDENCE_LEVEL = 0.95
+BOOTSTRAP_RESAMPLES = 10000
+BOOTSTRAP_SEED = 20240101  # Sabit tohum: bitiş ekranı yeniden çalıştığında aralıklar değişmez
+BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000  # Tek seferde üretilen indeks matrisinin en büyük eleman sayısı
+
+# Sıcak yol ölçümleri (core/metrics.py)
+METRICS_PREFIX = "kardiyak"
+METRICS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)  # Saniye
+METRICS_FILE = os.path.join(DEFAULT_OUTPUT_DIR, "metrikler.prom")  # Prometheus metin dosyası
+METRICS_WRITE_INTERVAL = 15  # Saniye; metrik dosyasının yeniden yazılma aralığı
+ADMIN_QUERY_PARAM = "admin"  # Gizli yönetici paneli: ?admin=<secrets'taki admin_token>
+
+# Sonuç grafikleri (core/charts.py)
+CHART_DPI = 100
+CHART_CACHE_MAX_ENTRIES = 256  # Bellekte tutulan grafik takımı (sonuç özeti başına bir takım)
+
+# Okuma süresi özetlerinde gösterilen yüzdelikler
+RESPONSE_TIME_PERCENTILES = (50, 90, 95)
+
+# Anatomik Olabilirlik Değerlendirmesi özellikleri
+APA_FEATURES = [
+    "Genel Anatomik Olabilirlik",
+    "Ventrikül Morfolojisi",
+    "Miyokard Kalınlığı",
+    "Papiller Kas Tanımı",
+    "Kan Havuzu Kontrastı"
+]
@@ -0,0 +1,248 @@
+"""Google Drive erişimi: istemci fabrikası, klasör listeleme, indirme ve yükleme
+
+Uygulama Drive'a core/storage.py'deki DriveStorage arka ucu üzerinden erişir.
+Bu modüldeki fonksiyonlar Streamlit arayüzüne yazmaz; hata durumunda istisna
+fırlatır ve arka plan iş parçacıklarından güvenle çağrılabilir.
+"""
+import json
+import os
+import threading
+import time
+
+import streamlit as st
+
+from core.config import (
+    DRIVE_HTTP_TIMEOUT,
+    FILE_FIELDS,
+    FOLDER_LISTING_PAGE_SIZE,
+    FOLDER_LISTING_TTL,
+    SCOPES,
+)
+from core.metrics import span
+
+def put_file_to_drive(drive_service, file_path, folder_id=None, file_id=None, file_name=None):
+    """Dosyayı Drive'a yükle (file_id yoksa oluştur, varsa güncelle) ve dosya ID'sini döndür
+    
+    Hata durumunda istisna fırlatır; arka plan iş parçacıklarından da çağrılabilir.
+    """
+    if file_name is None:
+        file_name = os.path.basename(file_path)
+    
+    from googleapiclient.http import MediaFileUpload
+    
+    media = MediaFileUpload(
+        file_path, 
+        resumable=True
+    )
+    
+    if file_id is None:
+        with span("drive.upload", operation="create"):
+            file = drive_service.files().create(
+                body={'name': file_name, 'parents': [folder_id]},
+                media_body=media,
+                fields='id'
+            ).execute()
+    else:
+        with span("drive.upload", operation="update"):
+            file = drive_service.files().update(
+                fileId=file_id,
+                body={'name': file_name},
+                media_body=media,
+                fields='id'
+            ).execute()
+    
+    return file.get('id')
+
+@st.cache_resource
+def load_drive_discovery_document():
+    """Paketle gelen statik Drive v3 keşif belgesini bir kez okuyup ayrıştır"""
+    from googleapiclient import discovery_cache
+    
+    document = discovery_cache.get_static_doc('drive', 'v3')
+    return json.loads(document) if document else None
+
+class DriveClientFactory:
+    """Aynı kimlik bilgilerini paylaşan, iş parçacığı başına Drive istemcisi üreten fabrika
+    
+    googleapiclient istemcileri (httplib2) iş parçacığı güvenli değildir. Kimlik
+    bilgileri ve erişim belirteci tüm iş parçacıkları arasında paylaşılır; her iş
+    parçacığı ise kalıcı (keep-alive) bağlantılarını koruyan kendi yetkili HTTP
+    taşıyıcısını ve istemcisini bir kez kurar. İstemciler statik keşif belgesinden
+    oluşturulduğu için ağdan keşif belgesi indirilmez.
+    """
+    
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.local = threading.local()
+    
+    def __call__(self):
+        """Çağıran iş parçacığına ait Drive istemcisini döndür"""
+        service = getattr(self.local, 'service', None)
+        if service is None:
+            import google_auth_httplib2
+            import httplib2
+            from googleapiclient.discovery import build, build_from_document
+            
+            http = google_auth_httplib2.AuthorizedHttp(
+                self.credentials, http=httplib2.Http(timeout=DRIVE_HTTP_TIMEOUT))
+            document = load_drive_discovery_document()
+            if document is not None:
+                service = build_from_document(document, http=http)
+            else:
+                service = build('drive', 'v3', http=http, static_discovery=True)
+            self.local.service = service
+        return service
+
+@st.cache_resource(show_spinner=False)
+def get_drive_client_factory(credentials_digest, _credentials_dict):
+    """Kimlik bilgisi özetine göre süreç genelinde paylaşılan istemci fabrikasını döndür
+    
+    Aynı hizmet hesabıyla başlatılan oturumlar kimlik doğrulama ve istemci kurulumunu
+    tekrarlamaz. Özel anahtar önbellek anahtarına dahil edilmez, yalnızca özeti kullanılır.
+    """
+    from google.oauth2.service_account import Credentials
+    
+    credentials = Credentials.from_service_account_info(_credentials_dict, scopes=SCOPES)
+    return DriveClientFactory(credentials)
+
+def fetch_folder_listing(drive_service, folder_id):
+    """Klasördeki tüm dosyaları sayfa sayfa listele (hata durumunda istisna fırlatır)"""
+    files = []
+    page_token = None
+    
+    while True:
+        with span("drive.list"):
+            results = drive_service.files().list(
+                q=f"'{folder_id}' in parents and trashed=false",
+                pageSize=FOLDER_LISTING_PAGE_SIZE,
+                pageToken=page_token,
+                fields=f"nextPageToken, files({FILE_FIELDS})").execute()
+        files.extend(results.get('files', []))
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return files
+
+class FolderListingCache:
+    """Oturumlar arasında paylaşılan, süre sınırlı (TTL) Drive klasör listesi önbelleği
+    
+    Süresi dolan listeler mümkünse Drive değişiklikler (changes) API'si ile artımlı
+    olarak güncellenir; böylece on binlerce dosyalı klasörler yeniden listelenmez.
+    Değişiklikler API'si kullanılamazsa klasör baştan listelenir.
+    
+    Drive çağrıları ortak kilit dışında yapılır; bir klasörün güncellenmesi yalnızca
+    aynı klasörü isteyenleri bekletir. Her liste, listelenmeden önce alınan değişiklik
+    belirteciyle tutulur; bir değişiklik akışı aynı belirteçteki tüm klasörlere
+    uygulanır ve hepsinin belirteci ve güncelleme zamanı birlikte ilerler.
+    """
+    
+    def __init__(self, ttl=FOLDER_LISTING_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()  # Yalnızca aşağıdaki sözlükleri korur
+        self.folder_locks = {}  # klasör_id -> klasörün güncellenmesini tekilleştiren kilit
+        self.folders = {}  # klasör_id -> {dosya_id: dosya}
+        self.fetched_at = {}  # klasör_id -> son güncelleme zamanı (time.monotonic)
+        self.tokens = {}  # klasör_id -> listenin geçerli olduğu değişiklik belirteci
+    
+    def _cached(self, folder_id):
+        """Süresi dolmamış liste (self.lock tutulurken çağrılır; yoksa None)"""
+        if folder_id in self.folders and time.monotonic() - self.fetched_at[folder_id] < self.ttl:
+            return list(self.folders[folder_id].values())
+        return None
+    
+    def get(self, drive_service, folder_id, refresh=False):
+        """Klasördeki dosyaların listesini döndür (gerekirse güncelle)"""
+        with self.lock:
+            files = None if refresh else self._cached(folder_id)
+            if files is not None:
+                return files
+            folder_lock = self.folder_locks.setdefault(folder_id, threading.Lock())
+        
+        with folder_lock:
+            with self.lock:
+                # Beklerken başka bir oturum güncellediyse onun sonucunu kullan
+                files = None if refresh else self._cached(folder_id)
+                if files is not None:
+                    return files
+                token = self.tokens.get(folder_id) if folder_id in self.folders and not refresh else None
+            
+            if token:
+                try:
+                    self._apply_changes(drive_service, token)
+                except Exception:
+                    self._full_refresh(drive_service, folder_id)
+            else:
+                self._full_refresh(drive_service, folder_id)
+            
+            with self.lock:
+                return list(self.folders[folder_id].values())
+    
+    def _full_refresh(self, drive_service, folder_id):
+        # Değişiklik belirtecini listelemeden önce al ki arada olan değişiklikler kaçmasın
+        try:
+            token = drive_service.changes().getStartPageToken().execute().get('startPageToken')
+        except Exception:
+            token = None
+        
+        files = fetch_folder_listing(drive_service, folder_id)
+        with self.lock:
+            self.folders[folder_id] = {f['id']: f for f in files}
+            self.fetched_at[folder_id] = time.monotonic()
+            self.tokens[folder_id] = token
+    
+    def _apply_changes(self, drive_service, token):
+        """token'dan bu yana olan değişiklikleri bu belirteçteki tüm klasörlere uygula"""
+        changes = []
+        new_token = None
+        page_token = token
+        
+        while page_token:
+            with span("drive.changes"):
+                response = drive_service.changes().list(
+                    pageToken=page_token,
+                    pageSize=FOLDER_LISTING_PAGE_SIZE,
+                    fields=f"nextPageToken, newStartPageToken, "
+                           f"changes(fileId, removed, file({FILE_FIELDS}, parents, trashed))").execute()
+            changes.extend(response.get('changes', []))
+            new_token = response.get('newStartPageToken', new_token)
+            page_token = response.get('nextPageToken')
+        
+        with self.lock:
+            now = time.monotonic()
+            for folder_id, files in self.folders.items():
+                # Başka bir akış bu klasörü zaten ilerlettiyse (veya liste daha yeniyse) dokunma
+                if self.tokens.get(folder_id) != token:
+                    continue
+                
+                for change in changes:
+                    file_id = change.get('fileId')
+                    file = change.get('file') or {}
+                    if change.get('removed') or file.get('trashed') or folder_id not in file.get('parents', []):
+                        files.pop(file_id, None)
+                    else:
+                        files[file_id] = {k: v for k, v in file.items() if k not in ('parents', 'trashed')}
+                
+                self.tokens[folder_id] = new_token or token
+                self.fetched_at[folder_id] = now
+
+@st.cache_resource
+def get_folder_listing_cache():
+    """Süreç genelinde paylaşılan klasör listesi önbelleğini döndür"""
+    return FolderListingCache()
+
+def fetch_file_to_path(drive_service, file_id, file_path):
+    """Drive dosyasını parça parça belirtilen yola indir (hata durumunda istisna fırlatır)"""
+    from googleapiclient.http import MediaIoBaseDownload
+    
+    request = drive_service.files().get_media(fileId=file_id)
+    
+    with span("drive.download"), open(file_path, 'wb') as f:
+        downloader = MediaIoBaseDownload(f, request)
+        done = False
+        while not done:
+            status, done = downloader.next_chunk()
+    
+    return file_path
+
+def file_version(file):
+    """Drive dosyasının sürüm bilgisini döndür (önbellek anahtarı için)"""
+    return file.get('md5Checksum') or file.get('modifiedTime') or ''
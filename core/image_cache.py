@@ -0,0 +1,160 @@
+"""Paylaşılan görüntü önbelleği ve ekranda gösterilen 256x256 türevler"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+from PIL import Image
+
+from core.config import (
+    DISPLAY_CACHE_MAX_ENTRIES,
+    DISPLAY_IMAGE_SIZE,
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_MAX_BYTES,
+)
+from core.metrics import span
+from core.workers import run_cpu
+
+class ImageCache:
+    """Drive dosya kimliği ve sürümüyle (md5Checksum/modifiedTime) anahtarlanan disk önbelleği
+    
+    Süreç içindeki tüm Streamlit oturumları tek bir örneği paylaşır (get_image_cache).
+    Aynı dosya için eşzamanlı istekler anahtar kilidiyle tek indirmeye indirgenir
+    (kilit, onu bekleyen son istek bitince silinir);
+    dosyalar geçici adla yazılıp os.replace ile yerine taşındığından yarım dosya
+    hiçbir zaman okunmaz. Toplam boyut max_bytes'ı aştığında en uzun süredir
+    kullanılmayan (LRU) dosyalar silinir.
+    """
+    
+    def __init__(self, cache_dir=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.key_locks = {}  # anahtar -> [kilit, kullanan istek sayısı]
+        self.entries = OrderedDict()  # anahtar -> (yol, boyut), en eskiden en yeniye
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_existing()
+    
+    def _load_existing(self):
+        """Önceki çalıştırmalardan kalan dosyaları son kullanım sırasına göre dizine ekle"""
+        existing = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.startswith('.tmp-'):
+                stat = entry.stat()
+                existing.append((stat.st_mtime, entry.name, entry.path, stat.st_size))
+        
+        for _, name, path, size in sorted(existing):
+            self.entries[os.path.splitext(name)[0]] = (path, size)
+            self.total_bytes += size
+    
+    @staticmethod
+    def make_key(file_id, version=None):
+        """Dosya kimliği ve sürümünden içerik adresli önbellek anahtarı üret"""
+        return hashlib.sha1(f"{file_id}:{version or ''}".encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        """Önbellekteki dosyanın yolunu döndür (yoksa None) ve kullanım sırasını güncelle"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            path, size = entry
+            if not os.path.exists(path):
+                # Başka bir süreç tarafından silinmiş
+                del self.entries[key]
+                self.total_bytes -= size
+                return None
+            self.entries.move_to_end(key)
+        
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+    
+    def fetch(self, file_id, version, file_name, download_fn):
+        """Dosyayı önbellekten döndür; yoksa download_fn(hedef_yol) ile indirip ekle"""
+        key = self.make_key(file_id, version)
+        
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+        try:
+            with key_lock[0]:
+                return self._fetch_locked(key, file_name, download_fn)
+        finally:
+            with self.lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self.key_locks[key]
+    
+    def _fetch_locked(self, key, file_name, download_fn):
+        """fetch'in anahtar kilidi tutulurken çalışan kısmı"""
+        path = self.get(key)
+        if path:
+            self.hits += 1
+            return path
+        
+        self.misses += 1
+        extension = os.path.splitext(file_name)[1].lower()
+        path = os.path.join(self.cache_dir, key + extension)
+        tmp_path = os.path.join(self.cache_dir, f".tmp-{key}-{threading.get_ident()}{extension}")
+        try:
+            download_fn(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        with self.lock:
+            size = os.path.getsize(path)
+            self.entries[key] = (path, size)
+            self.total_bytes += size
+            self._evict()
+        
+        return path
+    
+    def _evict(self):
+        """Boyut sınırı aşıldıysa en eski girdileri sil (self.lock tutulurken çağrılır)"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key, (path, size) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+@st.cache_resource
+def get_image_cache():
+    """Süreç genelinde paylaşılan görüntü önbelleğini döndür"""
+    return ImageCache()
+
+def make_display_png(source_path, size=DISPLAY_IMAGE_SIZE):
+    """Kaynak görüntüyü gösterim boyutuna getirip PNG baytları olarak döndür (süreç havuzunda çalışır)"""
+    with Image.open(source_path) as img:
+        display_img = img.resize(size, Image.LANCZOS)
+    
+    buffer = io.BytesIO()
+    display_img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+@st.cache_data(max_entries=DISPLAY_CACHE_MAX_ENTRIES, show_spinner=False)
+def render_display_image(source_path, source_mtime):
+    """Kaynak görüntüden 256x256 gösterim türevini üret ve PNG baytları olarak döndür
+    
+    source_mtime yalnızca önbellek anahtarının parçasıdır; dosya değişirse türev
+    yeniden üretilir. Sonuç tüm oturumlar arasında paylaşılır. Yeniden boyutlandırma
+    CPU iş havuzunda yapılır; havuz doluysa WorkerPoolBusy, iş zaman aşımına
+    uğrarsa WorkerTaskTimeout fırlatılır (önbelleğe girmez).
+    """
+    with span("image.render"):
+        return run_cpu(make_display_png, source_path, DISPLAY_IMAGE_SIZE)
+
+def get_display_image(source_path):
+    """Gösterim türevini önbellekten al (ilk çağrıda bir kez üretilir)"""
+    return render_display_image(source_path, os.path.getmtime(source_path))
@@ -0,0 +1,262 @@
+"""Oturum günlüğü (yalnızca sona ekleme) ve sonuçların toplu eşitlenmesi"""
+import json
+import os
+import threading
+import weakref
+from datetime import datetime
+
+from core.config import RESULT_SYNC_BATCH_SIZE, RESULT_SYNC_INTERVAL
+from core.metrics import registry, span
+from core.results import parquet_path_for, parquet_supported
+
+# Süreçteki açık yazıcılar; eşitleme kuyruğu ölçümleri bunlardan hesaplanır
+_active_writers = weakref.WeakSet()
+
+registry.register_gauge(
+    "result_sync_pending",
+    "Henüz CSV/Drive'a eşitlenmemiş sonuç sayısı (tüm oturumlar)",
+    lambda: sum(writer.pending_count for writer in list(_active_writers))
+)
+registry.register_gauge(
+    "result_sync_failing_sessions",
+    "Son eşitlemesi hata veren oturum sayısı",
+    lambda: sum(writer.last_error is not None for writer in list(_active_writers))
+)
+registry.register_gauge(
+    "result_writers_active",
+    "Açık sonuç yazıcısı (oturum) sayısı",
+    lambda: len(_active_writers)
+)
+
+def journal_file_for(output_file):
+    """Sonuç CSV dosyasına karşılık gelen oturum günlüğünün yolunu döndür"""
+    return os.path.splitext(output_file)[0] + '.jsonl'
+
+def load_session_journal(journal_file):
+    """Oturum günlüğünü okuyup oturum durumunu yeniden kur
+    
+    Dönüş: {'header', 'results', 'current_idx', 'drive_file_id', 'parquet_drive_file_id', 'completed'}
+    Süreç yazma sırasında öldüyse son satır yarım kalmış olabilir; bu satır atlanır.
+    """
+    state = {
+        'header': None,
+        'results': [],
+        'current_idx': 0,
+        'drive_file_id': None,
+        'parquet_drive_file_id': None,
+        'completed': False
+    }
+    
+    with open(journal_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            
+            record_type = record.get('type')
+            if record_type == 'session':
+                state['header'] = record
+            elif record_type == 'result':
+                state['results'].append(record['result'])
+                state['current_idx'] = record['idx'] + 1
+            elif record_type == 'skip':
+                state['current_idx'] = record['idx'] + 1
+            elif record_type == 'drive_file':
+                if record.get('format') == 'parquet':
+                    state['parquet_drive_file_id'] = record['id']
+                else:
+                    state['drive_file_id'] = record['id']
+            elif record_type == 'completed':
+                state['completed'] = True
+    
+    return state
+
+def find_resumable_sessions(output_dir, radiologist_id, test_type):
+    """Radyoloğun tamamlanmamış oturum günlüklerini en yeniden eskiye doğru listele"""
+    prefix = f"{test_type}_sonuclari_{radiologist_id}_"
+    sessions = []
+    
+    if not os.path.isdir(output_dir):
+        return sessions
+    
+    for name in sorted(os.listdir(output_dir), reverse=True):
+        if not (name.startswith(prefix) and name.endswith('.jsonl')):
+            continue
+        journal_file = os.path.join(output_dir, name)
+        try:
+            state = load_session_journal(journal_file)
+        except OSError:
+            continue
+        header = state['header']
+        if header is None or state['completed'] or header.get('radiologist_id') != radiologist_id:
+            continue
+        if state['current_idx'] >= len(header['images']):
+            continue
+        sessions.append((journal_file, state))
+    
+    return sessions
+
+class ResultWriter:
+    """Sonuçları yalnızca sona eklenen oturum günlüğüne (JSONL) yazan ve toplu eşitleyen yazıcı
+    
+    Günlüğün ilk satırı oturum başlığıdır (test türü, radyolog, karıştırılmış görüntü
+    sırası); sonraki satırlar cevaplar, atlanan görüntüler, Drive dosya ID'si ve
+    tamamlanma kayıtlarıdır. Her satır fsync edilir, bu yüzden süreç çökse bile
+    kaybolmaz ve oturum load_session_journal ile kaldığı yerden sürdürülebilir.
+    Cevapların kendisi oturumla paylaşılan ResultStore'da tutulur (uygulama sonucu
+    depoya ekler, yazıcı yalnızca günlüğe işler). CSV ve (pyarrow kuruluysa) Parquet
+    dosyalarının yeniden yazılması arka plan iş parçacığında, batch_size sonuç
+    biriktiğinde veya en geç interval saniyede bir yapılır; yazılan dosyalar Drive'a
+    yüklenmek üzere paylaşılan yükleme kuyruğuna (uploads, StorageUploads) alınır.
+    flush() bekleyen sonuçları hemen yazar ve kuyruğa alır.
+    """
+    
+    def __init__(self, output_file, result_file_name, results, uploads=None, results_folder_id=None,
+                 drive_file_id=None, parquet_drive_file_id=None, header=None,
+                 batch_size=RESULT_SYNC_BATCH_SIZE, interval=RESULT_SYNC_INTERVAL):
+        self.output_file = output_file
+        self.journal_file = journal_file_for(output_file)
+        self.result_file_name = result_file_name
+        self.uploads = uploads
+        self.results_folder_id = results_folder_id
+        self.drive_file_id = drive_file_id
+        self.write_parquet = parquet_supported()
+        self.parquet_file = parquet_path_for(output_file)
+        self.parquet_file_name = parquet_path_for(result_file_name)
+        self.parquet_drive_file_id = parquet_drive_file_id
+        self.batch_size = batch_size
+        self.interval = interval
+        
+        # Sürdürülen oturumlarda depo önceki cevaplarla (günlükten) dolu gelir
+        self.results = results
+        self.synced_count = 0
+        self.journal_lock = threading.Lock()
+        self.last_error = None
+        self.last_sync_time = None
+        
+        self.sync_lock = threading.Lock()  # Aynı anda tek eşitleme
+        self.wake = threading.Event()
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self.thread.start()
+        _active_writers.add(self)
+        
+        if header is not None:
+            self._write_record(dict(header, type='session'))
+    
+    @property
+    def pending_count(self):
+        """Henüz CSV/Drive'a eşitlenmemiş sonuç sayısı"""
+        return len(self.results) - self.synced_count
+    
+    def _write_record(self, record):
+        """Günlüğe tek satır ekle ve diske yazılmasını garanti et"""
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.journal_lock:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def append(self, result, idx):
+        """idx sıradaki görüntünün (depoya eklenmiş) sonucunu günlüğe kalıcı olarak işle ve gerekiyorsa eşitlemeyi tetikle"""
+        self._write_record({'type': 'result', 'idx': idx, 'result': result})
+        
+        if self.pending_count >= self.batch_size:
+            self.wake.set()
+    
+    def record_skip(self, idx):
+        """Gösterilemeyen görüntüyü günlüğe işle (sürdürmede yeniden sorulmaz)"""
+        self._write_record({'type': 'skip', 'idx': idx})
+    
+    def mark_completed(self):
+        """Oturumun tamamlandığını günlüğe işle"""
+        self._write_record({'type': 'completed'})
+    
+    def _run(self):
+        while not self.stopped:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            if self.pending_count > 0:
+                try:
+                    self.sync()
+                except Exception:
+                    # Hata last_error'a kaydedildi; bir sonraki turda yeniden denenir
+                    pass
+    
+    def sync(self):
+        """Tüm sonuçları CSV'ye (ve Parquet'e) yaz ve (yapılandırıldıysa) Drive yükleme kuyruğuna al"""
+        with self.sync_lock:
+            # Depo sütunlarının o anki görünümü; eşitleme sırasında eklenenler sonraki turda yazılır
+            frame = self.results.to_frame()
+            
+            if frame.empty:
+                return
+            
+            try:
+                with span("results.csv_write"):
+                    frame.to_csv(self.output_file, index=False)
+                if self.write_parquet:
+                    with span("results.parquet_write"):
+                        self.results.to_parquet(self.parquet_file)
+                
+                if self.uploads is not None and self.results_folder_id:
+                    # Drive'a yükleme paylaşılan kuyrukta yapılır; aynı dosyanın bekleyen eski sürümü birleştirilir
+                    self.uploads.enqueue(
+                        self.results_folder_id,
+                        self.result_file_name,
+                        file_path=self.output_file,
+                        file_id=self.drive_file_id,
+                        on_uploaded=self._csv_uploaded
+                    )
+                    if self.write_parquet:
+                        self.uploads.enqueue(
+                            self.results_folder_id,
+                            self.parquet_file_name,
+                            file_path=self.parquet_file,
+                            file_id=self.parquet_drive_file_id,
+                            on_uploaded=self._parquet_uploaded
+                        )
+            except Exception as e:
+                self.last_error = e
+                raise
+            
+            self.synced_count = len(frame)
+            self.last_error = None
+            self.last_sync_time = datetime.now()
+    
+    def _csv_uploaded(self, file_id):
+        if file_id != self.drive_file_id:
+            # Sürdürülen oturum aynı Drive dosyasını güncellemeye devam etsin
+            self._write_record({'type': 'drive_file', 'id': file_id})
+            self.drive_file_id = file_id
+    
+    def _parquet_uploaded(self, file_id):
+        if file_id != self.parquet_drive_file_id:
+            self._write_record({'type': 'drive_file', 'format': 'parquet', 'id': file_id})
+            self.parquet_drive_file_id = file_id
+    
+    def flush(self):
+        """Bekleyen sonuçları hemen eşitle (hata durumunda istisna fırlatır)"""
+        if self.pending_count > 0:
+            self.sync()
+    
+    def close(self):
+        """Arka plan iş parçacığını durdur ve bekleyen sonuçları eşitle"""
+        self.stopped = True
+        self.wake.set()
+        try:
+            self.flush()
+        except Exception:
+            pass
+        _active_writers.discard(self)
+
+def journal_image_entry(img_data):
+    """Görüntü kaydının oturum günlüğüne yazılacak (oturumdan bağımsız) kısmı"""
+    return {
+        'name': img_data['name'],
+        'drive_id': img_data['drive_id'],
+        'version': img_data.get('version', ''),
+        'true_type': img_data['true_type']
+    }
@@ -0,0 +1,264 @@
+"""Görüntü havuzlarının kalıcı SQLite manifesti"""
+import sqlite3
+import threading
+from datetime import datetime
+
+import streamlit as st
+from PIL import Image
+
+from core.config import APA_FEATURES, MANIFEST_PATH
+from core.scoring import REAL, feature_key
+
+# Görüntü istatistiklerinde APA özellik puanı toplamlarının sütun adları
+APA_SUM_COLUMNS = {feature: f"{feature_key(feature)}_sum" for feature in APA_FEATURES}
+
+# top_images() için sıralama ölçütleri: ölçüt -> (SQL ifadesi, ölçütün dayandığı sayı sütunu)
+STAT_METRICS = {
+    'judged_real_rate': ("CAST(judged_real AS REAL) / vtt_shown", 'vtt_shown'),
+    'mean_response_time': ("response_time_sum / response_time_count", 'response_time_count'),
+    'vtt_shown': ("vtt_shown", 'vtt_shown'),
+    'apa_rated': ("apa_rated", 'apa_rated'),
+}
+STAT_METRICS.update({
+    feature_key(feature): (f'CAST("{column}" AS REAL) / apa_rated', 'apa_rated')
+    for feature, column in APA_SUM_COLUMNS.items()
+})
+
+def is_supported_image(file):
+    """Dosyanın desteklenen bir görüntü formatında olup olmadığını kontrol et"""
+    return (file.get('mimeType', '').startswith('image/') or
+            file['name'].lower().endswith(('.png', '.jpg', '.jpeg')))
+
+class ImageManifest:
+    """Gerçek ve sentetik görüntü havuzlarının kalıcı SQLite dizini
+    
+    Her görüntü için Drive ID, ad, boyut, sağlama toplamı, piksel boyutları ve
+    önbellekteki yerel yol tutulur. Dizin, klasör listesiyle artımlı olarak eşitlenir
+    (sync_folder) ve oturum örneklemesi SQL ile milisaniyeler içinde yapılır.
+    'seen' tablosu her radyoloğun hangi testte hangi görüntüleri gördüğünü tutar;
+    böylece aynı radyoloğa aynı görüntü ikinci kez gösterilmez. 'image_stats'
+    tablosu her görüntünün tüm oturumlardaki toplamlarını (VTT gösterimi, gerçek
+    denme, APA puan toplamları, tepki süresi) tutar ve her sonuçla artımlı güncellenir.
+    """
+    
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS images (
+                drive_id TEXT PRIMARY KEY,
+                folder_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                mime_type TEXT,
+                size INTEGER,
+                md5 TEXT,
+                modified_time TEXT,
+                is_image INTEGER NOT NULL,
+                width INTEGER,
+                height INTEGER,
+                local_path TEXT
+            );
+            CREATE INDEX IF NOT EXISTS images_folder ON images (folder_id, is_image);
+            CREATE TABLE IF NOT EXISTS seen (
+                radiologist_id TEXT NOT NULL,
+                test_type TEXT NOT NULL,
+                drive_id TEXT NOT NULL,
+                seen_at TEXT NOT NULL,
+                PRIMARY KEY (radiologist_id, test_type, drive_id)
+            );
+            CREATE TABLE IF NOT EXISTS image_stats (
+                drive_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                true_type TEXT,
+                vtt_shown INTEGER NOT NULL DEFAULT 0,
+                judged_real INTEGER NOT NULL DEFAULT 0,
+                apa_rated INTEGER NOT NULL DEFAULT 0,
+                response_time_sum REAL NOT NULL DEFAULT 0,
+                response_time_count INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            );
+        """)
+        # APA özellikleri değişmişse eksik puan toplamı sütunlarını ekle
+        existing_columns = {row[1] for row in self.conn.execute("PRAGMA table_info(image_stats)")}
+        for column in APA_SUM_COLUMNS.values():
+            if column not in existing_columns:
+                self.conn.execute(f'ALTER TABLE image_stats ADD COLUMN "{column}" INTEGER NOT NULL DEFAULT 0')
+        self.conn.commit()
+    
+    def sync_folder(self, folder_id, files):
+        """Klasör listesindeki değişiklikleri (yeni, değişen, silinen) dizine uygula
+        
+        Sürümü (md5/modifiedTime) değişen dosyaların boyut ve yerel yol bilgisi sıfırlanır.
+        Dönüş: (eklenen/güncellenen, silinen) kayıt sayısı
+        """
+        with self.lock:
+            existing = {
+                row[0]: (row[1], row[2])
+                for row in self.conn.execute(
+                    "SELECT drive_id, md5, modified_time FROM images WHERE folder_id = ?", (folder_id,))
+            }
+            
+            upserts = []
+            for f in files:
+                if existing.pop(f['id'], None) == (f.get('md5Checksum'), f.get('modifiedTime')):
+                    continue
+                upserts.append((
+                    f['id'], folder_id, f['name'], f.get('mimeType'), int(f.get('size') or 0),
+                    f.get('md5Checksum'), f.get('modifiedTime'), int(is_supported_image(f))
+                ))
+            
+            with self.conn:
+                self.conn.executemany("""
+                    INSERT INTO images (drive_id, folder_id, name, mime_type, size, md5, modified_time, is_image)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (drive_id) DO UPDATE SET
+                        folder_id = excluded.folder_id, name = excluded.name,
+                        mime_type = excluded.mime_type, size = excluded.size,
+                        md5 = excluded.md5, modified_time = excluded.modified_time,
+                        is_image = excluded.is_image,
+                        width = NULL, height = NULL, local_path = NULL
+                """, upserts)
+                # Klasörden kalkan dosyalar
+                self.conn.executemany("DELETE FROM images WHERE drive_id = ?", [(i,) for i in existing])
+            
+            return len(upserts), len(existing)
+    
+    def count_images(self, folder_id):
+        """Klasördeki desteklenen görüntü sayısı"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM images WHERE folder_id = ? AND is_image = 1", (folder_id,)).fetchone()[0]
+    
+    def sample(self, folder_id, max_images, radiologist_id=None, test_type=None):
+        """Radyoloğun bu testte henüz görmediği görüntülerden rastgele örnek al
+        
+        Dönüş, Drive listeleme sonucu ile aynı anahtarlara sahip dosya sözlükleridir.
+        """
+        with self.lock:
+            rows = self.conn.execute("""
+                SELECT drive_id, name, mime_type, size, md5, modified_time, local_path
+                FROM images
+                WHERE folder_id = ? AND is_image = 1
+                  AND drive_id NOT IN (
+                      SELECT drive_id FROM seen WHERE radiologist_id = ? AND test_type = ?)
+                ORDER BY random()
+                LIMIT ?
+            """, (folder_id, radiologist_id or '', test_type or '', max_images)).fetchall()
+        
+        return [{
+            'id': row[0],
+            'name': row[1],
+            'mimeType': row[2],
+            'size': row[3],
+            'md5Checksum': row[4],
+            'modifiedTime': row[5],
+            'localPath': row[6]
+        } for row in rows]
+    
+    def record_local_file(self, drive_id, local_path):
+        """İndirilen görüntünün yerel yolunu ve piksel boyutlarını kaydet"""
+        with Image.open(local_path) as img:
+            width, height = img.size
+        
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE images SET local_path = ?, width = ?, height = ? WHERE drive_id = ?",
+                (local_path, width, height, drive_id))
+    
+    def mark_seen(self, radiologist_id, test_type, drive_id):
+        """Görüntüyü radyoloğun bu testte gördükleri arasına ekle"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO seen (radiologist_id, test_type, drive_id, seen_at) VALUES (?, ?, ?, ?)",
+                (radiologist_id, test_type, drive_id, datetime.now().isoformat(timespec='seconds')))
+    
+    def record_result(self, img_data, result):
+        """Bir sonucu görüntünün istatistiklerine ekle (VTT veya APA sonucu)
+        
+        Sonuç kaydında 'response_time' (saniye) varsa tepki süresi ortalamasına katılır.
+        """
+        is_vtt = 'classified_as' in result
+        response_time = result.get('response_time')
+        has_response_time = response_time is not None and response_time == response_time
+        sum_columns = list(APA_SUM_COLUMNS.values())
+        scores = [0 if is_vtt else int(result.get(feature_key(feature)) or 0) for feature in APA_SUM_COLUMNS]
+        
+        columns = ['drive_id', 'name', 'true_type', 'vtt_shown', 'judged_real', 'apa_rated',
+                   'response_time_sum', 'response_time_count', 'updated_at'] + sum_columns
+        values = [
+            img_data['drive_id'], img_data['name'], img_data.get('true_type'),
+            int(is_vtt), int(is_vtt and result['classified_as'] == REAL), int(not is_vtt),
+            float(response_time) if has_response_time else 0.0, int(has_response_time),
+            datetime.now().isoformat(timespec='seconds')
+        ] + scores
+        counters = ['vtt_shown', 'judged_real', 'apa_rated', 'response_time_sum', 'response_time_count'] + sum_columns
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        placeholders = ", ".join("?" * len(columns))
+        increments = ", ".join(f'"{column}" = "{column}" + excluded."{column}"' for column in counters)
+        
+        with self.lock, self.conn:
+            self.conn.execute(f"""
+                INSERT INTO image_stats ({column_list}) VALUES ({placeholders})
+                ON CONFLICT (drive_id) DO UPDATE SET
+                    name = excluded.name, true_type = excluded.true_type,
+                    updated_at = excluded.updated_at, {increments}
+            """, values)
+    
+    def _stats_rows(self, where, params, order=''):
+        sum_list = ", ".join(f'"{column}"' for column in APA_SUM_COLUMNS.values())
+        cursor = self.conn.execute(f"""
+            SELECT drive_id, name, true_type, vtt_shown, judged_real, apa_rated,
+                   response_time_sum, response_time_count, {sum_list}
+            FROM image_stats {where} {order}
+        """, params)
+        
+        rows = []
+        for row in cursor:
+            drive_id, name, true_type, vtt_shown, judged_real, apa_rated, rt_sum, rt_count = row[:8]
+            stats = {
+                'drive_id': drive_id,
+                'name': name,
+                'true_type': true_type,
+                'vtt_shown': vtt_shown,
+                'judged_real': judged_real,
+                'judged_real_rate': judged_real / vtt_shown if vtt_shown else None,
+                'apa_rated': apa_rated,
+                'mean_response_time': rt_sum / rt_count if rt_count else None,
+            }
+            for feature, total in zip(APA_SUM_COLUMNS, row[8:]):
+                stats[feature_key(feature)] = total / apa_rated if apa_rated else None
+            rows.append(stats)
+        return rows
+    
+    def image_stats(self, true_type=None):
+        """Tüm görüntülerin istatistikleri (isteğe bağlı olarak türe göre süzülmüş)"""
+        where, params = ("WHERE true_type = ?", (true_type,)) if true_type else ("", ())
+        with self.lock:
+            return self._stats_rows(where, params, "ORDER BY name")
+    
+    def top_images(self, metric='judged_real_rate', k=10, true_type=None, min_count=1, ascending=False):
+        """Bir ölçüte göre en yüksek (veya ascending=True ile en düşük) k görüntü
+        
+        metric STAT_METRICS anahtarlarından biridir: 'judged_real_rate' sentetik
+        görüntüler için kandırma oranıdır, APA özellikleri ortalama puana göre sıralanır.
+        Ölçütün dayandığı sayı min_count'tan az olan görüntüler dışarıda bırakılır.
+        """
+        expression, count_column = STAT_METRICS[metric]
+        conditions, params = [f"{count_column} >= ?"], [max(int(min_count), 1)]
+        if true_type:
+            conditions.append("true_type = ?")
+            params.append(true_type)
+        direction = "ASC" if ascending else "DESC"
+        
+        with self.lock:
+            return self._stats_rows(
+                "WHERE " + " AND ".join(conditions), params,
+                f"ORDER BY {expression} {direction}, {count_column} DESC, drive_id LIMIT {int(k)}"
+            )
+
+@st.cache_resource
+def get_image_manifest():
+    """Süreç genelinde paylaşılan görüntü manifestini döndür"""
+    return ImageManifest()
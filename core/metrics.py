@@ -0,0 +1,194 @@
+"""Sıcak yollar için süreç içi zamanlama ölçümleri ve Prometheus metin çıktısı
+
+Drive listeleme/indirme/yükleme, görüntü türevi üretimi, sonuç dosyası yazımı,
+grafik çizimi ve betiğin her yeniden çalıştırılması span() ile ölçülür. Süreler
+sabit kovalı histogramlarda toplanır (bellek kullanımı ölçüm sayısından
+bağımsızdır) ve Prometheus metin biçiminde bir dosyaya (node_exporter textfile
+toplayıcısıyla okunabilir) ve gizli yönetici paneline verilir. Kayıt defteri
+süreç geneline tek bir modül örneğidir; arka plan iş parçacıklarından da
+güvenle kullanılabilir ve Streamlit'e bağımlı değildir.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from core.config import METRICS_BUCKETS, METRICS_PREFIX
+
+class Histogram:
+    """Sabit kovalı süre histogramı (Prometheus 'histogram' türü)"""
+    
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # son kova +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+    
+    def cumulative_counts(self):
+        """Her kova sınırı (le) için o sınıra kadarki toplam gözlem sayısı"""
+        total = 0
+        cumulative = []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+    
+    def quantile(self, q):
+        """Kovalar içinde doğrusal enterpolasyonla yüzdelik tahmini (histogram_quantile gibi)"""
+        if not self.count:
+            return float('nan')
+        rank = q * self.count
+        lower = 0.0
+        previous = 0
+        for upper, cumulative in zip(self.buckets + (self.max,), self.cumulative_counts()):
+            if cumulative >= rank:
+                in_bucket = cumulative - previous
+                fraction = (rank - previous) / in_bucket if in_bucket else 0.0
+                return min(lower + (max(upper, lower) - lower) * fraction, self.max)
+            lower, previous = upper, cumulative
+        return self.max
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _label_text(labels):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+
+class MetricsRegistry:
+    """Etiketli süre histogramları ve anlık değer (gauge) geri çağrıları"""
+    
+    def __init__(self, buckets=METRICS_BUCKETS, prefix=METRICS_PREFIX):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.histograms = {}  # (span adı, ((etiket, değer), ...)) -> Histogram
+        self.gauges = {}  # gauge adı -> (açıklama, fonksiyon)
+    
+    def observe(self, name, seconds, **labels):
+        """Bir süreyi span adı ve etiketleriyle histogramına ekle"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+    
+    @contextmanager
+    def span(self, name, **labels):
+        """Bloğun süresini ölç; blok istisna fırlatırsa status="error" etiketiyle kaydedilir"""
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, status=status, **labels)
+    
+    def register_gauge(self, name, description, fn):
+        """Her okumada fn() ile hesaplanan bir anlık değer (ör. eşitleme kuyruğu) tanımla"""
+        with self.lock:
+            self.gauges[name] = (description, fn)
+    
+    def _gauge_values(self):
+        with self.lock:
+            gauges = list(self.gauges.items())
+        values = []
+        for name, (description, fn) in gauges:
+            try:
+                values.append((name, description, float(fn())))
+            except Exception:
+                continue
+        return values
+    
+    def snapshot(self, quantiles=(0.5, 0.95, 0.99)):
+        """Yönetici paneli için span başına özet: sayı, toplam, ortalama, en büyük ve yüzdelik tahminleri"""
+        with self.lock:
+            rows = []
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                row = {'span': name, 'labels': _label_text(labels), 'count': histogram.count,
+                       'sum': histogram.sum, 'mean': histogram.sum / histogram.count, 'max': histogram.max}
+                for q in quantiles:
+                    row[f'p{q * 100:g}'] = histogram.quantile(q)
+                rows.append(row)
+        gauges = {name: value for name, _, value in self._gauge_values()}
+        return rows, gauges
+    
+    def render_prometheus(self):
+        """Tüm ölçümleri Prometheus metin biçiminde (text exposition format 0.0.4) döndür"""
+        metric = f"{self.prefix}_span_duration_seconds"
+        lines = [
+            f"# HELP {metric} Sıcak yolların süresi (saniye)",
+            f"# TYPE {metric} histogram",
+        ]
+        with self.lock:
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                base = (('span', name),) + labels
+                bounds = [f"{bound:g}" for bound in histogram.buckets] + ["+Inf"]
+                for bound, cumulative in zip(bounds, histogram.cumulative_counts()):
+                    lines.append(f'{metric}_bucket{{{_label_text(base + (("le", bound),))}}} {cumulative}')
+                lines.append(f"{metric}_sum{{{_label_text(base)}}} {histogram.sum:.6f}")
+                lines.append(f"{metric}_count{{{_label_text(base)}}} {histogram.count}")
+        
+        for name, description, value in self._gauge_values():
+            gauge = f"{self.prefix}_{name}"
+            lines += [f"# HELP {gauge} {description}", f"# TYPE {gauge} gauge", f"{gauge} {value:g}"]
+        
+        return "\n".join(lines) + "\n"
+    
+    def write_file(self, path):
+        """Prometheus çıktısını dosyaya atomik olarak yaz (okuyucu yarım dosya görmez)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+    
+    def reset(self):
+        """Tüm histogramları sıfırla (gauge tanımları kalır)"""
+        with self.lock:
+            self.histograms.clear()
+
+class MetricsFileWriter:
+    """Ölçümleri belirli aralıklarla metrik dosyasına yazan arka plan iş parçacığı"""
+    
+    def __init__(self, registry, path, interval):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.last_error = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.registry.write_file(self.path)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+    
+    def stop(self):
+        self.stopped.set()
+
+# Süreç genelinde tek kayıt defteri
+registry = MetricsRegistry()
+
+def span(name, **labels):
+    """registry.span kısayolu: with span("drive.download"): ..."""
+    return registry.span(name, **labels)
+
+def observe(name, seconds, **labels):
+    """registry.observe kısayolu"""
+    registry.observe(name, seconds, **labels)
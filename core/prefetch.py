@@ -0,0 +1,75 @@
+"""Akış modu için ileriye dönük görüntü ön yükleyicisi"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config import DOWNLOAD_MAX_WORKERS, PREFETCH_WINDOW
+from core.storage import download_file_with_retry
+
+class ImagePrefetcher:
+    """Mevcut görüntünün ilerisindeki bir pencereyi arka planda indiren ön yükleyici
+    
+    İndirmeler iş parçacığı havuzunda yapılır; görüntü kayıtları yalnızca ana
+    (betik) iş parçacığında, get_path çağrıldığında güncellenir. Okuyucu ön
+    yükleyiciden hızlı olduğunda get_path bekler ve bu durum 'stalls' sayacına
+    eklenir.
+    """
+    
+    def __init__(self, storage, images, destination_folder,
+                 window=PREFETCH_WINDOW, max_workers=DOWNLOAD_MAX_WORKERS, cache=None):
+        self.storage = storage
+        self.images = images
+        self.destination_folder = destination_folder
+        self.cache = cache
+        self.window = window
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = {}
+        self.stalls = 0
+        self.stall_seconds = 0.0
+    
+    def _submit(self, idx):
+        img_data = self.images[idx]
+        if img_data.get('path') or idx in self.futures:
+            return
+        self.futures[idx] = self.executor.submit(
+            download_file_with_retry,
+            self.storage,
+            img_data['drive_id'],
+            img_data['name'],
+            self.destination_folder,
+            version=img_data.get('version'),
+            cache=self.cache
+        )
+    
+    def ensure_window(self, current_idx):
+        """current_idx ve sonrasındaki pencere için indirmeleri sıraya al"""
+        end = min(current_idx + self.window + 1, len(self.images))
+        for idx in range(current_idx, end):
+            self._submit(idx)
+    
+    def get_path(self, idx, count_stall=True):
+        """Görüntünün yerel yolunu döndür, gerekirse indirmenin bitmesini bekle"""
+        img_data = self.images[idx]
+        if img_data.get('path'):
+            return img_data['path']
+        
+        self._submit(idx)
+        future = self.futures[idx]
+        
+        if not future.done() and count_stall:
+            self.stalls += 1
+            start = time.perf_counter()
+            try:
+                path = future.result()
+            finally:
+                self.stall_seconds += time.perf_counter() - start
+        else:
+            path = future.result()
+        
+        img_data['path'] = path
+        del self.futures[idx]
+        return path
+    
+    def shutdown(self):
+        """Bekleyen indirmeleri iptal et ve havuzu kapat"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.futures.clear()
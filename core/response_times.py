@@ -0,0 +1,53 @@
+"""Okuma (tepki) sürelerinin ölçümü ve özetleri
+
+Süreler duvar saatiyle değil, monoton ve yüksek çözünürlüklü time.perf_counter()
+ile ölçülür; sistem saati değişse de negatif veya sıçramalı süre oluşmaz.
+Her cevap için iki süre tutulur:
+
+- response_time: görüntünün ekrana verilmesinden cevabın gelmesine kadar geçen,
+  radyoloğa ait okuma süresi
+- wait_time: önceki cevaptan (veya oturum başından) görüntünün ekrana verilmesine
+  kadar geçen, indirme ve hazırlamaya harcanan bekleme süresi
+"""
+import time
+
+from core.config import RESPONSE_TIME_PERCENTILES
+
+RESPONSE_TIME_COLUMNS = ('response_time', 'wait_time')
+
+def clock():
+    """Monoton saat (saniye); yalnızca iki ölçüm arasındaki fark anlamlıdır"""
+    return time.perf_counter()
+
+def time_summary(values, percentiles=RESPONSE_TIME_PERCENTILES):
+    """Sürelerin özeti: {'count', 'mean', 'p50', ..., 'max'}; eksik (NaN) süreler atlanır"""
+    import numpy as np
+    
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    summary = {'count': int(len(values))}
+    if not len(values):
+        return summary
+    
+    summary['mean'] = float(values.mean())
+    for percentile, value in zip(percentiles, np.percentile(values, percentiles)):
+        summary[f'p{percentile}'] = float(value)
+    summary['max'] = float(values.max())
+    return summary
+
+def reader_time_table(df, column='response_time', percentiles=RESPONSE_TIME_PERCENTILES):
+    """Sonuç tablosundan radyolog başına süre dağılımı (cevap sayısı, ortalama, yüzdelikler)
+    
+    Süre sütunu olmayan (eski) sonuç dosyalarının satırları tabloya girmez.
+    """
+    import pandas as pd
+    
+    if column not in df or 'radiologist_id' not in df:
+        return pd.DataFrame()
+    
+    times = pd.DataFrame({
+        'reader': df['radiologist_id'].astype(str).to_numpy(),
+        'time': pd.to_numeric(df[column], errors='coerce').to_numpy(),
+    }).dropna()
+    rows = {reader: time_summary(group['time'], percentiles) for reader, group in times.groupby('reader')}
+    return pd.DataFrame.from_dict(rows, orient='index')
@@ -0,0 +1,358 @@
+"""Oturum sonuçları için sütunlu, önceden ayrılmış sonuç deposu ve sonuç dosyası okuma
+
+Her cevap ayrı bir sözlük olarak tutulmak yerine sütunlara yazılır: metin sütunları
+(radyolog, görüntü adı, görüntü ID) bir kez saklanan tablolara işaret eden int32
+kodlar, görüntü türleri ve doğruluk bool, APA puanları uint8, zaman damgaları
+int64 (saniye) olarak saklanır. Dizi kapasitesi oturumdaki görüntü sayısı kadar
+baştan ayrılır; DataFrame/CSV/Parquet dışa aktarımı bu dizilerin görünümleri
+(view) üzerinden kopyalanmadan yapılır.
+
+Parquet çıktısı her test türü için sabit bir Arrow şemasıyla yazılır (pyarrow
+gerektirir); böylece yüzlerce oturum tür çıkarımı yapılmadan sütunlu olarak
+taranabilir. CSV çıktısı geriye dönük uyumluluk için yazılmaya devam eder.
+"""
+import os
+import threading
+
+import numpy as np
+
+from core.config import APA_FEATURES
+from core.scoring import REAL, SYNTHETIC, feature_key
+
+# Sütun türleri: 'str' (kodlanmış metin), 'label' (gerçek/sentetik), 'bool',
+# 'int32', 'uint8' (1-5 puan), 'time' (saniye çözünürlüklü zaman damgası),
+# 'seconds' (süre; ölçülemeyen değerler NaN/boş)
+VTT_SCHEMA = [
+    ('radiologist_id', 'str'),
+    ('image_path', 'str'),
+    ('image_id', 'str'),
+    ('true_type', 'label'),
+    ('classified_as', 'label'),
+    ('correct', 'bool'),
+    ('timestamp', 'time'),
+    ('response_time', 'seconds'),
+    ('wait_time', 'seconds'),
+]
+
+APA_SCHEMA = [
+    ('radiologist_id', 'str'),
+    ('image_path', 'str'),
+    ('image_id', 'str'),
+    ('image_number', 'int32'),
+    ('timestamp', 'time'),
+] + [(feature_key(feature), 'uint8') for feature in APA_FEATURES] + [
+    ('response_time', 'seconds'),
+    ('wait_time', 'seconds'),
+]
+
+SCHEMAS = {'vtt': VTT_SCHEMA, 'apa': APA_SCHEMA}
+
+DTYPES = {
+    'str': np.int32,
+    'label': np.bool_,
+    'bool': np.bool_,
+    'int32': np.int32,
+    'uint8': np.uint8,
+    'time': np.int64,
+    'seconds': np.float32,
+}
+
+# 'label' sütunlarında True gerçek, False sentetik görüntü demektir
+LABEL_CATEGORIES = [SYNTHETIC, REAL]
+
+TIMESTAMP_FORMAT = 'datetime64[s]'
+
+# Parquet şemasının sürümü; sütun eklenir/değişirse artırılmalı
+RESULT_SCHEMA_VERSION = '2'
+
+PARQUET_EXTENSION = '.parquet'
+
+def parquet_supported():
+    """Parquet yazma/okuma için pyarrow kurulu mu"""
+    import importlib.util
+    
+    return importlib.util.find_spec('pyarrow') is not None
+
+def arrow_schema(test_type):
+    """Test türünün sonuçları için sabit Arrow şeması"""
+    import pyarrow as pa
+    
+    types = {
+        'str': pa.dictionary(pa.int32(), pa.string()),
+        'label': pa.dictionary(pa.int8(), pa.string()),
+        'bool': pa.bool_(),
+        'int32': pa.int32(),
+        'uint8': pa.uint8(),
+        'time': pa.timestamp('s'),
+        'seconds': pa.float32(),
+    }
+    return pa.schema(
+        [(name, types[kind]) for name, kind in SCHEMAS[test_type]],
+        metadata={'test_type': test_type, 'schema_version': RESULT_SCHEMA_VERSION}
+    )
+
+def parquet_path_for(csv_path):
+    """CSV sonuç dosyasına karşılık gelen Parquet dosyasının yolu/adı"""
+    return os.path.splitext(csv_path)[0] + PARQUET_EXTENSION
+
+def read_results(path, columns=None):
+    """Bir sonuç dosyasını (CSV veya Parquet) DataFrame olarak oku
+    
+    Parquet dosyalarında sütun türleri şemadan gelir; CSV dosyalarında pandas tür
+    çıkarımı yapar.
+    """
+    import pandas as pd
+    
+    if str(path).lower().endswith(PARQUET_EXTENSION):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+def read_results_dataset(paths, test_type, columns=None):
+    """Birçok oturumun Parquet sonuç dosyasını tek bir sütunlu taramayla DataFrame'e oku
+    
+    paths bir dizin ya da dosya listesi olabilir; yalnızca istenen sütunlar okunur.
+    """
+    import pyarrow.dataset as ds
+    
+    dataset = ds.dataset(paths, format='parquet', schema=arrow_schema(test_type))
+    return dataset.to_table(columns=columns).to_pandas()
+
+def read_results_by_file(paths, test_type, columns=None):
+    """Parquet sonuç dosyalarını tek bir sütunlu taramayla oku ve dosyalara ayır
+    
+    Dönüş: {yol: DataFrame}; satırı olmayan dosyalar sonuçta yer almaz.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    
+    dataset = ds.dataset(list(paths), format='parquet', schema=arrow_schema(test_type))
+    scanner = dataset.scanner(columns=columns)
+    
+    # Taramanın her kayıt grubu geldiği dosyayla (fragment) etiketlidir
+    batches = {}
+    for tagged in scanner.scan_batches():
+        if tagged.record_batch.num_rows:
+            batches.setdefault(tagged.fragment.path, []).append(tagged.record_batch)
+    return {
+        os.path.abspath(path): pa.Table.from_batches(file_batches, schema=scanner.projected_schema).to_pandas()
+        for path, file_batches in batches.items()
+    }
+
+def read_result_files(paths, test_type, columns=None):
+    """Sonuç dosyalarını DataFrame listesi olarak oku
+    
+    CSV dosyaları tek tek okunur; Parquet dosyaları read_results_dataset ile tek bir
+    taramada okunur ve listeye tek bir birleşik tablo olarak eklenir (Parquet
+    sonuçlarında radiologist_id her zaman bulunduğundan okuyucular ayrışır).
+    """
+    parquet_paths = [path for path in paths if str(path).lower().endswith(PARQUET_EXTENSION)]
+    frames = [read_results(path, columns=columns) for path in paths if path not in parquet_paths]
+    if parquet_paths:
+        frames.append(read_results_dataset(parquet_paths, test_type, columns=columns))
+    return frames
+
+class ResultStore:
+    """Tek bir değerlendirme oturumunun cevaplarını sütunlu olarak tutan depo
+    
+    append() build_vtt_result/build_apa_result sözlüklerini alır ve sütunlara işler;
+    yineleme aynı sözlükleri geri üretir. Kapasite dolarsa diziler iki katına
+    büyütülür. Sonuç yazıcısının arka plan iş parçacığı eşitleme sırasında
+    to_frame() ile okurken ana iş parçacığı ekleme yapabilir.
+    """
+    
+    def __init__(self, test_type, capacity=64):
+        self.test_type = test_type
+        self.schema = SCHEMAS[test_type]
+        self.size = 0
+        self.lock = threading.Lock()
+        capacity = max(int(capacity), 1)
+        self.columns = {name: np.zeros(capacity, dtype=DTYPES[kind]) for name, kind in self.schema}
+        # Metin sütunları için kod -> metin tabloları ve ters dizinleri
+        self.strings = {name: [] for name, kind in self.schema if kind == 'str'}
+        self.string_codes = {name: {} for name in self.strings}
+    
+    @classmethod
+    def from_records(cls, test_type, records, capacity=64):
+        """Sonuç sözlüklerinden (ör. oturum günlüğü) bir depo kur"""
+        records = list(records)
+        store = cls(test_type, capacity=max(capacity, len(records)))
+        for record in records:
+            store.append(record)
+        return store
+    
+    def __len__(self):
+        return self.size
+    
+    @property
+    def capacity(self):
+        return len(self.columns['timestamp'])
+    
+    @property
+    def nbytes(self):
+        """Sütun dizilerinin ve metin tablolarının yaklaşık bellek kullanımı (bayt)"""
+        total = sum(column.nbytes for column in self.columns.values())
+        for values in self.strings.values():
+            total += sum(len(value) for value in values)
+        return total
+    
+    def column(self, name):
+        """Bir sütunun dolu kısmının (kopyasız) görünümü; metin sütunlarında kodlar döner"""
+        with self.lock:
+            return self.columns[name][:self.size]
+    
+    def _intern(self, name, value):
+        value = '' if value is None else str(value)
+        codes = self.string_codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = len(self.strings[name])
+            self.strings[name].append(value)
+            codes[value] = code
+        return code
+    
+    def _grow(self):
+        # Eski diziler yerinde bırakılır; onları okuyan bir eşitleme etkilenmez
+        capacity = self.capacity * 2
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+    
+    def append(self, result):
+        """Bir sonuç sözlüğünü depoya ekle"""
+        with self.lock:
+            if self.size == self.capacity:
+                self._grow()
+            
+            row = self.size
+            for name, kind in self.schema:
+                if kind == 'seconds':
+                    # Süreleri olmayan eski kayıtlar (ör. önceki sürümün günlüğü) NaN olur
+                    value = result.get(name)
+                    self.columns[name][row] = np.nan if value is None else value
+                    continue
+                value = result[name]
+                if kind == 'str':
+                    value = self._intern(name, value)
+                elif kind == 'label':
+                    value = value == REAL
+                elif kind == 'time':
+                    value = np.datetime64(str(value).replace(' ', 'T'), 's').astype(np.int64)
+                self.columns[name][row] = value
+            
+            # Satır tamamen yazıldıktan sonra görünür olur
+            self.size = row + 1
+    
+    def _decode(self, name, kind, value):
+        if kind == 'str':
+            return self.strings[name][value]
+        if kind == 'label':
+            return REAL if value else SYNTHETIC
+        if kind == 'bool':
+            return bool(value)
+        if kind == 'time':
+            return str(np.datetime64(int(value), 's')).replace('T', ' ')
+        if kind == 'seconds':
+            return None if np.isnan(value) else float(value)
+        return int(value)
+    
+    def __iter__(self):
+        """Sonuçları build_*_result biçimindeki sözlükler olarak sırayla üret"""
+        with self.lock:
+            size = self.size
+            columns = dict(self.columns)
+        for row in range(size):
+            yield {name: self._decode(name, kind, columns[name][row]) for name, kind in self.schema}
+    
+    def digest(self):
+        """Sonuçların içerik özeti (sha256); aynı cevaplar her zaman aynı özeti verir
+        
+        Sütun dizileri kopyalanmadan doğrudan özetlenir; grafik gibi türetilmiş
+        çıktıların önbellek anahtarı olarak kullanılır.
+        """
+        import hashlib
+        
+        with self.lock:
+            size = self.size
+            columns = dict(self.columns)
+            strings = {name: list(values) for name, values in self.strings.items()}
+        
+        digest = hashlib.sha256(self.test_type.encode('utf-8'))
+        for name, _ in self.schema:
+            digest.update(name.encode('utf-8'))
+            digest.update(columns[name][:size])
+        for name, values in strings.items():
+            digest.update('\x00'.join(values).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def to_frame(self):
+        """Sonuçları DataFrame olarak döndür
+        
+        Sayısal sütunlar dizilerin görünümleridir; metin ve tür sütunları kodlardan
+        kategorik olarak kurulur, bu yüzden sonuç sayısı kadar metin kopyalanmaz.
+        """
+        import pandas as pd
+        
+        with self.lock:
+            size = self.size
+            columns = dict(self.columns)
+            strings = {name: list(values) for name, values in self.strings.items()}
+        
+        data = {}
+        for name, kind in self.schema:
+            column = columns[name][:size]
+            if kind == 'str':
+                data[name] = pd.Categorical.from_codes(column, categories=strings[name])
+            elif kind == 'label':
+                data[name] = pd.Categorical.from_codes(column.view(np.int8), categories=LABEL_CATEGORIES)
+            elif kind == 'time':
+                data[name] = column.view(TIMESTAMP_FORMAT)
+            else:
+                data[name] = column
+        return pd.DataFrame(data, copy=False)
+    
+    def to_csv(self, path):
+        """Sonuçları CSV dosyasına yaz"""
+        self.to_frame().to_csv(path, index=False)
+    
+    def to_arrow(self):
+        """Sonuçları sabit şemalı bir Arrow tablosu olarak döndür (pyarrow gerektirir)
+        
+        Sayısal sütunlar ve kodlar numpy dizilerinden kopyalanmadan sarılır.
+        """
+        import pyarrow as pa
+        
+        with self.lock:
+            size = self.size
+            columns = dict(self.columns)
+            strings = {name: list(values) for name, values in self.strings.items()}
+        
+        arrays = []
+        for name, kind in self.schema:
+            column = columns[name][:size]
+            if kind == 'str':
+                arrays.append(pa.DictionaryArray.from_arrays(column, pa.array(strings[name], type=pa.string())))
+            elif kind == 'label':
+                arrays.append(pa.DictionaryArray.from_arrays(column.view(np.int8), pa.array(LABEL_CATEGORIES)))
+            elif kind == 'time':
+                arrays.append(pa.array(column.view(TIMESTAMP_FORMAT)))
+            elif kind == 'seconds':
+                arrays.append(pa.array(column, mask=np.isnan(column)))
+            else:
+                arrays.append(pa.array(column))
+        return pa.Table.from_arrays(arrays, schema=arrow_schema(self.test_type))
+    
+    def to_parquet(self, path):
+        """Sonuçları Parquet dosyasına yaz (pyarrow gerektirir)"""
+        import pyarrow.parquet as pq
+        
+        pq.write_table(self.to_arrow(), path)
+    
+    def to_parquet_bytes(self):
+        """Sonuçları bellekte Parquet biçiminde kodla (indirme butonu için)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        sink = pa.BufferOutputStream()
+        pq.write_table(self.to_arrow(), sink)
+        return sink.getvalue().to_pybytes()
@@ -0,0 +1,158 @@
+"""Sonuç kayıtlarının oluşturulması ve puanlama metrikleri
+
+Sonuç kayıtlarını oluşturan fonksiyonlar saf fonksiyonlardır (yan etkisiz). Metrikler
+RunningStats ile artımlı tutulur; böylece yeniden çalıştırma maliyeti oturum
+uzunluğundan bağımsız kalır.
+"""
+from datetime import datetime
+
+from core.config import APA_FEATURES
+
+REAL = 'gerçek'
+SYNTHETIC = 'sentetik'
+
+def feature_key(feature):
+    """APA özelliğinin sonuç kayıtlarındaki sütun adı"""
+    return feature.replace(" ", "_").lower()
+
+def build_vtt_result(radiologist_id, img_data, classification, response_time=None, wait_time=None):
+    """Görsel Turing Testi cevabından sonuç kaydı oluştur
+    
+    response_time görüntünün gösterilmesinden cevaba, wait_time cevaptan önceki
+    indirme/hazırlama beklemesinden geçen süredir (saniye; ölçülemediyse None).
+    """
+    return {
+        'radiologist_id': radiologist_id,
+        'image_path': img_data['name'],
+        'image_id': img_data.get('drive_id', ''),
+        'true_type': img_data['true_type'],
+        'classified_as': classification,
+        'correct': img_data['true_type'] == classification,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'response_time': response_time,
+        'wait_time': wait_time
+    }
+
+def build_apa_result(radiologist_id, img_data, image_number, ratings, response_time=None, wait_time=None):
+    """Anatomik Olabilirlik puanlarından sonuç kaydı oluştur (süreler build_vtt_result'taki gibi)"""
+    result = {
+        'radiologist_id': radiologist_id,
+        'image_path': img_data['name'],
+        'image_id': img_data.get('drive_id', ''),
+        'image_number': image_number,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'response_time': response_time,
+        'wait_time': wait_time
+    }
+    
+    # Her özellik için puanları kaydet
+    for feature in APA_FEATURES:
+        result[feature_key(feature)] = ratings[feature]
+    
+    return result
+
+class RunningStats:
+    """Oturum sonuçlarının artımlı özeti
+    
+    Her yeni sonuç add() ile O(1) sürede işlenir: VTT için karışıklık matrisi hücreleri,
+    APA için özellik başına toplam, kareler toplamı ve 1-5 puan histogramı tutulur.
+    Kenar çubuğu ve bitiş ekranları sonuç listesini tekrar taramadan buradan okur.
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.correct = 0
+        self.true_positive = 0
+        self.false_positive = 0
+        self.true_negative = 0
+        self.false_negative = 0
+        self.score_sums = {feature: 0 for feature in APA_FEATURES}
+        self.score_squares = {feature: 0 for feature in APA_FEATURES}
+        self.score_histograms = {feature: [0] * 5 for feature in APA_FEATURES}
+    
+    @classmethod
+    def from_results(cls, results):
+        """Var olan bir sonuç listesinden (ör. devam ettirilen oturum) özeti kur"""
+        stats = cls()
+        for result in results:
+            stats.add(result)
+        return stats
+    
+    def add(self, result):
+        """Tek bir sonuç kaydını özete ekle"""
+        self.count += 1
+        if 'classified_as' in result:
+            self._add_vtt(result)
+        else:
+            self._add_apa(result)
+    
+    def _add_vtt(self, result):
+        if result['correct']:
+            self.correct += 1
+        if result['true_type'] == REAL:
+            if result['classified_as'] == REAL:
+                self.true_positive += 1
+            else:
+                self.false_negative += 1
+        else:
+            if result['classified_as'] == SYNTHETIC:
+                self.true_negative += 1
+            else:
+                self.false_positive += 1
+    
+    def _add_apa(self, result):
+        for feature in APA_FEATURES:
+            score = int(result[feature_key(feature)])
+            self.score_sums[feature] += score
+            self.score_squares[feature] += score * score
+            self.score_histograms[feature][score - 1] += 1
+    
+    @property
+    def classified_real(self):
+        """Gerçek olarak sınıflandırılan görüntü sayısı"""
+        return self.true_positive + self.false_positive
+    
+    @property
+    def classified_synthetic(self):
+        """Sentetik olarak sınıflandırılan görüntü sayısı"""
+        return self.true_negative + self.false_negative
+    
+    def vtt_metrics(self):
+        """Doğruluk (%), duyarlılık ve özgüllüğü karışıklık matrisi hücreleriyle birlikte döndür
+        
+        Gerçek görüntüler pozitif sınıf kabul edilir: duyarlılık gerçek görüntülerin,
+        özgüllük sentetik görüntülerin doğru tanınma oranıdır.
+        """
+        positives = self.true_positive + self.false_negative
+        negatives = self.true_negative + self.false_positive
+        return {
+            'total': self.count,
+            'accuracy': self.correct / self.count * 100 if self.count else 0,
+            'sensitivity': self.true_positive / positives if positives > 0 else 0,
+            'specificity': self.true_negative / negatives if negatives > 0 else 0,
+            'true_positive': self.true_positive,
+            'false_positive': self.false_positive,
+            'true_negative': self.true_negative,
+            'false_negative': self.false_negative
+        }
+    
+    def apa_means(self):
+        """Her APA özelliği için ortalama puan"""
+        if not self.count:
+            return {feature: 0 for feature in APA_FEATURES}
+        return {feature: self.score_sums[feature] / self.count for feature in APA_FEATURES}
+    
+    def apa_std(self):
+        """Her APA özelliği için puanların (örneklem) standart sapması"""
+        if self.count < 2:
+            return {feature: 0 for feature in APA_FEATURES}
+        stds = {}
+        for feature in APA_FEATURES:
+            mean = self.score_sums[feature] / self.count
+            variance = (self.score_squares[feature] - self.count * mean * mean) / (self.count - 1)
+            stds[feature] = max(variance, 0) ** 0.5
+        return stds
+    
+    def apa_score_distribution(self):
+        """Her APA özelliği için 1-5 puanlarının sayıları ([1'ler, 2'ler, ..., 5'ler])"""
+        return {feature: list(counts) for feature, counts in self.score_histograms.items()}
@@ -0,0 +1,451 @@
+"""Görüntü kaynakları ve sonuç hedefleri için değiştirilebilir depolama arka uçları
+
+Uygulama depolamadan dört şey ister: bir klasörü listelemek (list), bir dosyayı
+yerel diske almak (fetch), yeni bir dosya yüklemek (put) ve mevcut bir dosyayı
+güncellemek (update). Her arka uç bu sözleşmeyi aynı biçimde sunar:
+
+- DriveStorage: Google Drive (iş parçacığı başına istemci, paylaşılan klasör listesi önbelleği)
+- LocalStorage: yerel veya ağ diskindeki bir kök dizin; görüntüler kopyalanmadan yerinde
+  okunur, görüntü başına hiçbir ağ isteği yapılmaz (hastane içi kurulumlar için)
+- S3Storage: S3 uyumlu nesne deposu (AWS S3, MinIO vb.; endpoint_url ile)
+
+Klasör ve dosya kimlikleri arka uca özgü saydam dizgelerdir (Drive ID, kök dizine
+göre göreli yol, nesne anahtarı); görüntü kayıtlarındaki 'drive_id' alanı günlük
+ve sonuç dosyalarıyla uyumluluk için bu kimliği taşır. list() Drive listeleme
+sonucuyla aynı anahtarlara (id, name, mimeType, size, md5Checksum, modifiedTime)
+sahip sözlükler döndürür; böylece manifest, görüntü önbelleği ve kohort analizi
+arka uçtan bağımsız çalışır. Arka uçlar iş parçacığı güvenlidir, Streamlit
+arayüzüne yazmaz ve hata durumunda istisna fırlatır.
+"""
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import random
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import streamlit as st
+from PIL import Image
+
+from core.config import (
+    DOWNLOAD_MAX_RETRIES,
+    DOWNLOAD_MAX_WORKERS,
+    DOWNLOAD_RETRY_BACKOFF,
+    FOLDER_LISTING_PAGE_SIZE,
+    FOLDER_LISTING_TTL,
+    LOCAL_STORAGE_ROOT,
+    STORAGE_BACKEND,
+    STORAGE_FOLDERS,
+)
+from core.drive import fetch_file_to_path, file_version, get_folder_listing_cache, put_file_to_drive
+from core.metrics import span
+
+class StorageBackend(ABC):
+    """Depolama arka uçlarının ortak sözleşmesi
+    
+    Soyut yöntemlerin hepsini gerçekleştirmeyen bir arka uç oluşturulurken
+    TypeError fırlatır (oturumun ortasında değil).
+    """
+    
+    kind = None
+    label = None  # Arayüzde gösterilen ad
+    
+    @property
+    @abstractmethod
+    def identity(self):
+        """Hedef deponun süreç yeniden başlasa da değişmeyen kimliği (yükleme kuyruğu işleri buna bağlanır)"""
+    
+    @abstractmethod
+    def list(self, folder_id, refresh=False):
+        """Klasördeki dosyaların listesi (Drive dosya sözlükleri biçiminde)"""
+    
+    @abstractmethod
+    def fetch(self, file_id, file_path):
+        """Dosyayı file_path'e indir/kopyala ve yolu döndür"""
+    
+    @abstractmethod
+    def put(self, folder_id, file_name, file_path):
+        """Yerel dosyayı klasöre yeni dosya olarak yükle; dönüş: dosya kimliği"""
+    
+    @abstractmethod
+    def update(self, file_id, file_path, file_name=None):
+        """Mevcut dosyanın içeriğini (ve verilirse adını) güncelle; dönüş: dosya kimliği"""
+    
+    def local_path(self, file_id):
+        """Dosya indirmeden okunabiliyorsa yerel yolu (yalnızca LocalStorage), yoksa None"""
+        return None
+    
+    def file_url(self, file_id):
+        """Dosyanın tarayıcıda açılabilen adresi (yoksa None)"""
+        return None
+    
+    def put_file(self, file_path, folder_id=None, file_id=None, file_name=None):
+        """file_id yoksa yeni dosya oluştur, varsa güncelle (put_file_to_drive ile aynı sözleşme)"""
+        if file_name is None:
+            file_name = os.path.basename(file_path)
+        if file_id is None:
+            return self.put(folder_id, file_name, file_path)
+        return self.update(file_id, file_path, file_name)
+
+class DriveStorage(StorageBackend):
+    """Google Drive arka ucu
+    
+    clients: çağıran iş parçacığına ait Drive istemcisini döndüren fabrika
+    (DriveClientFactory); googleapiclient istemcileri iş parçacıkları arasında
+    paylaşılamadığı için her işlemde fabrikadan alınır.
+    """
+    
+    kind = "drive"
+    label = "Google Drive"
+    
+    def __init__(self, clients):
+        self.clients = clients
+    
+    @property
+    def identity(self):
+        credentials = getattr(self.clients, 'credentials', None)
+        return f"drive:{getattr(credentials, 'service_account_email', None) or ''}"
+    
+    def list(self, folder_id, refresh=False):
+        return get_folder_listing_cache().get(self.clients(), folder_id, refresh=refresh)
+    
+    def fetch(self, file_id, file_path):
+        return fetch_file_to_path(self.clients(), file_id, file_path)
+    
+    def put(self, folder_id, file_name, file_path):
+        return put_file_to_drive(self.clients(), file_path, folder_id=folder_id, file_name=file_name)
+    
+    def update(self, file_id, file_path, file_name=None):
+        return put_file_to_drive(self.clients(), file_path, file_id=file_id, file_name=file_name)
+    
+    def file_url(self, file_id):
+        return f"https://drive.google.com/file/d/{file_id}/view"
+
+def _mime_type(file_name):
+    return mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+
+class LocalStorage(StorageBackend):
+    """Kök dizin altındaki klasörlerden okuyan ve yazan yerel dosya sistemi arka ucu
+    
+    Klasör kimliği kök dizine göre göreli alt dizin, dosya kimliği ise kök dizine
+    göre göreli yoldur ('/' ayraçlı). Sürüm bilgisi (modifiedTime) dosyanın
+    değiştirilme zamanıdır; içerik okunup sağlama toplamı hesaplanmaz.
+    Yazılan dosyalar geçici adla yazılıp os.replace ile yerine taşınır.
+    """
+    
+    kind = "local"
+    label = "Yerel depolama"
+    
+    def __init__(self, root=LOCAL_STORAGE_ROOT):
+        self.root = os.path.abspath(root)
+    
+    @property
+    def identity(self):
+        return f"local:{self.root}"
+    
+    def _path(self, relative):
+        """Göreli kimliği mutlak yola çevir; kök dizinin dışına çıkan kimlikleri reddet"""
+        path = os.path.normpath(os.path.join(self.root, *relative.split('/')))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Depolama kök dizininin dışında: {relative}")
+        return path
+    
+    def _file_id(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+    
+    def list(self, folder_id, refresh=False):
+        with span("storage.list", backend=self.kind):
+            files = []
+            for entry in os.scandir(self._path(folder_id)):
+                if not entry.is_file() or entry.name.startswith('.'):
+                    continue
+                stat = entry.stat()
+                files.append({
+                    'id': self._file_id(entry.path),
+                    'name': entry.name,
+                    'mimeType': _mime_type(entry.name),
+                    'size': str(stat.st_size),
+                    'md5Checksum': None,
+                    'modifiedTime': datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+                })
+            return files
+    
+    def fetch(self, file_id, file_path):
+        with span("storage.download", backend=self.kind):
+            shutil.copyfile(self._path(file_id), file_path)
+        return file_path
+    
+    def _write(self, path, file_path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Gizli geçici ad: yazım sürerken list() dosyayı görmez
+        tmp_path = os.path.join(os.path.dirname(path),
+                                f".{os.path.basename(path)}.tmp-{os.getpid()}-{threading.get_ident()}")
+        try:
+            shutil.copyfile(file_path, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return self._file_id(path)
+    
+    def put(self, folder_id, file_name, file_path):
+        with span("storage.upload", backend=self.kind, operation="create"):
+            return self._write(self._path(f"{folder_id}/{file_name}"), file_path)
+    
+    def update(self, file_id, file_path, file_name=None):
+        path = self._path(file_id)
+        with span("storage.upload", backend=self.kind, operation="update"):
+            if file_name and file_name != os.path.basename(path):
+                # Drive'daki yeniden adlandırmanın karşılığı: yeni adla yaz, eskisini sil
+                new_id = self._write(os.path.join(os.path.dirname(path), file_name), file_path)
+                if os.path.exists(path):
+                    os.remove(path)
+                return new_id
+            return self._write(path, file_path)
+    
+    def local_path(self, file_id):
+        path = self._path(file_id)
+        return path if os.path.isfile(path) else None
+
+class S3Storage(StorageBackend):
+    """S3 uyumlu nesne deposu arka ucu (boto3; MinIO gibi yerel sunucular için endpoint_url)
+    
+    Klasör kimliği anahtar öneki, dosya kimliği nesne anahtarıdır. Listeler
+    FOLDER_LISTING_TTL süresince bellekte tutulur; bu süreçten yapılan yüklemeler
+    ilgili listeyi geçersiz kılar. Sürüm bilgisi ETag (md5Checksum yerine) ve son
+    değiştirilme zamanıdır. boto3 istemcileri iş parçacığı güvenlidir; tek istemci paylaşılır.
+    """
+    
+    kind = "s3"
+    label = "S3 deposu"
+    
+    def __init__(self, bucket, client=None, ttl=FOLDER_LISTING_TTL, **client_options):
+        if client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise ImportError("S3 arka ucu için boto3 kurulu olmalı (pip install boto3)") from e
+            
+            client = boto3.client('s3', **client_options)
+        self.bucket = bucket
+        self.client = client
+        self.endpoint_url = client_options.get('endpoint_url') or getattr(getattr(client, 'meta', None), 'endpoint_url', None)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.listings = {}  # önek -> (time.monotonic, dosyalar)
+    
+    @property
+    def identity(self):
+        return f"s3:{self.endpoint_url or ''}/{self.bucket}"
+    
+    @staticmethod
+    def _prefix(folder_id):
+        return folder_id.strip('/') + '/' if folder_id.strip('/') else ''
+    
+    def list(self, folder_id, refresh=False):
+        prefix = self._prefix(folder_id)
+        with self.lock:
+            cached = self.listings.get(prefix)
+            if cached and not refresh and time.monotonic() - cached[0] < self.ttl:
+                return list(cached[1])
+        
+        files = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        pages = paginator.paginate(Bucket=self.bucket, Prefix=prefix, Delimiter='/',
+                                   PaginationConfig={'PageSize': FOLDER_LISTING_PAGE_SIZE})
+        with span("storage.list", backend=self.kind):
+            for page in pages:
+                for obj in page.get('Contents', []):
+                    name = obj['Key'][len(prefix):]
+                    if not name:
+                        continue
+                    files.append({
+                        'id': obj['Key'],
+                        'name': name,
+                        'mimeType': _mime_type(name),
+                        'size': str(obj['Size']),
+                        'md5Checksum': obj['ETag'].strip('"'),
+                        'modifiedTime': obj['LastModified'].isoformat(),
+                    })
+        
+        with self.lock:
+            self.listings[prefix] = (time.monotonic(), files)
+        return list(files)
+    
+    def fetch(self, file_id, file_path):
+        with span("storage.download", backend=self.kind):
+            self.client.download_file(self.bucket, file_id, file_path)
+        return file_path
+    
+    def _upload(self, key, file_path, operation):
+        with span("storage.upload", backend=self.kind, operation=operation):
+            self.client.upload_file(file_path, self.bucket, key, ExtraArgs={'ContentType': _mime_type(key)})
+        with self.lock:
+            self.listings.pop(self._prefix(posixpath.dirname(key)), None)
+        return key
+    
+    def put(self, folder_id, file_name, file_path):
+        return self._upload(self._prefix(folder_id) + file_name, file_path, "create")
+    
+    def update(self, file_id, file_path, file_name=None):
+        if file_name and file_name != posixpath.basename(file_id):
+            # Nesne anahtarı yeniden adlandırılamaz; yeni adla yükle, eskisini sil
+            key = self._upload(posixpath.join(posixpath.dirname(file_id), file_name), file_path, "update")
+            self.client.delete_object(Bucket=self.bucket, Key=file_id)
+            return key
+        return self._upload(file_id, file_path, "update")
+
+def error_status(error):
+    """Depolama hatasının HTTP durum kodu (Drive HttpError, boto3 ClientError); bilinmiyorsa None
+    
+    Yerel dosya hataları (OSError) sınıflandırılmaz: yüklenen kopyanın diskten
+    okunamaması uzak dosyanın silindiği (404) anlamına gelmez. Yalnızca
+    LocalStorage'ın kök dizin dışı kimlikleri reddettiği ValueError 400 sayılır.
+    """
+    resp = getattr(error, 'resp', None)
+    if getattr(resp, 'status', None):
+        return int(resp.status)
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+        if status:
+            return int(status)
+    if isinstance(error, ValueError):
+        return 400
+    return None
+
+def is_permanent_error(error):
+    """Yeniden denemekle düzelmeyecek bir istemci hatası mı (4xx; zaman aşımı ve hız sınırı hariç)"""
+    status = error_status(error)
+    if status is None or not 400 <= status < 500 or status in (408, 429):
+        return False
+    # Drive hız sınırını 403 ile bildirir (rateLimitExceeded, userRateLimitExceeded)
+    return not (status == 403 and 'ratelimitexceeded' in str(error).lower())
+
+def storage_settings(secrets):
+    """secrets'taki [storage] tablosundan arka uç ayarlarını oku (yoksa config varsayılanları)
+    
+    Örnek (.streamlit/secrets.toml):
+    
+        [storage]
+        backend = "s3"                          # veya "local" (root = "/mnt/nvme/kardiyak")
+        bucket = "kardiyak"
+        endpoint_url = "http://127.0.0.1:9000"  # MinIO; AWS S3 için yazılmaz
+        aws_access_key_id = "..."
+        aws_secret_access_key = "..."
+        real_folder = "gercek"                  # İsteğe bağlı; varsayılanlar STORAGE_FOLDERS
+    
+    Klasör anahtarları dışındaki ayarlar olduğu gibi arka uca (S3'te boto3.client'a) geçirilir.
+    Dönüş: {'backend', 'folders': {'real', 'synthetic', 'results'}, ...arka uca özgü ayarlar}
+    Drive için klasörler None döner; Drive klasör ID'leri config'deki varsayılanlardır.
+    """
+    try:
+        settings = dict(secrets.get('storage', {}))
+    except Exception:
+        settings = {}
+    
+    backend = settings.pop('backend', STORAGE_BACKEND)
+    folders = {name: settings.pop(f"{name}_folder", default) for name, default in STORAGE_FOLDERS.items()}
+    return {'backend': backend, 'folders': folders if backend != "drive" else None, **settings}
+
+def open_storage(settings):
+    """Ayarlara göre yerel veya S3 arka ucunu kur (Drive kimlik bilgisi gerektirdiği için burada kurulmaz)"""
+    options = {k: v for k, v in settings.items() if k not in ('backend', 'folders')}
+    if settings['backend'] == "local":
+        return LocalStorage(options.get('root', LOCAL_STORAGE_ROOT))
+    if settings['backend'] == "s3":
+        bucket = options.pop('bucket')
+        return S3Storage(bucket, **options)
+    raise ValueError(f"Bilinmeyen depolama arka ucu: {settings['backend']}")
+
+@st.cache_resource(show_spinner=False)
+def get_configured_storage(settings_digest, _settings):
+    """Ayar özetine göre süreç genelinde paylaşılan yerel/S3 arka ucunu döndür
+    
+    Erişim anahtarları önbellek anahtarına dahil edilmez, yalnızca özet kullanılır.
+    """
+    return open_storage(_settings)
+
+def settings_digest(settings):
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def download_file_with_retry(storage, file_id, file_name, destination_folder,
+                             version=None, cache=None,
+                             max_retries=DOWNLOAD_MAX_RETRIES, backoff=DOWNLOAD_RETRY_BACKOFF):
+    """Dosyayı üstel geri çekilmeli yeniden deneme ile indir ve görüntü başlığını doğrula
+    
+    Arka plan iş parçacıklarından çağrılır; Streamlit'e yazmaz, hata durumunda son
+    istisnayı fırlatır. Yerinde okunabilen dosyalar (LocalStorage) kopyalanmaz.
+    cache verilirse dosya önbellekte aranır, yoksa önbelleğe indirilir.
+    """
+    local_path = storage.local_path(file_id)
+    if local_path is not None:
+        with Image.open(local_path):
+            pass
+        return local_path
+    
+    def download(file_path):
+        for attempt in range(max_retries + 1):
+            try:
+                storage.fetch(file_id, file_path)
+                break
+            except Exception:
+                if attempt == max_retries:
+                    raise
+                # Eşzamanlı isteklerin aynı anda yeniden denemesini önlemek için rastgele sapma ekle
+                time.sleep(backoff * (2 ** attempt) * random.uniform(1.0, 1.5))
+        
+        # Sadece başlığı okuyarak dosyanın geçerli bir görüntü olduğunu kontrol et
+        with Image.open(file_path):
+            pass
+    
+    if cache is not None:
+        return cache.fetch(file_id, version, file_name, download)
+    
+    file_path = os.path.join(destination_folder, file_name)
+    download(file_path)
+    return file_path
+
+def download_files_concurrently(storage, files, destination_folder,
+                                max_workers=DOWNLOAD_MAX_WORKERS, progress_callback=None, cache=None,
+                                max_retries=DOWNLOAD_MAX_RETRIES, backoff=DOWNLOAD_RETRY_BACKOFF):
+    """Dosyaları sınırlı bir iş parçacığı havuzu ile eşzamanlı indir
+    
+    files: 'id' ve 'name' anahtarlarına sahip dosya sözlükleri (list() sonucu)
+    cache: verilirse dosyalar paylaşılan ImageCache üzerinden alınır
+    progress_callback: (tamamlanan, toplam, dosya) ile ana iş parçacığından çağrılır
+    max_retries, backoff: dosya başına yeniden deneme (download_file_with_retry)
+    Dönüş: ({dosya_id: yerel_yol}, {dosya_id: istisna})
+    """
+    paths = {}
+    errors = {}
+    total = len(files)
+    
+    if total == 0:
+        return paths, errors
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+        futures = {
+            executor.submit(download_file_with_retry, storage, f['id'], f['name'], destination_folder,
+                            version=file_version(f), cache=cache,
+                            max_retries=max_retries, backoff=backoff): f
+            for f in files
+        }
+        
+        for completed, future in enumerate(as_completed(futures), start=1):
+            file = futures[future]
+            try:
+                paths[file['id']] = future.result()
+            except Exception as e:
+                errors[file['id']] = e
+            
+            if progress_callback:
+                progress_callback(completed, total, file)
+    
+    return paths, errors
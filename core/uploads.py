@@ -0,0 +1,403 @@
+"""Depolama yüklemeleri için kalıcı, süreç genelinde paylaşılan arka plan kuyruğu
+
+Sonuç dosyaları (CSV/Parquet) ve grafikler kullanıcıyı bekletmeden kuyruğa
+alınır; tek bir arka plan iş parçacığı bunları depolama arka uçlarına (Drive,
+yerel dizin veya S3; bkz. core/storage.py) yükler. Kuyruk SQLite veritabanında,
+yüklenecek içerik ise kuyruk dizinindeki kopyalarda tutulur; süreç yeniden
+başlasa bile bekleyen yüklemeler kaybolmaz.
+
+- Her iş, kuyruğa alındığı oturumun arka ucunun kimliğiyle (identity) kaydedilir
+  ve yalnızca o arka uca yüklenir. Arka uçlar attach() ile bağlanır; arka ucu
+  henüz bağlanmamış işler (ör. yeniden başlatmadan sonra) bağlanınca devam eder.
+- Aynı hedef dosyaya (arka uç + klasör + dosya adı) yapılan ardışık yüklemeler
+  tek satırda birleştirilir; yalnızca en son içerik yüklenir. O anda yüklenmekte
+  olan eski içeriğin kopyası yükleme bitene kadar silinmez.
+- Hedefin dosya kimliği ilk yüklemeden sonra kaydedilir; sonraki yüklemeler
+  yeni dosya oluşturmak yerine aynı dosyayı günceller. Kayıtlı dosya depoda
+  artık yoksa (404) kimlik unutulur ve dosya yeniden oluşturulur.
+- Geçici hatalar üstel geri çekilmeyle (rastgele sapmalı, üst sınırlı) en fazla
+  max_attempts kez yeniden denenir. Kalıcı hatalar (diğer 4xx), deneme sınırı
+  ve kaybolmuş içerik kopyaları işi düşürür; son hata status()'ta görünür.
+"""
+import hashlib
+import os
+import random
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from core.config import (
+    UPLOAD_MAX_ATTEMPTS,
+    UPLOAD_MAX_BACKOFF,
+    UPLOAD_POLL_INTERVAL,
+    UPLOAD_QUEUE_DIR,
+    UPLOAD_RETRY_BACKOFF,
+)
+from core.metrics import registry
+from core.storage import error_status, is_permanent_error
+
+def upload_key(storage_identity, folder_id, file_name):
+    """Yükleme hedefinin anahtarı; aynı anahtarlı yüklemeler birleştirilir"""
+    return f"{storage_identity}|{folder_id}/{file_name}"
+
+class StorageUploads:
+    """Kuyruğun tek bir depolama arka ucuna bağlı görünümü (attach() döndürür)
+    
+    Bu görünümle kuyruğa alınan işler yalnızca bu arka uca yüklenir; böylece
+    farklı arka uçlara bağlı oturumlar birbirinin yüklemelerini etkilemez.
+    """
+    
+    def __init__(self, queue, storage):
+        self.queue = queue
+        self.storage = storage
+    
+    def enqueue(self, folder_id, file_name, **kwargs):
+        """UploadQueue.enqueue; iş bu arka uca bağlanır"""
+        return self.queue.enqueue(self.storage, folder_id, file_name, **kwargs)
+    
+    def file_id(self, key):
+        return self.queue.file_id(key)
+    
+    def is_pending(self, key):
+        return self.queue.is_pending(key)
+
+class UploadQueue:
+    """Kalıcı yükleme kuyruğu ve onu boşaltan arka plan iş parçacığı
+    
+    enqueue() içeriği kuyruk dizinine kopyalayıp hemen döner. Yükleme sonucu
+    file_id(anahtar) ile sorgulanır; enqueue'ya verilen on_uploaded(dosya_id)
+    geri çağrısı yükleme başarılı olduğunda arka plan iş parçacığından çağrılır
+    (yalnızca bellekte tutulur, süreç yeniden başlarsa çağrılmaz).
+    """
+    
+    def __init__(self, directory=UPLOAD_QUEUE_DIR, backoff=UPLOAD_RETRY_BACKOFF,
+                 max_backoff=UPLOAD_MAX_BACKOFF, poll_interval=UPLOAD_POLL_INTERVAL,
+                 max_attempts=UPLOAD_MAX_ATTEMPTS):
+        self.directory = os.path.abspath(directory)  # Çalışma dizini değişse de aynı kuyruk
+        self.spool_dir = os.path.join(self.directory, "dosyalar")
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(self.directory, "kuyruk.sqlite3"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS uploads (
+                key TEXT PRIMARY KEY,
+                storage TEXT,
+                folder_id TEXT,
+                file_name TEXT NOT NULL,
+                spool_path TEXT NOT NULL,
+                revision INTEGER NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                last_error TEXT,
+                enqueued_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS uploaded (
+                key TEXT PRIMARY KEY,
+                file_id TEXT NOT NULL,
+                uploaded_at TEXT NOT NULL
+            );
+        """)
+        # Arka uç sütunu olmayan eski kuyruk: bu satırlar ilk bağlanan arka uca yüklenir
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(uploads)")]
+        if 'storage' not in columns:
+            self.conn.execute("ALTER TABLE uploads ADD COLUMN storage TEXT")
+        self.conn.commit()
+        
+        self.storages = {}  # arka uç kimliği -> bağlı arka uç
+        self.callbacks = {}  # anahtar -> [on_uploaded]
+        self.uploading = None  # Yüklenmekte olan içerik kopyasının yolu
+        self.coalesced = 0  # Kuyruktaki bir yüklemenin yerini alan yükleme sayısı
+        self.completed = 0
+        self.dropped = 0
+        self.last_error = None
+        self.last_drop_error = None
+        self.last_upload_time = None
+        
+        self.wake = threading.Event()
+        self.idle = threading.Condition()
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name="storage-uploads", daemon=True)
+        self.thread.start()
+    
+    def attach(self, storage):
+        """Depolama arka ucunu bağla (ona ait bekleyen yüklemeler başlar); dönüş: StorageUploads"""
+        with self.lock:
+            self.storages[storage.identity] = storage
+        self.wake.set()
+        return StorageUploads(self, storage)
+    
+    def enqueue(self, storage, folder_id, file_name, file_path=None, data=None, file_id=None, on_uploaded=None):
+        """Dosyayı (file_path) veya baytları (data) storage arka ucuna yüklenmek üzere kuyruğa al
+        
+        file_id verilirse ve hedef için kayıtlı bir ID yoksa o dosya güncellenir
+        (ör. sürdürülen oturumun günlüğündeki sonuç dosyası). Dönüş: yükleme anahtarı.
+        """
+        with self.lock:
+            self.storages.setdefault(storage.identity, storage)
+        key = upload_key(storage.identity, folder_id, file_name)
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:24]
+        extension = os.path.splitext(file_name)[1]
+        
+        with self.lock:
+            row = self.conn.execute("SELECT revision, spool_path FROM uploads WHERE key = ?", (key,)).fetchone()
+            revision = row[0] + 1 if row else 1
+            spool_path = os.path.join(self.spool_dir, f"{digest}-{revision}{extension}")
+            
+            # Kopya önce geçici adla yazılır; kuyruk satırı yalnızca tam bir kopyayı gösterir
+            tmp_path = spool_path + ".tmp"
+            if data is not None:
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+            else:
+                shutil.copyfile(file_path, tmp_path)
+            os.replace(tmp_path, spool_path)
+            
+            if file_id is not None:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO uploaded (key, file_id, uploaded_at) VALUES (?, ?, ?)",
+                    (key, file_id, datetime.now().isoformat()))
+            self.conn.execute("""
+                INSERT INTO uploads (key, storage, folder_id, file_name, spool_path, revision, next_attempt, enqueued_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    spool_path = excluded.spool_path,
+                    revision = excluded.revision,
+                    attempts = 0,
+                    next_attempt = excluded.next_attempt,
+                    last_error = NULL
+            """, (key, storage.identity, folder_id, file_name, spool_path, revision, time.time(),
+                  datetime.now().isoformat()))
+            self.conn.commit()
+            
+            if row:
+                # Henüz yüklenmemiş eski içerik artık gerekmiyor; yüklenmekteyse
+                # kopyayı yükleme bitince _upload siler
+                self.coalesced += 1
+                if row[1] != self.uploading:
+                    self._remove_spool(row[1])
+            if on_uploaded is not None:
+                self.callbacks.setdefault(key, []).append(on_uploaded)
+        
+        self.wake.set()
+        return key
+    
+    def file_id(self, key):
+        """Hedefin dosya kimliği (henüz hiç yüklenmediyse None)"""
+        with self.lock:
+            row = self.conn.execute("SELECT file_id FROM uploaded WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def is_pending(self, key):
+        """Hedefin kuyrukta bekleyen bir yüklemesi var mı"""
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM uploads WHERE key = ?", (key,)).fetchone() is not None
+    
+    def _attached_condition(self):
+        """Arka ucu bağlı işleri seçen SQL koşulu ve parametreleri (self.lock tutulurken çağrılır)"""
+        identities = list(self.storages)
+        if not identities:
+            return "0", []
+        placeholders = ", ".join("?" * len(identities))
+        return f"(storage IN ({placeholders}) OR storage IS NULL)", identities
+    
+    def status(self):
+        """Kenar çubuğu ve ölçümler için özet: bekleyen, hata veren, tamamlanan, birleştirilen..."""
+        with self.lock:
+            condition, params = self._attached_condition()
+            pending, failing, attached = self.conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(attempts > 0), 0), COALESCE(SUM({condition}), 0) FROM uploads",
+                params).fetchone()
+        return {
+            'pending': pending,
+            'failing': failing,
+            'completed': self.completed,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            # Bekleyen işlerin hepsinin arka ucu bağlı mı
+            'attached': attached == pending,
+            'waiting': pending - attached,
+            'last_error': self.last_error,
+            'last_drop_error': self.last_drop_error,
+            'last_upload_time': self.last_upload_time,
+        }
+    
+    def _next_due(self):
+        """Arka ucu bağlı, sıradaki iş (yoksa None)"""
+        with self.lock:
+            condition, params = self._attached_condition()
+            return self.conn.execute(f"""
+                SELECT key, storage, folder_id, file_name, spool_path, revision, attempts, next_attempt
+                FROM uploads WHERE {condition} ORDER BY next_attempt LIMIT 1
+            """, params).fetchone()
+    
+    def _storage_for(self, identity):
+        with self.lock:
+            if identity is None:
+                return next(iter(self.storages.values()), None)
+            return self.storages.get(identity)
+    
+    def _run(self):
+        while not self.stopped:
+            row = self._next_due()
+            if row is None:
+                with self.idle:
+                    self.idle.notify_all()
+                self.wake.wait(self.poll_interval)
+                self.wake.clear()
+                continue
+            
+            delay = row[7] - time.time()
+            if delay > 0:
+                self.wake.wait(min(delay, self.poll_interval))
+                self.wake.clear()
+                continue
+            
+            self._upload(*row[:7])
+    
+    def _drop(self, key, revision, error):
+        """İşi kalıcı olarak düşür (yeniden denenmez); kuyruğa yeni içerik alınırsa hedef yeniden denenir"""
+        with self.lock:
+            done = self.conn.execute("DELETE FROM uploads WHERE key = ? AND revision = ?", (key, revision)).rowcount
+            self.conn.commit()
+            if done:
+                self.callbacks.pop(key, None)
+        self.dropped += 1
+        self.last_error = error
+        self.last_drop_error = error
+    
+    def _put(self, storage, key, folder_id, file_name, spool_path):
+        """Dosyayı yükle; kayıtlı dosya depoda artık yoksa kimliği unutup yeniden oluştur"""
+        file_id = self.file_id(key)
+        try:
+            return storage.put_file(spool_path, folder_id=folder_id, file_id=file_id, file_name=file_name)
+        except Exception as e:
+            if file_id is None or error_status(e) not in (404, 410):
+                raise
+        
+        with self.lock:
+            self.conn.execute("DELETE FROM uploaded WHERE key = ? AND file_id = ?", (key, file_id))
+            self.conn.commit()
+        return storage.put_file(spool_path, folder_id=folder_id, file_name=file_name)
+    
+    def _upload(self, key, identity, folder_id, file_name, spool_path, revision, attempts):
+        """Kuyruktaki tek bir yüklemeyi dene ve sonucu kuyruğa işle"""
+        storage = self._storage_for(identity)
+        if storage is None:
+            return
+        
+        with self.lock:
+            # Satır okunduktan sonra daha yeni içerik kuyruğa alındıysa bu sürüm eskidi;
+            # sıradaki turda yenisi yüklenir. Aksi halde kopya yükleme bitene kadar korunur.
+            current = self.conn.execute("SELECT revision FROM uploads WHERE key = ?", (key,)).fetchone()
+            if current is None or current[0] != revision:
+                return
+            self.uploading = spool_path
+        
+        try:
+            self._attempt(storage, key, folder_id, file_name, spool_path, revision, attempts)
+        finally:
+            with self.lock:
+                self.uploading = None
+                current = self.conn.execute("SELECT spool_path FROM uploads WHERE key = ?", (key,)).fetchone()
+            # Satır tamamlandıysa, düşürüldüyse veya daha yeni içerikle birleştirildiyse kopya artık gerekmiyor
+            if current is None or current[0] != spool_path:
+                self._remove_spool(spool_path)
+    
+    def _attempt(self, storage, key, folder_id, file_name, spool_path, revision, attempts):
+        if not os.path.exists(spool_path):
+            # İçerik kopyası kaybolmuş; yeniden denemek anlamsız
+            self._drop(key, revision, f"{file_name}: kuyruktaki kopya bulunamadı")
+            return
+        
+        try:
+            file_id = self._put(storage, key, folder_id, file_name, spool_path)
+        except Exception as e:
+            if is_permanent_error(e):
+                self._drop(key, revision, f"{file_name}: kalıcı hata, yükleme bırakıldı: {e}")
+                return
+            if attempts + 1 >= self.max_attempts:
+                self._drop(key, revision,
+                           f"{file_name}: {self.max_attempts} denemede yüklenemedi, yükleme bırakıldı: {e}")
+                return
+            
+            self.last_error = f"{file_name}: {e}"
+            delay = min(self.max_backoff, self.backoff * (2 ** attempts)) * random.uniform(1.0, 1.5)
+            with self.lock:
+                self.conn.execute(
+                    "UPDATE uploads SET attempts = attempts + 1, next_attempt = ?, last_error = ? "
+                    "WHERE key = ? AND revision = ?",
+                    (time.time() + delay, str(e), key, revision))
+                self.conn.commit()
+            return
+        
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO uploaded (key, file_id, uploaded_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET file_id = excluded.file_id, uploaded_at = excluded.uploaded_at
+            """, (key, file_id, datetime.now().isoformat()))
+            # Yükleme sırasında daha yeni bir içerik kuyruğa alındıysa satır onun için kalır
+            done = self.conn.execute(
+                "DELETE FROM uploads WHERE key = ? AND revision = ?", (key, revision)).rowcount
+            self.conn.commit()
+            callbacks = self.callbacks.pop(key, []) if done else list(self.callbacks.get(key, []))
+        
+        self.completed += 1
+        self.last_error = None
+        self.last_upload_time = datetime.now()
+        for callback in callbacks:
+            try:
+                callback(file_id)
+            except Exception:
+                pass
+    
+    def _remove_spool(self, spool_path):
+        try:
+            os.remove(spool_path)
+        except OSError:
+            pass
+    
+    def wait_idle(self, timeout=None):
+        """Kuyruk boşalana (veya kalan işlerin arka ucu bağlı değilse beklemeye geçene) kadar bekle; dönüş: boş mu"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.wake.set()
+        with self.idle:
+            while True:
+                status = self.status()
+                # Satırı silinmiş ama kopyası henüz temizlenmemiş iş de sürüyor sayılır
+                if status['pending'] <= status['waiting'] and self.uploading is None:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self.idle.wait(remaining if remaining is not None else self.poll_interval)
+        return self.status()['pending'] == 0
+    
+    def stop(self):
+        self.stopped = True
+        self.wake.set()
+
+@st.cache_resource
+def get_upload_queue():
+    """Süreç genelinde paylaşılan yükleme kuyruğu"""
+    queue = UploadQueue()
+    registry.register_gauge(
+        "upload_queue_pending",
+        "Depolamaya yüklenmeyi bekleyen dosya sayısı",
+        lambda: queue.status()['pending']
+    )
+    registry.register_gauge(
+        "upload_queue_failing",
+        "Son denemesi hata veren bekleyen yükleme sayısı",
+        lambda: queue.status()['failing']
+    )
+    return queue
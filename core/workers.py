@@ -0,0 +1,193 @@
+"""CPU yoğun işler için süreç havuzu ve kabul denetimi
+
+Görüntü türevi üretimi, grafik çizimi ve uyum istatistikleri gibi işler betik
+iş parçacıklarında çalıştığında tüm oturumlar aynı GIL için yarışır. Bu işler
+süreç genelinde paylaşılan bir ProcessPoolExecutor'a gönderilir:
+
+- Aynı anda kabul edilen iş sayısı (çalışan + sırada bekleyen) sınırlıdır; sınır
+  doluysa çağıran en fazla admission_timeout saniye bekler, sonra WorkerPoolBusy
+  fırlatılır. Böylece aşırı yükte kuyruk ve gecikme sınırsız büyümez. task_timeout
+  içinde bitmeyen işler için WorkerTaskTimeout fırlatılır.
+- Alt süreçler 'spawn' ile başlatılır (çok iş parçacıklı sunucu sürecinden fork
+  edilmez). spawn alt süreçte ana modülü (__main__) yeniden çalıştırır; Streamlit
+  uygulama betiğini __main__ olarak kurduğundan her alt süreç betiği baştan
+  çalıştırırdı. Havuzun alt süreçleri adlarından tanınır ve yalnızca onların
+  hazırlık verisinden ana modül bilgisi çıkarılır; sys.modules'a dokunulmaz,
+  diğer süreçlerin ve oturumların gördüğü hiçbir şey değişmez.
+- max_workers 0 ise işler çağıran iş parçacığında çalışır (tek kullanıcılı kurulum).
+
+Gönderilen fonksiyonlar modül düzeyinde tanımlı, argümanları ve dönüş değerleri
+pickle ile aktarılabilir olmalıdır.
+"""
+import itertools
+import multiprocessing
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import spawn
+
+import streamlit as st
+
+from core.config import WORKER_ADMISSION_TIMEOUT, WORKER_MAX_PENDING, WORKER_PROCESSES, WORKER_TASK_TIMEOUT
+from core.metrics import registry, span
+
+# Havuz alt süreçlerinin ad öneki; hazırlık verisi yalnızca bu adlı süreçler için süzülür
+_WORKER_NAME = "cpu-worker"
+
+def _worker_preparation_data(name, _get_preparation_data=spawn.get_preparation_data):
+    """spawn.get_preparation_data; havuz alt süreçleri için ana modül bilgisi olmadan
+    
+    Alt süreçte yalnızca gönderilen işlerin modülleri (core.*) içe aktarılır.
+    """
+    data = _get_preparation_data(name)
+    if name.startswith(_WORKER_NAME):
+        data.pop('init_main_from_name', None)
+        data.pop('init_main_from_path', None)
+    return data
+
+# Modül yeniden yüklenirse (Streamlit dosya değişikliğinde) sarmalayıcı üst üste eklenmez
+if getattr(spawn.get_preparation_data, '__name__', None) != _worker_preparation_data.__name__:
+    spawn.get_preparation_data = _worker_preparation_data
+
+class _WorkerProcess(multiprocessing.context.SpawnProcess):
+    """Havuzun alt süreci; adı _WORKER_NAME ile başlar"""
+    
+    _numbers = itertools.count(1)
+    
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('name', f"{_WORKER_NAME}-{next(self._numbers)}")
+        super().__init__(*args, **kwargs)
+
+class _WorkerContext(multiprocessing.context.SpawnContext):
+    """Alt süreçleri _WorkerProcess olarak başlatan 'spawn' bağlamı"""
+    
+    Process = _WorkerProcess
+
+class WorkerPoolBusy(RuntimeError):
+    """Süreç havuzu kabul sınırında; iş daha sonra yeniden denenmeli"""
+
+class WorkerTaskTimeout(RuntimeError):
+    """İş task_timeout içinde bitmedi (havuz aşırı yüklü); iş daha sonra yeniden denenmeli"""
+
+class WorkerPool:
+    """Sınırlı kabullü süreç havuzu; run() işi bir alt süreçte çalıştırıp sonucunu döndürür"""
+    
+    def __init__(self, max_workers=WORKER_PROCESSES, max_pending=WORKER_MAX_PENDING,
+                 admission_timeout=WORKER_ADMISSION_TIMEOUT, task_timeout=WORKER_TASK_TIMEOUT):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.admission_timeout = admission_timeout
+        self.task_timeout = task_timeout
+        self.slots = threading.BoundedSemaphore(max_workers + max_pending) if max_workers else None
+        self.lock = threading.Lock()
+        self.executor = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+    
+    def _start_executor(self):
+        """Havuzu kur; alt süreçler ilk gönderimlerde başlatılır"""
+        from concurrent.futures import ProcessPoolExecutor
+        
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_WorkerContext())
+    
+    def _submit(self, fn, args, kwargs):
+        """İşi havuza gönder (havuz yoksa kurulur); dönüş: (havuz, future)"""
+        with self.lock:
+            if self.executor is None:
+                self.executor = self._start_executor()
+            return self.executor, self.executor.submit(fn, *args, **kwargs)
+    
+    def _discard_executor(self, executor):
+        """Çöken (BrokenProcessPool) havuzu bırak; sonraki iş yeni bir havuz kurar"""
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+                self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    def run(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) sonucunu alt süreçte hesapla (süresi 'worker.task' olarak ölçülür)
+        
+        Kabul sınırı admission_timeout içinde boşalmazsa WorkerPoolBusy, iş
+        task_timeout içinde bitmezse WorkerTaskTimeout fırlatır.
+        """
+        task = getattr(fn, '__name__', 'task')
+        if self.slots is None:
+            with span("worker.task", task=task, mode="inline"):
+                return fn(*args, **kwargs)
+        
+        if not self.slots.acquire(timeout=self.admission_timeout):
+            with self.lock:
+                self.rejected += 1
+            raise WorkerPoolBusy(f"İşlem kuyruğu dolu ({self.max_workers + self.max_pending} iş)")
+        
+        with self.lock:
+            self.in_flight += 1
+        try:
+            with span("worker.task", task=task, mode="process"):
+                executor, future = self._submit(fn, args, kwargs)
+                try:
+                    try:
+                        return future.result(timeout=self.task_timeout)
+                    except BrokenProcessPool:
+                        # Bir alt süreç öldüyse havuzu yenile ve işi bir kez daha dene
+                        self._discard_executor(executor)
+                        future = self._submit(fn, args, kwargs)[1]
+                        return future.result(timeout=self.task_timeout)
+                except FutureTimeoutError:
+                    future.cancel()
+                    with self.lock:
+                        self.timeouts += 1
+                    raise WorkerTaskTimeout(f"İşlem {self.task_timeout} saniyede tamamlanamadı ({task})") from None
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.completed += 1
+            self.slots.release()
+    
+    def status(self):
+        """Yönetici paneli ve ölçümler için anlık durum"""
+        with self.lock:
+            return {
+                'workers': self.max_workers,
+                'capacity': self.max_workers + self.max_pending if self.max_workers else 0,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'restarts': self.restarts,
+            }
+    
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+@st.cache_resource
+def get_worker_pool():
+    """Süreç genelinde paylaşılan CPU iş havuzu"""
+    pool = WorkerPool()
+    registry.register_gauge(
+        "worker_pool_in_flight",
+        "Süreç havuzunda çalışan veya sırada bekleyen iş sayısı",
+        lambda: pool.status()['in_flight']
+    )
+    registry.register_gauge(
+        "worker_pool_rejected",
+        "Kabul sınırı dolu olduğu için reddedilen iş sayısı (süreç başından beri)",
+        lambda: pool.status()['rejected']
+    )
+    registry.register_gauge(
+        "worker_pool_timeouts",
+        "task_timeout içinde bitmediği için beklenmesi bırakılan iş sayısı (süreç başından beri)",
+        lambda: pool.status()['timeouts']
+    )
+    return pool
+
+def run_cpu(fn, *args, **kwargs):
+    """get_worker_pool().run kısayolu"""
+    return get_worker_pool().run(fn, *args, **kwargs)
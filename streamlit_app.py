@@ -1,48 +1,77 @@
+# Not: numpy, pandas, matplotlib, seaborn ve Google API kütüphaneleri
+# yalnızca kullanıldıkları fonksiyonların içinde içe aktarılır. Her tıklamada çalışan
+# değerlendirme döngüsü yalnızca streamlit ve PIL'e ihtiyaç duyar; ağır kütüphaneler
+# soğuk başlangıcı saniyelerce uzatıyordu (bkz. benchmarks/import_time.py).
 import os
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 import streamlit as st
-from PIL import Image
 import random
-from sklearn.metrics import cohen_kappa_score
-import seaborn as sns
-import io
-import base64
 from datetime import datetime
 import tempfile
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
 import json
-import googleapiclient
+import hashlib
+import hmac
+
+from core.agreement import compute_agreement
+from core.charts import finish_charts
+from core.config import (
+    ADMIN_QUERY_PARAM,
+    APA_FEATURES,
+    BOOTSTRAP_RESAMPLES,
+    CONFIDENCE_LEVEL,
+    DEFAULT_OUTPUT_DIR,
+    DEFAULT_REAL_FOLDER_ID,
+    DEFAULT_RESULTS_FOLDER_ID,
+    DEFAULT_SYNTHETIC_FOLDER_ID,
+    DOWNLOAD_MAX_WORKERS,
+    METRICS_FILE,
+    METRICS_WRITE_INTERVAL,
+    RESPONSE_TIME_PERCENTILES,
+)
+from core.cohort import get_cohort_cache, is_vtt_result_file, local_result_sources, prefer_parquet
+from core.confidence import (
+    agreement_confidence_intervals,
+    mean_confidence_intervals,
+    vtt_confidence_intervals,
+    weighted_kappa_interval,
+)
+from core.drive import file_version, get_drive_client_factory
+from core.image_cache import get_display_image, get_image_cache
+from core.journal import ResultWriter, find_resumable_sessions, journal_image_entry
+from core.manifest import get_image_manifest
+from core.metrics import MetricsFileWriter, observe, registry, span
+from core.prefetch import ImagePrefetcher
+from core.response_times import clock, reader_time_table, time_summary
+from core.results import ResultStore, parquet_path_for, parquet_supported, read_result_files, read_results
+from core.storage import (
+    DriveStorage,
+    download_files_concurrently,
+    get_configured_storage,
+    settings_digest,
+    storage_settings,
+)
+from core.scoring import (
+    REAL,
+    SYNTHETIC,
+    build_apa_result,
+    build_vtt_result,
+    RunningStats,
+    feature_key,
+)
+from core.uploads import get_upload_queue
+from core.workers import WorkerPoolBusy, WorkerTaskTimeout, run_cpu
+
+# Bu çalıştırmanın başladığı an (monoton saat); bir butona basıldığında cevabın
+# sunucuya ulaştığı ana karşılık gelir
+RUN_STARTED_AT = clock()
 
 # Uygulama başlığı ve açıklaması
 st.set_page_config(page_title="Kardiyak Görüntü Değerlendirme Platformu", layout="wide")
 st.title("Kardiyak Görüntü Değerlendirme Platformu")
 st.markdown("Bu platform, kardiyak görüntülerin değerlendirilmesi için iki farklı test sunar.")
 
-# Varsayılan dizin yolu (sadece sonuçlar için)
-DEFAULT_OUTPUT_DIR = r".\results"  # Yerel dizin yolu
+# Sonuçlar için yerel dizin
 os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
 
-# Google Drive entegrasyonu için değişkenler
-SCOPES = ['https://www.googleapis.com/auth/drive.readonly', 'https://www.googleapis.com/auth/drive.file']
-
-# Google Drive klasör ID'leri
-DEFAULT_REAL_FOLDER_ID = "1XJgpXqdVSfOIriECXwXuwccs3N0KiqQ_"  # Gerçek klasör ID'si
-DEFAULT_SYNTHETIC_FOLDER_ID = "1iGykeA2-cG68wj-4xZDXLp6CH4DcisLo"  # Sentetik klasör ID'si
-DEFAULT_RESULTS_FOLDER_ID = "1Zjh8EDGnUAJGor4sVxIyMllw1zswlWQA"  # Sonuçlar klasör ID'si
-
-# Anatomik Olabilirlik Değerlendirmesi özellikleri
-APA_FEATURES = [
-    "Genel Anatomik Olabilirlik",
-    "Ventrikül Morfolojisi",
-    "Miyokard Kalınlığı",
-    "Papiller Kas Tanımı",
-    "Kan Havuzu Kontrastı"
-]
-
 # Oturum durumlarını kontrol et ve başlat
 if 'test_type' not in st.session_state:
     st.session_state.test_type = "vtt"  # Varsayılan olarak Görsel Turing Testi seç
@@ -53,79 +82,41 @@ if 'test_type' not in st.session_state:
     st.session_state.completed = False
     st.session_state.radiologist_id = ""
     st.session_state.output_dir = DEFAULT_OUTPUT_DIR
-    st.session_state.drive_service = None
-    st.session_state.real_folder_id = DEFAULT_REAL_FOLDER_ID
-    st.session_state.synth_folder_id = DEFAULT_SYNTHETIC_FOLDER_ID
-    st.session_state.results_folder_id = DEFAULT_RESULTS_FOLDER_ID
+    st.session_state.storage = None
+    # Drive dışındaki arka uçlarda klasörler secrets'taki [storage] ayarlarından gelir
+    storage_folders = storage_settings(st.secrets)['folders'] or {
+        'real': DEFAULT_REAL_FOLDER_ID,
+        'synthetic': DEFAULT_SYNTHETIC_FOLDER_ID,
+        'results': DEFAULT_RESULTS_FOLDER_ID,
+    }
+    st.session_state.real_folder_id = storage_folders['real']
+    st.session_state.synth_folder_id = storage_folders['synthetic']
+    st.session_state.results_folder_id = storage_folders['results']
     st.session_state.temp_dir = tempfile.mkdtemp()
     st.session_state.credentials_uploaded = False
     st.session_state.save_to_drive = True
     st.session_state.drive_result_file_id = None
+    st.session_state.drive_graph_upload_key = None
+    st.session_state.streaming_mode = True
+    st.session_state.prefetcher = None
+    st.session_state.result_writer = None
+    st.session_state.running_stats = None
+    st.session_state.image_timing = None
+    st.session_state.answered_at = None
     # APA özellikleri için varsayılan puanlar
     st.session_state.ratings = {feature: 3 for feature in APA_FEATURES}
 
 ## ORTAK FONKSİYONLAR ##
 
-def upload_file_to_drive(drive_service, file_path, folder_id, file_name=None):
-    """Google Drive'a dosya yükle"""
-    try:
-        if file_name is None:
-            file_name = os.path.basename(file_path)
-        
-        file_metadata = {
-            'name': file_name,
-            'parents': [folder_id]
-        }
-        
-        media = googleapiclient.http.MediaFileUpload(
-            file_path, 
-            resumable=True
-        )
-        
-        file = drive_service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id'
-        ).execute()
-        
-        return file.get('id')
-    except Exception as e:
-        st.error(f"Drive'a dosya yükleme hatası: {e}")
-        return None
-
-def update_file_in_drive(drive_service, file_path, file_id, file_name=None):
-    """Google Drive'daki dosyayı güncelle"""
-    try:
-        if file_name is None:
-            file_name = os.path.basename(file_path)
-        
-        file_metadata = {
-            'name': file_name
-        }
-        
-        media = googleapiclient.http.MediaFileUpload(
-            file_path, 
-            resumable=True
-        )
-        
-        file = drive_service.files().update(
-            fileId=file_id,
-            body=file_metadata,
-            media_body=media,
-            fields='id'
-        ).execute()
-        
-        return file.get('id')
-    except Exception as e:
-        st.error(f"Drive'daki dosyayı güncelleme hatası: {e}")
-        return None
-
 def authenticate_google_drive(credentials_json):
-    """Google Drive kimlik doğrulama"""
+    """Google Drive kimlik doğrulama
+    
+    İş parçacığı başına Drive istemcisi döndüren (paylaşılan) DriveClientFactory döndürür.
+    """
     try:
         # Eğer zaten bir dictionary ise
         if isinstance(credentials_json, dict):
-            credentials_dict = credentials_json
+            credentials_dict = dict(credentials_json)
         else:
             # String ise JSON olarak parse et
             credentials_dict = json.loads(credentials_json)
@@ -134,102 +125,596 @@ def authenticate_google_drive(credentials_json):
         if 'private_key' in credentials_dict:
             credentials_dict['private_key'] = credentials_dict['private_key'].replace('\\n', '\n')
         
-        credentials = Credentials.from_service_account_info(
-            credentials_dict, scopes=SCOPES)
-        drive_service = build('drive', 'v3', credentials=credentials)
-        return drive_service
+        credentials_digest = hashlib.sha256(
+            json.dumps(credentials_dict, sort_keys=True).encode('utf-8')).hexdigest()
+        return get_drive_client_factory(credentials_digest, credentials_dict)
     except Exception as e:
         st.error(f"Google Drive kimlik doğrulama hatası: {e}")
         return None
 
-def list_files_in_folder(drive_service, folder_id):
-    """Google Drive klasöründeki dosyaları listele"""
+def connect_storage(credentials_json=None):
+    """Yapılandırılmış depolama arka ucuna bağlan (hata durumunda None)
+    
+    Google Drive için hizmet hesabı kimlik bilgileri gerekir; yerel dizin ve S3
+    arka uçları secrets'taki [storage] ayarlarıyla süreç genelinde bir kez kurulur.
+    """
+    settings = storage_settings(st.secrets)
+    if settings['backend'] == "drive":
+        if credentials_json is None:
+            return None
+        drive_clients = authenticate_google_drive(credentials_json)
+        return DriveStorage(drive_clients) if drive_clients else None
+    
+    try:
+        return get_configured_storage(settings_digest(settings), settings)
+    except Exception as e:
+        st.error(f"Depolama bağlantısı kurulamadı ({settings['backend']}): {e}")
+        return None
+
+def list_files_in_folder(storage, folder_id, refresh=False):
+    """Depolama klasöründeki dosyaları listele"""
     try:
-        results = drive_service.files().list(
-            q=f"'{folder_id}' in parents and trashed=false",
-            pageSize=1000,
-            fields="files(id, name, mimeType)").execute()
-        return results.get('files', [])
+        with span("app.list_files", refresh=bool(refresh)):
+            return storage.list(folder_id, refresh=refresh)
     except Exception as e:
         st.error(f"Klasör içeriği listelenirken hata oluştu: {e}")
         return []
 
-def download_file_from_drive(drive_service, file_id, file_name, destination_folder):
-    """Google Drive'dan dosyayı indir"""
-    try:
-        request = drive_service.files().get_media(fileId=file_id)
-        
+def fetch_file_from_storage(storage, file_id, file_name, destination_folder, version=None):
+    """Dosyayı depolamadan indir ve yerel yolunu döndür (hata durumunda istisna fırlatır)
+    
+    Yerinde okunabilen dosyaların (yerel dizin) yolu doğrudan döndürülür. Sürüm
+    bilgisi verilirse önce paylaşılan önbelleğe bakılır ve dosya oraya indirilir.
+    """
+    with span("app.download", cached=bool(version)):
+        local_path = storage.local_path(file_id)
+        if local_path is not None:
+            return local_path
+        if version:
+            return get_image_cache().fetch(
+                file_id, version, file_name,
+                lambda path: storage.fetch(file_id, path)
+            )
         file_path = os.path.join(destination_folder, file_name)
-        
-        with open(file_path, 'wb') as f:
-            downloader = MediaIoBaseDownload(f, request)
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-        
-        return file_path
+        return storage.fetch(file_id, file_path)
+
+def download_file_from_storage(storage, file_id, file_name, destination_folder, version=None):
+    """Dosyayı depolamadan indir; hata arayüzde gösterilir ve None döner"""
+    try:
+        return fetch_file_from_storage(storage, file_id, file_name, destination_folder, version=version)
     except Exception as e:
         st.error(f"Dosya indirme hatası (ID: {file_id}): {e}")
         return None
 
-def load_images_from_drive(drive_service, folder_id, img_type, temp_dir, max_images=50):
-    """Google Drive klasöründen görüntüleri yükle"""
-    images = []
+def select_image_files(storage, folder_id, max_images):
+    """Klasördeki desteklenen görüntülerden radyoloğun görmediklerini rastgele örnekle
     
+    Örnekleme, klasör listesiyle artımlı olarak eşitlenen manifest üzerinden yapılır.
+    """
     # Klasördeki dosyaları listele
-    files = list_files_in_folder(drive_service, folder_id)
+    files = list_files_in_folder(storage, folder_id)
     
     if not files:
-        st.warning(f"Google Drive klasöründe ({folder_id}) görüntü bulunamadı!")
+        st.warning(f"Görüntü klasöründe ({folder_id}) görüntü bulunamadı!")
         return []
     
-    # Sadece desteklenen görüntü formatlarını filtrele
-    image_files = [f for f in files if f['mimeType'].startswith('image/') or
-                  f['name'].lower().endswith(('.png', '.jpg', '.jpeg'))]
+    manifest = get_image_manifest()
+    manifest.sync_folder(folder_id, files)
     
-    if not image_files:
-        st.warning(f"Google Drive klasöründe desteklenen görüntü formatı bulunamadı!")
+    if manifest.count_images(folder_id) == 0:
+        st.warning("Görüntü klasöründe desteklenen görüntü formatı bulunamadı!")
         return []
     
-    # Görüntü sayısını sınırla
-    if len(image_files) > max_images:
-        random.seed(datetime.now().timestamp())
-        image_files = random.sample(image_files, max_images)
+    # Radyoloğun daha önce görmediği görüntülerden örnekle
+    image_files = manifest.sample(
+        folder_id,
+        max_images,
+        st.session_state.radiologist_id,
+        st.session_state.test_type
+    )
+    
+    if not image_files:
+        st.warning(f"Bu klasördeki ({folder_id}) tüm görüntüleri daha önce değerlendirdiniz!")
+    elif len(image_files) < max_images:
+        st.info(f"Bu klasörde daha önce görmediğiniz yalnızca {len(image_files)} görüntü kaldı.")
+    
+    return image_files
+
+def select_images_from_storage(storage, folder_id, img_type, max_images=50):
+    """Görüntüleri indirmeden seç (akış modu için)
+    
+    Dönen kayıtların 'path' alanı, görüntü yerinde okunamıyor veya önbellekte
+    değilse ImagePrefetcher tarafından indirilene kadar None kalır.
+    """
+    image_files = select_image_files(storage, folder_id, max_images)
+    
+    return [{
+        # Yerel dizindeki ve manifestte kayıtlı, hâlâ diskte olan görüntüler indirilmez
+        'path': (storage.local_path(file['id'])
+                 or (file['localPath'] if file.get('localPath') and os.path.exists(file['localPath']) else None)),
+        'name': file['name'],
+        'drive_id': file['id'],
+        'version': file_version(file),
+        'true_type': img_type
+    } for file in image_files]
+
+def load_images_from_storage(storage, folder_id, img_type, temp_dir, max_images=50,
+                             max_workers=DOWNLOAD_MAX_WORKERS):
+    """Depolama klasöründen görüntüleri yükle (yerinde okunabilenler kopyalanmaz)"""
+    images = []
+    
+    image_files = select_image_files(storage, folder_id, max_images)
+    if not image_files:
+        return []
     
-    # İndirilecek görüntü sayısı
-    total_images = len(image_files)
     progress_bar = st.progress(0)
+    progress_text = st.empty()
     
-    # Görüntüleri indir ve işle
-    for i, file in enumerate(image_files):
-        try:
-            # İlerleme durumunu güncelle
-            progress_text = st.empty()
-            progress_text.text(f"İndiriliyor: {file['name']} ({i+1}/{total_images})")
-            progress_bar.progress((i+1)/total_images)
-            
-            # Dosyayı indir
-            file_path = download_file_from_drive(drive_service, file['id'], file['name'], temp_dir)
-            
-            if not file_path:
-                continue
-            
-            # Standart görüntü formatları için
-            img = Image.open(file_path)
+    def update_progress(completed, total, file):
+        progress_text.text(f"İndiriliyor: {file['name']} ({completed}/{total})")
+        progress_bar.progress(completed / total)
+    
+    # Görüntüleri iş parçacığı havuzu ile indir
+    paths, errors = download_files_concurrently(
+        storage,
+        image_files,
+        temp_dir,
+        max_workers=max_workers,
+        progress_callback=update_progress,
+        cache=get_image_cache()
+    )
+    
+    # Listeleme sırasını koruyarak sonuçları topla
+    for file in image_files:
+        if file['id'] in paths:
             images.append({
-                'path': file_path,
+                'path': paths[file['id']],
+                'name': file['name'],
                 'drive_id': file['id'],
+                'version': file_version(file),
                 'true_type': img_type
             })
-        except Exception as e:
-            st.warning(f"Dosya işlenirken hata oluştu {file['name']}: {e}")
+        else:
+            st.warning(f"Dosya işlenirken hata oluştu {file['name']}: {errors.get(file['id'])}")
     
     # İlerleme çubuğunu ve metni temizle
     progress_bar.empty()
+    progress_text.empty()
     
-    st.success(f"{len(images)} {img_type} görüntü Google Drive'dan yüklendi")
+    st.success(f"{len(images)} {img_type} görüntü yüklendi ({storage.label})")
     return images
 
+def stop_prefetcher():
+    """Oturumdaki ön yükleyiciyi (varsa) durdur"""
+    if st.session_state.get('prefetcher') is not None:
+        st.session_state.prefetcher.shutdown()
+        st.session_state.prefetcher = None
+
+def close_result_writer():
+    """Oturumdaki sonuç yazıcısını (varsa) son bir eşitlemeyle kapat"""
+    if st.session_state.get('result_writer') is not None:
+        st.session_state.result_writer.close()
+        st.session_state.result_writer = None
+
+def stop_background_workers():
+    """Oturuma ait arka plan işlerini (ön yükleme, sonuç eşitleme) sonlandır"""
+    stop_prefetcher()
+    close_result_writer()
+
+def clear_upload_state():
+    """Oturumun yükleme durumunu (sonuç/grafik dosya kimlikleri, bekleyen grafik yüklemesi) temizle"""
+    st.session_state.drive_result_file_id = None
+    st.session_state.drive_graph_upload_key = None
+    if hasattr(st.session_state, 'drive_graph_file_id'):
+        delattr(st.session_state, 'drive_graph_file_id')
+
+def flush_results():
+    """Bekleyen sonuçları zorla eşitle ve depolamadaki dosya kimliğini oturuma aktar"""
+    writer = st.session_state.get('result_writer')
+    if writer is None:
+        return
+    
+    try:
+        writer.flush()
+    except Exception as e:
+        st.warning(f"Sonuçlar kaydedilirken hata oluştu: {e}")
+    
+    if writer.drive_file_id:
+        st.session_state.drive_result_file_id = writer.drive_file_id
+
+def session_upload_queue():
+    """Paylaşılan yükleme kuyruğunun oturumun depolama arka ucuna bağlı görünümü (bağlantı yoksa None)"""
+    if st.session_state.get('storage') is None:
+        return None
+    return get_upload_queue().attach(st.session_state.storage)
+
+def refresh_drive_file_ids():
+    """Arka planda tamamlanan yüklemelerin dosya kimliklerini oturuma aktar"""
+    writer = st.session_state.get('result_writer')
+    if writer is not None and writer.drive_file_id:
+        st.session_state.drive_result_file_id = writer.drive_file_id
+    
+    if st.session_state.get('drive_graph_upload_key'):
+        graph_id = get_upload_queue().file_id(st.session_state.drive_graph_upload_key)
+        if graph_id:
+            st.session_state.drive_graph_file_id = graph_id
+
+def display_upload_status():
+    """Kenar çubuğunda paylaşılan yükleme kuyruğunun durumunu göster"""
+    status = get_upload_queue().status()
+    if status['dropped']:
+        st.error(f"⚠️ {status['dropped']} yükleme bırakıldı; sonuçlar yerel klasörde duruyor. "
+                 f"Son hata: {status['last_drop_error']}")
+    if not status['pending']:
+        if status['completed']:
+            st.caption(f"Yükleme kuyruğu boş ({status['completed']} yükleme tamamlandı)")
+        return
+    
+    if status['waiting']:
+        st.info(f"⏳ Yüklenmeyi bekleyen {status['waiting']} dosya var; ait oldukları depolama bağlantısı "
+                "kurulunca yüklenecek")
+    active = status['pending'] - status['waiting']
+    if active and status['failing']:
+        st.warning(f"⚠️ {status['failing']}/{status['pending']} yükleme başarısız oldu, yeniden denenecek: "
+                   f"{status['last_error']}")
+    elif active:
+        st.info(f"⏳ Yükleniyor: {active} dosya")
+    if status['coalesced']:
+        st.caption(f"Birleştirilen ardışık yükleme: {status['coalesced']}")
+
+def display_stored_files():
+    """Bitiş ekranında sonuç ve grafik dosyalarının depolamadaki kimliklerini ve bağlantılarını göster"""
+    storage = st.session_state.get('storage')
+    label = storage.label if storage is not None else "depolama"
+    stored_files = [
+        ("sonuç", st.session_state.drive_result_file_id if st.session_state.save_to_drive else None),
+        ("grafik", st.session_state.get('drive_graph_file_id')),
+    ]
+    for kind, file_id in stored_files:
+        if not file_id:
+            continue
+        st.write(f"**{label} {kind} dosyası**: {file_id}")
+        url = storage.file_url(file_id) if storage is not None else None
+        if url:
+            st.markdown(f"[{kind.capitalize()} dosyasını {label} üzerinde aç]({url})")
+    
+    if st.session_state.save_to_drive and get_upload_queue().status()['pending']:
+        st.info(f"⏳ Dosyalar arka planda yükleniyor ({label}); yükleme tamamlanınca bağlantılar burada görünür. "
+                "Sayfayı kapatsanız da yükleme devam eder.")
+
+def complete_session(summary_png):
+    """Oturumu sonlandır: bekleyen sonuçları eşitle, tamamlandı olarak işaretle ve
+    özet grafiğini (önbellekteki PNG baytları) yerel klasöre kaydedip yükleme kuyruğuna al"""
+    flush_results()
+    if st.session_state.get('result_writer') is not None:
+        st.session_state.result_writer.mark_completed()
+    
+    try:
+        graph_file_name = (f"{st.session_state.test_type}_grafikler_{st.session_state.radiologist_id}_"
+                           f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
+        graph_file_path = os.path.join(st.session_state.output_dir, graph_file_name)
+        with open(graph_file_path, 'wb') as f:
+            f.write(summary_png)
+        
+        # Grafik arka planda depolamaya yüklenir; bitiş ekranı yüklemeyi beklemez
+        uploads = session_upload_queue() if st.session_state.save_to_drive else None
+        if uploads is not None and st.session_state.results_folder_id:
+            st.session_state.drive_graph_upload_key = uploads.enqueue(
+                st.session_state.results_folder_id,
+                graph_file_name,
+                data=summary_png
+            )
+    except Exception as e:
+        st.warning(f"Grafik dosyası kaydedilirken hata oluştu: {e}")
+
+def skip_current_image():
+    """Gösterilemeyen görüntüyü günlüğe işleyip sonrakine geç"""
+    writer = st.session_state.get('result_writer')
+    if writer is not None:
+        try:
+            writer.record_skip(st.session_state.current_idx)
+        except Exception:
+            pass
+    st.session_state.current_idx += 1
+
+def start_prefetcher(start_idx):
+    """Akış modu ön yükleyicisini başlat ve start_idx görüntüsünün inmesini bekle"""
+    stop_prefetcher()
+    prefetcher = ImagePrefetcher(
+        st.session_state.storage,
+        st.session_state.all_images,
+        st.session_state.temp_dir,
+        cache=get_image_cache()
+    )
+    prefetcher.ensure_window(start_idx)
+    with st.spinner("İlk görüntü indiriliyor..."):
+        try:
+            prefetcher.get_path(start_idx, count_stall=False)
+        except Exception as e:
+            st.warning(f"İlk görüntü indirilemedi: {e}")
+    st.session_state.prefetcher = prefetcher
+
+def make_result_writer(output_file, result_file_name, **kwargs):
+    """Oturum ayarlarına göre (depolamaya kaydetme vb.) bir ResultWriter oluştur"""
+    save_to_drive = st.session_state.save_to_drive and st.session_state.results_folder_id
+    return ResultWriter(
+        output_file,
+        result_file_name,
+        uploads=session_upload_queue() if save_to_drive else None,
+        results_folder_id=st.session_state.results_folder_id if save_to_drive else None,
+        **kwargs
+    )
+
+def format_interval(interval, percent=False):
+    """Güven aralığını tabloda göstermek için biçimlendir"""
+    low, high = interval
+    if percent:
+        return f"%{low * 100:.1f} - %{high * 100:.1f}"
+    return f"{low:.2f} - {high:.2f}"
+
+def get_running_stats():
+    """Oturumun artımlı sonuç özetini döndür
+    
+    Özet sonuç listesiyle eşleşmiyorsa (sıfırlama, oturum devamı) listeden bir kez
+    yeniden kurulur; normal akışta record_* fonksiyonları onu O(1) günceller.
+    """
+    stats = st.session_state.get('running_stats')
+    if stats is None or stats.count != len(st.session_state.results):
+        stats = RunningStats.from_results(st.session_state.results)
+        st.session_state.running_stats = stats
+    return stats
+
+def resume_session(journal_file, state):
+    """Oturum günlüğünden görüntü sırasını, cevapları ve konumu geri yükle
+    
+    Daha önce cevaplanan görüntüler indirilmez; ön yükleyici kaldığı yerden başlar.
+    """
+    header = state['header']
+    
+    st.session_state.test_type = header['test_type']
+    st.session_state.all_images = [dict(entry, path=None) for entry in header['images']]
+    st.session_state.results = ResultStore.from_records(
+        header['test_type'],
+        state['results'],
+        capacity=len(header['images'])
+    )
+    st.session_state.current_idx = state['current_idx']
+    st.session_state.completed = False
+    st.session_state.output_file = header['output_file']
+    st.session_state.result_file_name = header['result_file_name']
+    clear_upload_state()
+    st.session_state.drive_result_file_id = state['drive_file_id']
+    
+    close_result_writer()
+    st.session_state.result_writer = make_result_writer(
+        header['output_file'],
+        header['result_file_name'],
+        drive_file_id=state['drive_file_id'],
+        parquet_drive_file_id=state['parquet_drive_file_id'],
+        results=st.session_state.results
+    )
+    
+    start_prefetcher(st.session_state.current_idx)
+    st.session_state.initialized = True
+
+def get_image_path(idx):
+    """Görüntü yolunu döndür; akış modunda ön yükleyiciden al ve pencereyi ilerlet"""
+    img_data = st.session_state.all_images[idx]
+    
+    # Paylaşılan önbellekten silinmiş bir dosyayı yeniden indir
+    if img_data.get('path') and not os.path.exists(img_data['path']):
+        img_data['path'] = download_file_from_storage(
+            st.session_state.storage,
+            img_data['drive_id'],
+            img_data['name'],
+            st.session_state.temp_dir,
+            version=img_data.get('version')
+        )
+    
+    prefetcher = st.session_state.get('prefetcher')
+    if prefetcher is None:
+        path = img_data['path']
+    else:
+        path = prefetcher.get_path(idx)
+        prefetcher.ensure_window(idx + 1)
+    
+    # Yerel yolu ve piksel boyutlarını manifeste bir kez işle
+    if path and not img_data.get('indexed'):
+        try:
+            get_image_manifest().record_local_file(img_data['drive_id'], path)
+        except Exception:
+            pass
+        img_data['indexed'] = True
+    
+    return path
+
+def mark_image_seen(img_data, result):
+    """Değerlendirilen görüntüyü radyoloğun gördükleri arasına ekle (tekrar gösterilmesin)
+    ve sonucu görüntünün kalıcı istatistiklerine işle"""
+    try:
+        manifest = get_image_manifest()
+        manifest.mark_seen(
+            st.session_state.radiologist_id,
+            st.session_state.test_type,
+            img_data['drive_id']
+        )
+        manifest.record_result(img_data, result)
+    except Exception as e:
+        st.warning(f"Görüntü manifeste işlenemedi: {e}")
+
+def mark_image_displayed(idx):
+    """Görüntünün ekrana ilk verildiği anı ve o ana kadarki bekleme süresini kaydet
+    
+    Aynı görüntüde kalınan yeniden çalıştırmalar (ör. APA kaydırıcıları) ölçümü
+    sıfırlamaz. Bekleme, önceki cevaptan (ilk görüntüde bu çalıştırmanın
+    başından) görüntünün hazır olmasına kadar geçen süredir.
+    """
+    key = (idx, st.session_state.all_images[idx]['drive_id'])
+    timing = st.session_state.get('image_timing')
+    if timing is not None and timing['key'] == key:
+        return
+    
+    now = clock()
+    answered_at = st.session_state.get('answered_at')
+    st.session_state.image_timing = {
+        'key': key,
+        'shown_at': now,
+        'wait_time': now - (answered_at if answered_at is not None else RUN_STARTED_AT)
+    }
+    st.session_state.answered_at = None
+
+def take_response_times(idx):
+    """Cevaplanan görüntünün (okuma süresi, bekleme süresi) çifti; ölçüm yoksa (None, None)"""
+    timing = st.session_state.get('image_timing')
+    st.session_state.answered_at = RUN_STARTED_AT
+    if timing is None or timing['key'] != (idx, st.session_state.all_images[idx]['drive_id']):
+        return None, None
+    return RUN_STARTED_AT - timing['shown_at'], timing['wait_time']
+
+def display_response_times(results):
+    """Oturumun okuma ve bekleme süresi özetini göster"""
+    import pandas as pd
+    
+    summaries = {
+        'Okuma süresi': time_summary(results.column('response_time')),
+        'Bekleme (indirme/hazırlama)': time_summary(results.column('wait_time')),
+    }
+    if not summaries['Okuma süresi']['count']:
+        return
+    
+    st.subheader("Okuma Süreleri")
+    reader = summaries['Okuma süresi']
+    cols = st.columns(3)
+    with cols[0]:
+        st.metric(label="Ortanca Okuma Süresi", value=f"{reader['p50']:.1f} sn")
+    with cols[1]:
+        st.metric(label="90. Yüzdelik", value=f"{reader['p90']:.1f} sn")
+    with cols[2]:
+        st.metric(label="Toplam Okuma Süresi", value=f"{reader['mean'] * reader['count'] / 60:.1f} dk")
+    
+    table = pd.DataFrame(summaries).T.rename(columns={'count': 'Cevap', 'mean': 'Ortalama', 'max': 'En uzun'})
+    st.dataframe(table.round(2), use_container_width=True)
+    st.caption("Süreler saniyedir; bekleme süresi okuma süresine dahil değildir.")
+
+def show_busy_notice(error):
+    """CPU iş havuzu kabul sınırındayken veya iş zaman aşımına uğradığında okuyucuya yeniden deneme seçeneği sun"""
+    st.warning(f"⏳ Sunucu şu anda çok yoğun, lütfen birkaç saniye sonra yeniden deneyin. ({error})")
+    if st.button("Yeniden Dene", key="busy_retry"):
+        st.rerun()
+
+def show_chart(fig):
+    """Matplotlib grafiğini sayfaya çiz ve kapat (süresi 'chart.render' olarak ölçülür)
+    
+    pyplot kayıt defterinde açık kalan şekiller uzun süre çalışan süreçte bellek
+    sızıntısına yol açtığından şekil çizimden hemen sonra kapatılır.
+    """
+    import matplotlib.pyplot as plt
+    
+    try:
+        with span("chart.render"):
+            st.pyplot(fig)
+    finally:
+        plt.close(fig)
+
+@st.cache_resource
+def get_metrics_file_writer():
+    """Ölçümleri Prometheus metin dosyasına düzenli yazan süreç geneli iş parçacığı"""
+    return MetricsFileWriter(registry, METRICS_FILE, METRICS_WRITE_INTERVAL)
+
+def admin_panel_enabled():
+    """Gizli yönetici paneli adres satırındaki ?admin=... parametresiyle açılır
+    
+    Parametre secrets içindeki 'admin_token' değerine eşit olmalıdır; 'admin_token'
+    tanımlı değilse panel hiçbir parametreyle açılmaz.
+    """
+    token = st.query_params.get(ADMIN_QUERY_PARAM)
+    if not token:
+        return False
+    try:
+        expected = st.secrets.get('admin_token')
+    except Exception:
+        expected = None
+    if not expected:
+        return False
+    return hmac.compare_digest(str(token), str(expected))
+
+def display_admin_panel():
+    """Sıcak yol süreleri, eşitleme kuyruğu ve önbellek durumunu gösteren yönetici paneli"""
+    import pandas as pd
+    
+    st.markdown("---")
+    st.header("Yönetici Paneli - Performans Ölçümleri")
+    
+    rows, gauges = registry.snapshot()
+    cache = get_image_cache()
+    
+    cols = st.columns(4)
+    with cols[0]:
+        st.metric(label="Eşitleme Bekleyen Sonuç", value=int(gauges.get('result_sync_pending', 0)))
+    with cols[1]:
+        st.metric(label="Eşitlemesi Hatalı Oturum", value=int(gauges.get('result_sync_failing_sessions', 0)))
+    with cols[2]:
+        st.metric(label="Açık Oturum Yazıcısı", value=int(gauges.get('result_writers_active', 0)))
+    with cols[3]:
+        lookups = cache.hits + cache.misses
+        st.metric(label="Görüntü Önbelleği İsabeti", value=f"%{cache.hits / lookups * 100:.0f}" if lookups else "-")
+    
+    if rows:
+        table = pd.DataFrame(rows).rename(columns={
+            'span': 'Ölçüm', 'labels': 'Etiketler', 'count': 'Sayı', 'sum': 'Toplam (sn)',
+            'mean': 'Ortalama (sn)', 'max': 'En uzun (sn)'
+        })
+        st.dataframe(table.round(4), use_container_width=True, hide_index=True)
+        st.caption("Yüzdelikler histogram kovalarından tahmin edilir.")
+    else:
+        st.info("Henüz ölçüm yok.")
+    
+    writer = get_metrics_file_writer()
+    st.write(f"**Prometheus metrik dosyası**: {os.path.abspath(writer.path)} "
+             f"({writer.interval} saniyede bir yazılır)")
+    if writer.last_error is not None:
+        st.warning(f"Metrik dosyası yazılamadı: {writer.last_error}")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="Prometheus Çıktısını İndir",
+            data=registry.render_prometheus().encode('utf-8'),
+            file_name="metrikler.prom",
+            mime="text/plain",
+            key="admin_metrics_download"
+        )
+    with col2:
+        if st.button("Ölçümleri Sıfırla", key="admin_metrics_reset"):
+            registry.reset()
+            st.rerun()
+
+def display_reader_times(df):
+    """Radyolog başına okuma süresi dağılımını (tablo ve kutu grafiği) göster; tabloyu döndür"""
+    import matplotlib.pyplot as plt
+    
+    table = reader_time_table(df)
+    if table.empty:
+        st.info("Sonuç dosyalarında okuma süresi bilgisi yok.")
+        return table
+    
+    st.dataframe(table.rename(columns={'count': 'Cevap', 'mean': 'Ortalama', 'max': 'En uzun'}).round(2),
+                 use_container_width=True)
+    
+    if len(table) <= 40:
+        times = df[['radiologist_id', 'response_time']].dropna()
+        readers = list(table.index)
+        fig, ax = plt.subplots(figsize=(max(8, len(readers) * 0.5), 5))
+        ax.boxplot([times.loc[times['radiologist_id'].astype(str) == reader, 'response_time'] for reader in readers],
+                   showfliers=False)
+        ax.set_xticks(range(1, len(readers) + 1))
+        ax.set_xticklabels(readers, rotation=45, ha='right')
+        ax.set_ylabel('Okuma Süresi (sn)')
+        ax.set_title('Radyolog Bazında Okuma Süresi Dağılımı')
+        plt.tight_layout()
+        show_chart(fig)
+    return table
+
 def initialize_app():
     """Uygulamayı başlat - ortak giriş formu"""
     st.header("Değerlendirmeyi Başlat")
@@ -242,8 +727,19 @@ def initialize_app():
         tarih = datetime.now().strftime("%Y-%m-%d")
         st.text_input("Tarih:", value=tarih, disabled=True)
     
-    # Kimlik bilgilerini otomatik yükle
-    if hasattr(st, 'secrets') and 'google_service_account' in st.secrets:
+    st.session_state.streaming_mode = st.checkbox(
+        "Görüntüleri akış modunda yükle (ilk görüntü hemen gösterilir, kalanlar arka planda indirilir)",
+        value=st.session_state.streaming_mode,
+        key="streaming_mode_input"
+    )
+    
+    # Kimlik bilgilerini otomatik yükle (yerel dizin ve S3 arka uçları kimlik bilgisi istemez)
+    backend = storage_settings(st.secrets)['backend']
+    if backend != "drive":
+        st.success(f"🗄️ Görüntüler ve sonuçlar yapılandırılmış depolamada ({backend}); kimlik bilgisi gerekmiyor.")
+        credentials_json = None
+        st.session_state.credentials_uploaded = True
+    elif hasattr(st, 'secrets') and 'google_service_account' in st.secrets:
         st.success("☁️ Streamlit Cloud'da çalışıyor. Google Drive kimlik bilgileri secrets'dan yüklendi.")
         credentials_json = dict(st.secrets["google_service_account"])
         st.session_state.credentials_uploaded = True
@@ -292,61 +788,98 @@ def initialize_app():
         4. "Değerlendirmeyi Başlat" butonuna tıklayın
         """)
     
+    # Yarım kalan oturum varsa kaldığı yerden devam etme seçeneği sun
+    if st.session_state.test_type and st.session_state.radiologist_id:
+        resumable = find_resumable_sessions(
+            st.session_state.output_dir,
+            st.session_state.radiologist_id,
+            st.session_state.test_type
+        )
+        if resumable:
+            journal_file, state = resumable[0]
+            st.warning(
+                f"Yarım kalan bir oturumunuz bulundu ({state['header']['created']}): "
+                f"{state['current_idx']}/{len(state['header']['images'])} görüntü değerlendirilmiş."
+            )
+            if st.button("Yarım Kalan Oturuma Devam Et", key="resume_button", use_container_width=True):
+                if not st.session_state.credentials_uploaded:
+                    st.error("Lütfen servis hesabı kimlik bilgilerini (JSON) yükleyin!")
+                    return
+                
+                with st.spinner("Depolama bağlantısı kuruluyor..."):
+                    storage = connect_storage(credentials_json)
+                
+                if not storage:
+                    st.error("Depolama bağlantısı kurulamadı!")
+                    return
+                
+                st.session_state.storage = storage
+                resume_session(journal_file, state)
+                st.rerun()
+    
     # Başlatma butonu - Test türü seçilmişse aktifleştir
     if st.session_state.test_type:
         if st.button("Değerlendirmeyi Başlat", key="start_button", use_container_width=True):
             if not st.session_state.radiologist_id:
                 st.error("Lütfen Radyolog Kimliğinizi girin!")
                 return
-
+            
             if not st.session_state.credentials_uploaded:
                 st.error("Lütfen servis hesabı kimlik bilgilerini (JSON) yükleyin!")
                 return
             
-            with st.spinner("Google Drive bağlantısı kuruluyor..."):
-                drive_service = authenticate_google_drive(credentials_json)
+            with st.spinner("Depolama bağlantısı kuruluyor..."):
+                storage = connect_storage(credentials_json)
                 
-                if not drive_service:
-                    st.error("Google Drive kimlik doğrulaması başarısız!")
+                if not storage:
+                    st.error("Depolama bağlantısı kurulamadı!")
                     return
                 
                 # Klasörlerin varlığını kontrol et
                 if st.session_state.test_type == "vtt":
                     # VTT için gerçek ve sentetik görüntüler gerekli
-                    real_files = list_files_in_folder(drive_service, st.session_state.real_folder_id)
+                    real_files = list_files_in_folder(storage, st.session_state.real_folder_id)
                     if not real_files:
                         st.error(f"Gerçek görüntüler klasörüne erişilemiyor veya klasör boş! (ID: {st.session_state.real_folder_id})")
                         return
                 
                 # Her iki test için de sentetik görüntüler gerekli
-                synth_files = list_files_in_folder(drive_service, st.session_state.synth_folder_id)
+                synth_files = list_files_in_folder(storage, st.session_state.synth_folder_id)
                 if not synth_files:
                     st.error(f"Sentetik görüntüler klasörüne erişilemiyor veya klasör boş! (ID: {st.session_state.synth_folder_id})")
                     return
                 
-                # Sonuçlar klasörünü kontrol et (eğer Drive'a kaydetme seçiliyse)
+                # Sonuçlar klasörünü kontrol et (eğer depolamaya kaydetme seçiliyse)
                 if st.session_state.save_to_drive:
-                    results_files = list_files_in_folder(drive_service, st.session_state.results_folder_id)
+                    results_files = list_files_in_folder(storage, st.session_state.results_folder_id)
                     if results_files is None:
                         st.error(f"Sonuçlar klasörüne erişilemiyor! (ID: {st.session_state.results_folder_id})")
                         return
                 
-                # Başarılı ise drive_service'i kaydet
-                st.session_state.drive_service = drive_service
+                # Başarılı ise depolama arka ucunu kaydet
+                st.session_state.storage = storage
             
-            # Google Drive'dan görüntüleri yükle
-            with st.spinner("Görüntüler Google Drive'dan yükleniyor..."):
+            # Depolamadan görüntüleri yükle
+            with st.spinner(f"Görüntüler yükleniyor ({storage.label})..."):
                 # Test türüne göre görüntüleri yükle
                 if st.session_state.test_type == "apa":
                     # Anatomik Olabilirlik Değerlendirmesi için sadece sentetik görüntüler
                     max_images = 100  # APA için daha fazla görüntü
-                    synth_images = load_images_from_drive(
-                        st.session_state.drive_service, 
-                        st.session_state.synth_folder_id, 
-                        'sentetik', 
-                        st.session_state.temp_dir,
-                        max_images
-                    )
+                    if st.session_state.streaming_mode:
+                        synth_images = select_images_from_storage(
+                            st.session_state.storage,
+                            st.session_state.synth_folder_id, 
+                            'sentetik', 
+                            max_images
+                        )
+                    else:
+                        synth_images = load_images_from_storage(
+                            st.session_state.storage,
+                            st.session_state.synth_folder_id, 
+                            'sentetik', 
+                            st.session_state.temp_dir,
+                            max_images
+                        )
                     
                     # Görüntü yükleme başarılı mı kontrol et
                     if not synth_images:
@@ -359,21 +892,36 @@ def initialize_app():
                 elif st.session_state.test_type == "vtt":
                     # Görsel Turing Testi için gerçek ve sentetik görüntüler
                     max_images = 50  # VTT için daha az görüntü
-                    real_images = load_images_from_drive(
-                        st.session_state.drive_service, 
-                        st.session_state.real_folder_id, 
-                        'gerçek', 
-                        st.session_state.temp_dir,
-                        max_images
-                    )
-                    
-                    synth_images = load_images_from_drive(
-                        st.session_state.drive_service, 
-                        st.session_state.synth_folder_id, 
-                        'sentetik', 
-                        st.session_state.temp_dir,
-                        max_images
-                    )
+                    if st.session_state.streaming_mode:
+                        real_images = select_images_from_storage(
+                            st.session_state.storage,
+                            st.session_state.real_folder_id, 
+                            'gerçek', 
+                            max_images
+                        )
+                        
+                        synth_images = select_images_from_storage(
+                            st.session_state.storage,
+                            st.session_state.synth_folder_id, 
+                            'sentetik', 
+                            max_images
+                        )
+                    else:
+                        real_images = load_images_from_storage(
+                            st.session_state.storage,
+                            st.session_state.real_folder_id, 
+                            'gerçek', 
+                            st.session_state.temp_dir,
+                            max_images
+                        )
+                        
+                        synth_images = load_images_from_storage(
+                            st.session_state.storage,
+                            st.session_state.synth_folder_id, 
+                            'sentetik', 
+                            st.session_state.temp_dir,
+                            max_images
+                        )
                     
                     # Görüntü yükleme başarılı mı kontrol et
                     if not real_images or not synth_images:
@@ -387,6 +935,11 @@ def initialize_app():
             random.seed(datetime.now().timestamp())
             random.shuffle(st.session_state.all_images)
             
+            # Akış modunda yalnızca ilk görüntüyü bekle, kalanını arka planda indir
+            if st.session_state.streaming_mode:
+                start_prefetcher(0)
+            
+            clear_upload_state()
             st.session_state.initialized = True
             
             # Sonuç dosyasının adını oluştur
@@ -397,7 +950,32 @@ def initialize_app():
             st.session_state.output_file = output_file
             st.session_state.result_file_name = result_file_name
             
-            st.success(f"Toplamda {len(st.session_state.all_images)} görüntü yüklendi! Değerlendirmeye başlayabilirsiniz.")
+            # Cevaplar için görüntü sayısı kadar yer ayrılmış sütunlu depo
+            st.session_state.results = ResultStore(
+                st.session_state.test_type,
+                capacity=len(st.session_state.all_images)
+            )
+            
+            # Görüntü sırasını ve cevapları oturum günlüğüne yazacak yazıcıyı başlat
+            close_result_writer()
+            st.session_state.result_writer = make_result_writer(
+                output_file,
+                result_file_name,
+                results=st.session_state.results,
+                header={
+                    'test_type': st.session_state.test_type,
+                    'radiologist_id': st.session_state.radiologist_id,
+                    'output_file': output_file,
+                    'result_file_name': result_file_name,
+                    'created': timestamp,
+                    'images': [journal_image_entry(img) for img in st.session_state.all_images]
+                }
+            )
+            
+            if st.session_state.streaming_mode:
+                st.success(f"Toplamda {len(st.session_state.all_images)} görüntü seçildi! Değerlendirmeye başlayabilirsiniz.")
+            else:
+                st.success(f"Toplamda {len(st.session_state.all_images)} görüntü yüklendi! Değerlendirmeye başlayabilirsiniz.")
             st.rerun()
 
 ## ANATOMİK OLABİLİRLİK DEĞERLENDİRMESİ (APA) FONKSİYONLARI ##
@@ -410,19 +988,15 @@ def display_apa_image():
         st.progress(progress)
         st.subheader(f"Görüntü {st.session_state.current_idx + 1} / {len(st.session_state.all_images)}")
         
-        img_data = st.session_state.all_images[st.session_state.current_idx]
-        
         try:
-            # Görüntü dosyasını yükle
-            img = Image.open(img_data['path'])
-            
-            # Görüntüyü yeniden boyutlandır
-            img = img.resize((256, 256), Image.LANCZOS)
+            # Hazır 256x256 türevi al (akış modunda gerekirse indirmeyi bekle)
+            img = get_display_image(get_image_path(st.session_state.current_idx))
             
             # Görüntüyü merkeze yerleştir
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
                 st.image(img, width=256)
+            mark_image_displayed(st.session_state.current_idx)
             
             # Değerlendirme talimatı
             st.info("Lütfen aşağıdaki özellikleri 1-5 ölçeğinde değerlendirin (1: Çok Kötü, 5: Mükemmel)")
@@ -443,9 +1017,12 @@ def display_apa_image():
             if st.button("Değerlendirmeyi Gönder ve İlerle", use_container_width=True):
                 record_apa_assessment()
             
+        except (WorkerPoolBusy, WorkerTaskTimeout) as e:
+            # Görüntü atlanmaz; okuyucu aynı görüntüyü yeniden dener
+            show_busy_notice(e)
         except Exception as e:
             st.error(f"Görüntü gösterilemiyor: {e}")
-            st.session_state.current_idx += 1
+            skip_current_image()
             st.rerun()
     else:
         finish_apa_evaluation()
@@ -455,49 +1032,28 @@ def record_apa_assessment():
     if st.session_state.current_idx < len(st.session_state.all_images):
         # Sonucu kaydet
         img_data = st.session_state.all_images[st.session_state.current_idx]
+        response_time, wait_time = take_response_times(st.session_state.current_idx)
         
-        result = {
-            'radiologist_id': st.session_state.radiologist_id,
-            'image_path': img_data['path'],
-            'image_id': img_data.get('drive_id', ''),
-            'image_number': st.session_state.current_idx + 1,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        # Her özellik için puanları kaydet
-        for feature in APA_FEATURES:
-            result[feature.replace(" ", "_").lower()] = st.session_state.ratings[feature]
-        
+        result = build_apa_result(
+            st.session_state.radiologist_id,
+            img_data,
+            st.session_state.current_idx + 1,
+            st.session_state.ratings,
+            response_time=response_time,
+            wait_time=wait_time
+        )
+        stats = get_running_stats()
         st.session_state.results.append(result)
+        stats.add(result)
         
-        # Her değerlendirmeden sonra mevcut sonuçları yerel dosyaya kaydet
+        # Sonucu günlüğe hemen yaz; CSV ve depolama eşitlemesi arka planda toplu yapılır
         try:
-            df = pd.DataFrame(st.session_state.results)
-            df.to_csv(st.session_state.output_file, index=False)
-            
-            # Eğer Drive'a kaydetme seçiliyse ve klasör ID'si varsa
-            if st.session_state.save_to_drive and st.session_state.results_folder_id:
-                if st.session_state.drive_result_file_id:
-                    # Drive'daki dosyayı güncelle
-                    update_file_in_drive(
-                        st.session_state.drive_service, 
-                        st.session_state.output_file, 
-                        st.session_state.drive_result_file_id,
-                        st.session_state.result_file_name
-                    )
-                else:
-                    # İlk kez Drive'a yükle
-                    file_id = upload_file_to_drive(
-                        st.session_state.drive_service, 
-                        st.session_state.output_file, 
-                        st.session_state.results_folder_id,
-                        st.session_state.result_file_name
-                    )
-                    if file_id:
-                        st.session_state.drive_result_file_id = file_id
+            st.session_state.result_writer.append(result, st.session_state.current_idx)
         except Exception as e:
             st.warning(f"Sonuçlar kaydedilirken hata oluştu: {e}")
         
+        mark_image_seen(img_data, result)
+        
         # Sonraki görüntü için kaydırıcıları sıfırla
         for feature in APA_FEATURES:
             st.session_state.ratings[feature] = 3
@@ -509,253 +1065,242 @@ def record_apa_assessment():
         st.rerun()
 
 def finish_apa_evaluation():
-    """Anatomik Olabilirlik Değerlendirmesini bitir ve sonuçları göster"""
+    """Anatomik Olabilirlik Değerlendirmesini bitir ve sonuçları göster
+    
+    Oturumu sonlandırma adımları (eşitleme, grafik yükleme) yalnızca ilk
+    çalıştırmada yapılır; sonuç ekranı her yeniden çalıştırmada önbellekteki
+    grafiklerle yeniden gösterilir.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    stats = get_running_stats()
+    try:
+        charts = finish_charts('apa', st.session_state.results.digest(), stats)
+    except (WorkerPoolBusy, WorkerTaskTimeout) as e:
+        show_busy_notice(e)
+        return
+    
     if not st.session_state.completed:
-        # Özet istatistikleri göster
-        df = pd.DataFrame(st.session_state.results)
-        
-        # Her özellik için ortalama puanları hesapla
-        mean_scores = {feature: np.mean(df[feature.replace(" ", "_").lower()]) 
-                      for feature in APA_FEATURES}
+        complete_session(charts['summary'])
+        st.balloons()  # Kutlama animasyonu
+        st.session_state.completed = True
+    
+    st.success("🎉 Değerlendirme tamamlandı! Teşekkür ederiz.")
+    refresh_drive_file_ids()
+    
+    # Özet istatistikleri göster
+    df = st.session_state.results.to_frame()
+    
+    # Her özellik için ortalama puanları hesapla
+    mean_scores = stats.apa_means()
+    
+    # Sonuçları sekmeli arayüzde göster
+    tab1, tab2, tab3 = st.tabs(["Özet", "Grafikler", "Detaylı Veriler"])
+    
+    with tab1:
+        st.subheader("Değerlendirme Özeti")
         
-        # Görselleştirme oluştur
-        try:
-            # Grafikler için bir figür oluştur
-            fig, ax = plt.subplots(figsize=(12, 8))
-            
-            # Çubuk grafik için verileri hazırla
-            feature_names = [f for f in APA_FEATURES]
-            values = [mean_scores[f] for f in APA_FEATURES]
-            
-            # Ortalama puanları çubuk grafik olarak göster
-            bars = ax.bar(feature_names, values, color='#2986cc')
-            
-            # Çubukların üzerine değerleri ekle
-            for bar, val in zip(bars, values):
-                ax.text(bar.get_x() + bar.get_width()/2, 
-                        val + 0.1, 
-                        f'{val:.2f}', 
-                        ha='center', 
-                        va='bottom',
-                        fontweight='bold')
-            
-            ax.set_ylim([0, 5.5])
-            ax.set_ylabel('Ortalama Puan', fontsize=12)
-            ax.set_title('Anatomik Olabilirlik Puanları', fontsize=16)
-            plt.xticks(rotation=45, ha='right')
-            
-            # Grafiği kaydet
-            graph_file_name = f"apa_grafikler_{st.session_state.radiologist_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            graph_file_path = os.path.join(st.session_state.output_dir, graph_file_name)
-            plt.tight_layout()
-            plt.savefig(graph_file_path)
-            
-            # Grafiği Drive'a yükle
-            if st.session_state.save_to_drive and st.session_state.results_folder_id:
-                graph_id = upload_file_to_drive(
-                    st.session_state.drive_service,
-                    graph_file_path,
-                    st.session_state.results_folder_id,
-                    graph_file_name
+        # Metrikler için sütunlar
+        cols = st.columns(len(APA_FEATURES))
+        for i, feature in enumerate(APA_FEATURES):
+            with cols[i]:
+                st.metric(
+                    label=feature, 
+                    value=f"{mean_scores[feature]:.2f}"
                 )
-                if graph_id:
-                    st.session_state.drive_graph_file_id = graph_id
-        except Exception as e:
-            st.warning(f"Grafik dosyası oluşturulurken hata oluştu: {e}")
         
-        st.balloons()  # Kutlama animasyonu
-        st.success("🎉 Değerlendirme tamamlandı! Teşekkür ederiz.")
+        # Ortalama puanlar için bootstrap güven aralıkları
+        scores = np.column_stack([st.session_state.results.column(feature_key(feature)) for feature in APA_FEATURES])
+        mean_intervals = mean_confidence_intervals(scores)
+        if mean_intervals:
+            st.subheader(f"Ortalama Puanlar - %{CONFIDENCE_LEVEL * 100:.0f} Güven Aralıkları")
+            st.dataframe(pd.DataFrame([
+                {
+                    'Özellik': feature,
+                    'Ortalama': f"{interval['estimate']:.2f}",
+                    f'Bootstrap ({BOOTSTRAP_RESAMPLES} örneklem)': format_interval(interval['bootstrap'])
+                }
+                for feature, interval in zip(APA_FEATURES, mean_intervals)
+            ]), use_container_width=True, hide_index=True)
         
-        # Sonuçları sekmeli arayüzde göster
-        tab1, tab2, tab3 = st.tabs(["Özet", "Grafikler", "Detaylı Veriler"])
+        display_response_times(st.session_state.results)
         
-        with tab1:
-            st.subheader("Değerlendirme Özeti")
-            
-            # Metrikler için sütunlar
-            cols = st.columns(len(APA_FEATURES))
-            for i, feature in enumerate(APA_FEATURES):
-                with cols[i]:
-                    st.metric(
-                        label=feature, 
-                        value=f"{mean_scores[feature]:.2f}"
-                    )
-            
-            # Sonuçların kaydedildiği yerler
-            st.subheader("Sonuç Dosyaları")
-            st.write(f"**Yerel sonuç dosyası**: {st.session_state.output_file}")
-            
-            if st.session_state.save_to_drive and st.session_state.drive_result_file_id:
-                st.write(f"**Google Drive sonuç dosyası ID**: {st.session_state.drive_result_file_id}")
-                drive_file_link = f"https://drive.google.com/file/d/{st.session_state.drive_result_file_id}/view"
-                st.markdown(f"[Google Drive'da Sonuç Dosyasını Aç]({drive_file_link})")
-            
-            if hasattr(st.session_state, 'drive_graph_file_id') and st.session_state.drive_graph_file_id:
-                st.write(f"**Google Drive grafik dosyası ID**: {st.session_state.drive_graph_file_id}")
-                graph_file_link = f"https://drive.google.com/file/d/{st.session_state.drive_graph_file_id}/view"
-                st.markdown(f"[Google Drive'da Grafik Dosyasını Aç]({graph_file_link})")
-
-        with tab2:
-            st.subheader("Puanlama Grafikleri")
-            
-            # Ortalama puanlar grafiğini göster
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.bar(feature_names, values, color='#2986cc')
-            ax.set_ylim([0, 5])
-            ax.set_ylabel('Ortalama Puan')
-            ax.set_title('Anatomik Olabilirlik Ortalama Puanları')
-            plt.xticks(rotation=45, ha='right')
-            
-            st.pyplot(fig)
-            
-            # Puan dağılımı ısı haritası
-            st.subheader("Puan Dağılımı")
-            
-            # Isı haritası için verileri hazırla
-            heatmap_data = []
-            for feature in APA_FEATURES:
-                feature_key = feature.replace(" ", "_").lower()
-                if feature_key in df.columns:
-                    scores = df[feature_key].value_counts().reindex(range(1, 6), fill_value=0)
-                    heatmap_data.append(scores.values)
-            
-            if heatmap_data:
-                fig2, ax2 = plt.subplots(figsize=(10, 8))
-                
-                # Yüzdelere dönüştür
-                heatmap_array = np.array(heatmap_data)
-                data_percent = (heatmap_array / heatmap_array.sum(axis=1)[:, np.newaxis]) * 100
-                
-                sns.heatmap(data_percent, annot=True, fmt='.1f', cmap='YlGnBu', 
-                          xticklabels=['1', '2', '3', '4', '5'],
-                          yticklabels=feature_names, ax=ax2)
-                
-                ax2.set_title('Puan Dağılımı (% olarak)')
-                ax2.set_xlabel('5 Basamaklı Likert Ölçeğinde Puan')
-                
-                st.pyplot(fig2)
+        # Sonuçların kaydedildiği yerler
+        st.subheader("Sonuç Dosyaları")
+        st.write(f"**Yerel sonuç dosyası**: {st.session_state.output_file}")
+        parquet_file = parquet_path_for(st.session_state.output_file)
+        if os.path.exists(parquet_file):
+            st.write(f"**Yerel Parquet sonuç dosyası**: {parquet_file}")
         
-        with tab3:
-            st.subheader("Değerlendirme Detayları")
-            
-            # Veri çerçevesini göster
-            show_df = df.copy()
-            show_df['image_path'] = show_df['image_path'].apply(lambda x: os.path.basename(x))  # Sadece dosya adını göster
-            
-            # Sütun isimlerini daha anlaşılır hale getir
-            column_mapping = {
-                'radiologist_id': 'Radyolog',
-                'image_path': 'Görüntü',
-                'image_id': 'Görüntü ID',
-                'image_number': 'Görüntü No',
-                'timestamp': 'Zaman'
-            }
-            
-            # Özellik sütunlarını eşleştir
-            for feature in APA_FEATURES:
-                feature_key = feature.replace(" ", "_").lower()
-                column_mapping[feature_key] = feature
-            
-            # Sütun isimlerini değiştir
-            show_df = show_df.rename(columns=column_mapping)
-            
-            st.dataframe(show_df, use_container_width=True)
+        display_stored_files()
+    
+    with tab2:
+        st.subheader("Puanlama Grafikleri")
+        st.image(charts['summary'], use_container_width=True)
         
-        # Sonuçları CSV olarak indir
-        st.download_button(
-            label="Sonuçları CSV Olarak İndir",
-            data=df.to_csv(index=False).encode('utf-8'),
-            file_name=st.session_state.result_file_name,
-            mime="text/csv",
-        )
+        st.subheader("Puan Dağılımı")
+        st.image(charts['distribution'], use_container_width=True)
+    
+    with tab3:
+        st.subheader("Değerlendirme Detayları")
         
-        # Yeni değerlendirme başlat butonu
-        if st.button("Yeni Değerlendirme Başlat", key="new_eval"):
-            st.session_state.initialized = False
-            st.session_state.current_idx = 0
-            st.session_state.results = []
-            st.session_state.all_images = []
-            st.session_state.completed = False
-            st.session_state.radiologist_id = ""
-            st.session_state.drive_result_file_id = None
-            for feature in APA_FEATURES:
-                st.session_state.ratings[feature] = 3
-            if hasattr(st.session_state, 'drive_graph_file_id'):
-                delattr(st.session_state, 'drive_graph_file_id')
-            st.rerun()
+        # Veri çerçevesini göster
+        show_df = df.copy()
+        show_df['image_path'] = show_df['image_path'].apply(lambda x: os.path.basename(x))  # Sadece dosya adını göster
         
-        st.session_state.completed = True
+        # Sütun isimlerini daha anlaşılır hale getir
+        column_mapping = {
+            'radiologist_id': 'Radyolog',
+            'image_path': 'Görüntü',
+            'image_id': 'Görüntü ID',
+            'image_number': 'Görüntü No',
+            'timestamp': 'Zaman',
+            'response_time': 'Okuma Süresi (sn)',
+            'wait_time': 'Bekleme Süresi (sn)'
+        }
+        
+        # Özellik sütunlarını eşleştir
+        for feature in APA_FEATURES:
+            column_mapping[feature_key(feature)] = feature
+        
+        # Sütun isimlerini değiştir
+        show_df = show_df.rename(columns=column_mapping)
+        
+        st.dataframe(show_df, use_container_width=True)
+    
+    # Sonuçları CSV olarak indir
+    st.download_button(
+        label="Sonuçları CSV Olarak İndir",
+        data=df.to_csv(index=False).encode('utf-8'),
+        file_name=st.session_state.result_file_name,
+        mime="text/csv",
+    )
+    
+    if parquet_supported():
+        st.download_button(
+            label="Sonuçları Parquet Olarak İndir",
+            data=st.session_state.results.to_parquet_bytes(),
+            file_name=parquet_path_for(st.session_state.result_file_name),
+            mime="application/vnd.apache.parquet",
+        )
+    
+    # Yeni değerlendirme başlat butonu
+    if st.button("Yeni Değerlendirme Başlat", key="new_eval"):
+        stop_background_workers()
+        st.session_state.initialized = False
+        st.session_state.current_idx = 0
+        st.session_state.results = []
+        st.session_state.all_images = []
+        st.session_state.completed = False
+        st.session_state.radiologist_id = ""
+        clear_upload_state()
+        for feature in APA_FEATURES:
+            st.session_state.ratings[feature] = 3
+        st.rerun()
 
-def analyze_apa_results(radiologist1_file, radiologist2_file):
-    """İki radyolog arasındaki Anatomik Olabilirlik Değerlendirmelerini analiz et"""
-    st.header("İki Radyolog Arasındaki Değerlendirme Analizi")
+def analyze_apa_results(result_files):
+    """Birden fazla radyoloğun Anatomik Olabilirlik Değerlendirmeleri arasındaki uyumu analiz et
+    
+    Sonuçlar Drive görüntü ID'sine göre eşleştirilir; her özellik için çift bazında
+    ağırlıklı kappa, Fleiss' kappa ve Krippendorff's alpha (ordinal) hesaplanır.
+    """
+    import numpy as np
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    st.header("Radyologlar Arasındaki Değerlendirme Analizi")
     
     try:
-        # Sonuçları yükle
-        df1 = pd.read_csv(radiologist1_file)
-        df2 = pd.read_csv(radiologist2_file)
-        
-        # Görüntü yoluna göre sonuçları birleştir
-        merged = pd.merge(df1, df2, on='image_path', suffixes=('_rad1', '_rad2'))
+        # Sonuçları yükle ve uyum metriklerini hesapla
+        # Parquet dosyaları tek bir sütunlu taramayla okunur
+        frames = read_result_files(result_files, 'apa')
+        agreement = run_cpu(compute_agreement, frames)
         
-        # Analiz için özellik sütunları
-        feature_cols = [feature.replace(" ", "_").lower() for feature in APA_FEATURES]
+        raters = agreement['raters']
+        if len(raters) < 2:
+            st.warning("Uyum analizi için en az iki farklı radyoloğun sonuçları gerekir.")
+            return
         
-        # Her özellik için Cohen's kappa hesapla
-        kappa_scores = {}
-        for feature in feature_cols:
-            # Puanları tamsayıya dönüştür
-            rad1_scores = merged[f"{feature}_rad1"].astype(int)
-            rad2_scores = merged[f"{feature}_rad2"].astype(int)
-            
-            # Ağırlıklı kappa hesapla (Likert ölçekleri için daha uygun)
-            kappa = cohen_kappa_score(rad1_scores, rad2_scores, weights='linear')
-            kappa_scores[feature] = kappa
+        feature_cols = [feature_key(feature) for feature in APA_FEATURES]
+        feature_names = [f.replace("_", " ").title() for f in feature_cols]
+        metrics = [agreement['features'][feature] for feature in APA_FEATURES]
         
-        # Her özellik ve radyolog için ortalama puanları hesapla
-        mean_scores_rad1 = {feature: np.mean(merged[f"{feature}_rad1"]) for feature in feature_cols}
-        mean_scores_rad2 = {feature: np.mean(merged[f"{feature}_rad2"]) for feature in feature_cols}
+        st.write(f"**Radyolog sayısı:** {len(raters)} | **Görüntü sayısı:** {len(agreement['images'])}")
         
         # Görselleştirme oluştur
-        tab1, tab2, tab3 = st.tabs(["Cohen's Kappa", "Ortalama Puanlar", "Detaylı Veriler"])
+        tab1, tab2, tab3, tab4 = st.tabs(["Uyum Özeti", "Çift Bazında Kappa", "Ortalama Puanlar", "Detaylı Veriler"])
         
         with tab1:
-            st.subheader("Değerlendiriciler Arası Uyum (Cohen's Kappa)")
+            st.subheader("Değerlendiriciler Arası Uyum")
+            
+            # Görüntüler üzerinden bootstrap güven aralıkları
+            agreement_intervals = run_cpu(agreement_confidence_intervals, agreement['ratings'])
+            summary_df = pd.DataFrame({
+                'Özellik': APA_FEATURES,
+                "Krippendorff's Alpha (ordinal)": [m['krippendorff_alpha'] for m in metrics],
+                f"Alpha %{CONFIDENCE_LEVEL * 100:.0f} GA": [format_interval(i['krippendorff_alpha']['bootstrap']) for i in agreement_intervals],
+                "Fleiss' Kappa": [m['fleiss_kappa'] for m in metrics],
+                f"Fleiss %{CONFIDENCE_LEVEL * 100:.0f} GA": [format_interval(i['fleiss_kappa']['bootstrap']) for i in agreement_intervals],
+                "Ortalama Ağırlıklı Kappa (çift)": [m['mean_pairwise_kappa'] for m in metrics],
+                'Ortak Değerlendirilen Görüntü': [m['rated_items'] for m in metrics]
+            })
+            
+            # İki radyolog varsa aralarındaki ağırlıklı kappanın aralığı da gösterilir
+            if len(raters) == 2:
+                kappa_intervals = [
+                    weighted_kappa_interval(agreement['ratings'][f, 0], agreement['ratings'][f, 1])
+                    for f in range(len(APA_FEATURES))
+                ]
+                summary_df.insert(6, f"Kappa %{CONFIDENCE_LEVEL * 100:.0f} GA", [format_interval(i['bootstrap']) for i in kappa_intervals])
+            
+            st.dataframe(summary_df, use_container_width=True)
             
-            # Kappa puanları için çubuk grafik
+            # Alpha değerleri için çubuk grafik
             fig, ax = plt.subplots(figsize=(10, 6))
-            feature_names = [f.replace("_", " ").title() for f in feature_cols]
-            kappa_values = [kappa_scores[f] for f in feature_cols]
+            alpha_values = np.array([m['krippendorff_alpha'] for m in metrics], dtype=float)
+            # Puan varyansı olmayan özelliklerde alpha tanımsızdır (NaN); sıfır gibi çizilmez
+            undefined = np.isnan(alpha_values)
             
-            # Kappa değerine göre renklendirme
-            colors = ['#ff9999' if k < 0.4 else '#ffcc99' if k < 0.6 else '#99cc99' if k < 0.8 else '#99ccff' for k in kappa_values]
+            # Uyum değerine göre renklendirme
+            colors = ['#dddddd' if np.isnan(k) else '#ff9999' if k < 0.4 else '#ffcc99' if k < 0.6 else '#99cc99' if k < 0.8 else '#99ccff'
+                      for k in alpha_values]
             
-            bars = ax.bar(feature_names, kappa_values, color=colors)
+            bars = ax.bar(feature_names, np.where(undefined, 0, alpha_values), color=colors)
             
-            # Değerleri ekle
-            for bar, val in zip(bars, kappa_values):
+            # Değerleri ekle (negatif alpha çubuğun altına, tanımsızlar açıkça etiketlenir)
+            for bar, val in zip(bars, alpha_values):
+                if np.isnan(val):
+                    label, y, va = 'NaN\n(varyans yok)', 0.02, 'bottom'
+                else:
+                    label, y, va = f'{val:.2f}', (val + 0.02 if val >= 0 else val - 0.02), ('bottom' if val >= 0 else 'top')
                 ax.text(bar.get_x() + bar.get_width()/2, 
-                        val + 0.02, 
-                        f'{val:.2f}', 
+                        y, 
+                        label, 
                         ha='center', 
-                        va='bottom',
+                        va=va,
                         fontweight='bold')
             
-            ax.set_ylim([0, 1])
-            ax.set_ylabel('Cohen\'s Kappa')
+            # Sistematik uyumsuzlukta alpha negatif olabilir; eksen sıfırda kesilmez
+            lowest = np.nanmin(alpha_values) if not undefined.all() else 0.0
+            ax.set_ylim([lowest - 0.1 if lowest < 0 else 0, 1])
+            if lowest < 0:
+                ax.axhline(y=0, color='k', linewidth=0.8)
+            ax.set_ylabel('Krippendorff\'s Alpha')
             ax.set_title('Değerlendiriciler Arası Uyum')
             plt.xticks(rotation=45, ha='right')
             
-            # Kappa yorumlama çizgileri
+            # Uyum yorumlama çizgileri
             ax.axhline(y=0.4, linestyle='--', color='r', alpha=0.3)
             ax.axhline(y=0.6, linestyle='--', color='y', alpha=0.3)
             ax.axhline(y=0.8, linestyle='--', color='g', alpha=0.3)
             
-            st.pyplot(fig)
+            show_chart(fig)
             
-            # Kappa yorumlama rehberi
+            # Uyum yorumlama rehberi
             st.info("""
-            **Cohen's Kappa Yorumlama Rehberi:**
+            **Kappa / Alpha Yorumlama Rehberi:**
             - < 0.4: Zayıf uyum (kırmızı)
             - 0.4 - 0.6: Orta düzeyde uyum (turuncu)
             - 0.6 - 0.8: İyi uyum (yeşil)
@@ -763,43 +1308,50 @@ def analyze_apa_results(radiologist1_file, radiologist2_file):
             """)
         
         with tab2:
+            st.subheader("Çift Bazında Ağırlıklı Kappa (doğrusal)")
+            
+            # Her özellik için radyolog x radyolog kappa ısı haritası
+            for feature, m in zip(APA_FEATURES, metrics):
+                fig, ax = plt.subplots(figsize=(max(6, len(raters) * 0.6), max(5, len(raters) * 0.5)))
+                sns.heatmap(m['pairwise_kappa'], annot=len(raters) <= 15, fmt='.2f', cmap='YlGnBu', vmin=0, vmax=1,
+                           xticklabels=raters, yticklabels=raters, ax=ax)
+                ax.set_title(f'{feature} - Ağırlıklı Kappa')
+                
+                show_chart(fig)
+        
+        with tab3:
             st.subheader("Ortalama Puanlar Karşılaştırması")
             
-            # Ortalama puanlar için çubuk grafik
+            # Ortalama puanlar için gruplu çubuk grafik
             fig, ax = plt.subplots(figsize=(10, 6))
             x = np.arange(len(feature_names))
-            width = 0.35
+            width = 0.8 / len(raters)
             
-            # Ortalama puanları göster
-            ax.bar(x - width/2, [mean_scores_rad1[f] for f in feature_cols], width, label='Radyolog 1')
-            ax.bar(x + width/2, [mean_scores_rad2[f] for f in feature_cols], width, label='Radyolog 2')
+            # Her radyoloğun ortalama puanlarını göster
+            for r, rater in enumerate(raters):
+                offsets = x - 0.4 + width * (r + 0.5)
+                ax.bar(offsets, [m['mean_scores'][r] for m in metrics], width, label=rater)
             
             ax.set_xticks(x)
             ax.set_xticklabels(feature_names, rotation=45, ha='right')
             ax.set_ylim([0, 5])
             ax.set_ylabel('Ortalama Puan')
             ax.set_title('Özelliğe Göre Ortalama Anatomik Olabilirlik Puanları')
-            ax.legend()
+            if len(raters) <= 12:
+                ax.legend()
             
-            st.pyplot(fig)
+            show_chart(fig)
         
-        with tab3:
+        with tab4:
             st.subheader("Detaylı Veri Analizi")
             
             # Puan dağılımı ısı haritası
             st.subheader("Puan Dağılımı (%)")
             
-            # Her özellik için puan dağılımını hesapla
-            score_distributions = {}
-            for feature in feature_cols:
-                # Her iki radyologdan puanları birleştir
-                all_scores = list(merged[f"{feature}_rad1"]) + list(merged[f"{feature}_rad2"])
-                score_distributions[feature] = np.bincount(all_scores, minlength=6)[1:]  # 1-5 puanlar
-            
-            # Isı haritası oluştur
-            data = np.array([score_distributions[f] for f in feature_cols])
+            # Tüm radyologların puanlarından dağılım
+            data = np.array([m['score_counts'] for m in metrics])
             # Yüzdelere dönüştür
-            data_percent = (data / data.sum(axis=1)[:, np.newaxis]) * 100
+            data_percent = (data / np.maximum(data.sum(axis=1), 1)[:, np.newaxis]) * 100
             
             fig, ax = plt.subplots(figsize=(10, 8))
             sns.heatmap(data_percent, annot=True, fmt='.1f', cmap='YlGnBu', 
@@ -809,43 +1361,54 @@ def analyze_apa_results(radiologist1_file, radiologist2_file):
             ax.set_title('Olabilirlik Puanları Dağılımı (Toplam %)')
             ax.set_xlabel('5 Basamaklı Likert Ölçeğinde Puan')
             
-            st.pyplot(fig)
+            show_chart(fig)
+            
+            # Radyolog başına ortalama puan tablosu
+            st.subheader("Radyolog Bazında Ortalama Puanlar")
+            st.dataframe(pd.DataFrame(
+                {feature: m['mean_scores'] for feature, m in zip(APA_FEATURES, metrics)},
+                index=raters
+            ))
             
-            # Birleştirilmiş veri tablosunu göster
-            st.subheader("Birleştirilmiş Veri")
-            st.dataframe(merged)
+            # Radyolog başına okuma süreleri
+            st.subheader("Radyolog Bazında Okuma Süreleri (sn)")
+            reader_times = display_reader_times(pd.concat(frames, ignore_index=True))
             
             # Özet rapor oluştur
             st.subheader("Özet Rapor")
             
-            summary_text = """
+            summary_text = f"""
             # Anatomical Plausibility Assessment - Summary Report
             ================================================
             
-            ## Inter-rater agreement (Cohen's kappa) by feature:
-            """
+            Raters: {len(raters)}, images: {len(agreement['images'])}
             
-            for feature, kappa in kappa_scores.items():
-                feature_name = feature.replace("_", " ").title()
-                summary_text += f"- {feature_name}: {kappa:.2f}\n"
+            ## Inter-rater agreement by feature:
+            """
             
-            summary_text += "\n## Mean scores by radiologist:\n\n### Radiologist 1:\n"
-            for feature, score in mean_scores_rad1.items():
-                feature_name = feature.replace("_", " ").title()
-                summary_text += f"- {feature_name}: {score:.2f}\n"
+            for feature_name, m in zip(feature_names, metrics):
+                summary_text += (f"- {feature_name}: Krippendorff's alpha (ordinal) {m['krippendorff_alpha']:.2f}, "
+                                 f"Fleiss' kappa {m['fleiss_kappa']:.2f}, "
+                                 f"mean pairwise weighted kappa {m['mean_pairwise_kappa']:.2f}\n")
             
-            summary_text += "\n### Radiologist 2:\n"
-            for feature, score in mean_scores_rad2.items():
-                feature_name = feature.replace("_", " ").title()
-                summary_text += f"- {feature_name}: {score:.2f}\n"
+            summary_text += "\n## Mean scores by radiologist:\n"
+            for r, rater in enumerate(raters):
+                summary_text += f"\n### {rater}:\n"
+                for feature_name, m in zip(feature_names, metrics):
+                    summary_text += f"- {feature_name}: {m['mean_scores'][r]:.2f}\n"
             
             summary_text += "\n## Score distribution (count):\n"
-            for feature in feature_cols:
-                feature_name = feature.replace("_", " ").title()
+            for feature_name, m in zip(feature_names, metrics):
                 summary_text += f"\n### {feature_name}:\n"
-                for score, count in enumerate(score_distributions[feature], start=1):
+                for score, count in enumerate(m['score_counts'], start=1):
                     summary_text += f"- Score {score}: {count}\n"
             
+            if not reader_times.empty:
+                summary_text += "\n## Reading time by radiologist (seconds):\n"
+                for rater, row in reader_times.iterrows():
+                    summary_text += (f"- {rater}: n={row['count']:.0f}, mean {row['mean']:.1f}, "
+                                     + ", ".join(f"p{p} {row[f'p{p}']:.1f}" for p in RESPONSE_TIME_PERCENTILES) + "\n")
+            
             st.markdown(summary_text)
             
             # Özet raporu indir
@@ -856,6 +1419,8 @@ def analyze_apa_results(radiologist1_file, radiologist2_file):
                 mime="text/markdown",
             )
     
+    except (WorkerPoolBusy, WorkerTaskTimeout) as e:
+        st.warning(f"⏳ Sunucu şu anda çok yoğun, lütfen analizi birkaç saniye sonra yeniden başlatın. ({e})")
     except Exception as e:
         st.error(f"Sonuçlar analiz edilirken hata oluştu: {e}")
 
@@ -869,19 +1434,15 @@ def display_vtt_image():
         st.progress(progress)
         st.subheader(f"Görüntü {st.session_state.current_idx + 1} / {len(st.session_state.all_images)}")
         
-        img_data = st.session_state.all_images[st.session_state.current_idx]
-        
         try:
-            # Standart görüntü dosyasını yükle
-            img = Image.open(img_data['path'])
-            
-            # Yeniden boyutlandır
-            img = img.resize((256, 256))
+            # Hazır 256x256 türevi al (akış modunda gerekirse indirmeyi bekle)
+            img = get_display_image(get_image_path(st.session_state.current_idx))
             
             # Görüntüyü merkeze yerleştir
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
                 st.image(img, width=256)
+            mark_image_displayed(st.session_state.current_idx)
             
             # Kullanıcı talimatları
             st.info("Lütfen yukarıdaki görüntünün gerçek mi yoksa yapay zeka tarafından üretilmiş (sentetik) mi olduğunu değerlendirin.")
@@ -895,9 +1456,12 @@ def display_vtt_image():
                 if st.button("Sentetik", key=f"synth_{st.session_state.current_idx}", use_container_width=True):
                     record_vtt_classification("sentetik")
             
+        except (WorkerPoolBusy, WorkerTaskTimeout) as e:
+            # Görüntü atlanmaz; okuyucu aynı görüntüyü yeniden dener
+            show_busy_notice(e)
         except Exception as e:
             st.error(f"Görüntü gösterilemiyor: {e}")
-            st.session_state.current_idx += 1
+            skip_current_image()
             st.rerun()
     else:
         finish_vtt_evaluation()
@@ -907,45 +1471,26 @@ def record_vtt_classification(classification):
     if st.session_state.current_idx < len(st.session_state.all_images):
         # Sonucu kaydet
         img_data = st.session_state.all_images[st.session_state.current_idx]
-        result = {
-            'radiologist_id': st.session_state.radiologist_id,
-            'image_path': img_data['path'],
-            'image_id': img_data.get('drive_id', ''),
-            'true_type': img_data['true_type'],
-            'classified_as': classification,
-            'correct': img_data['true_type'] == classification,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        response_time, wait_time = take_response_times(st.session_state.current_idx)
+        result = build_vtt_result(
+            st.session_state.radiologist_id,
+            img_data,
+            classification,
+            response_time=response_time,
+            wait_time=wait_time
+        )
+        stats = get_running_stats()
         st.session_state.results.append(result)
+        stats.add(result)
         
-        # Her değerlendirmeden sonra mevcut sonuçları yerel dosyaya kaydet
+        # Sonucu günlüğe hemen yaz; CSV ve depolama eşitlemesi arka planda toplu yapılır
         try:
-            df = pd.DataFrame(st.session_state.results)
-            df.to_csv(st.session_state.output_file, index=False)
-            
-            # Eğer Drive'a kaydetme seçiliyse ve klasör ID'si varsa
-            if st.session_state.save_to_drive and st.session_state.results_folder_id:
-                if st.session_state.drive_result_file_id:
-                    # Drive'daki dosyayı güncelle
-                    update_file_in_drive(
-                        st.session_state.drive_service, 
-                        st.session_state.output_file, 
-                        st.session_state.drive_result_file_id,
-                        st.session_state.result_file_name
-                    )
-                else:
-                    # İlk kez Drive'a yükle
-                    file_id = upload_file_to_drive(
-                        st.session_state.drive_service, 
-                        st.session_state.output_file, 
-                        st.session_state.results_folder_id,
-                        st.session_state.result_file_name
-                    )
-                    if file_id:
-                        st.session_state.drive_result_file_id = file_id
+            st.session_state.result_writer.append(result, st.session_state.current_idx)
         except Exception as e:
             st.warning(f"Sonuçlar kaydedilirken hata oluştu: {e}")
         
+        mark_image_seen(img_data, result)
+        
         # Sonraki görüntüye geç
         st.session_state.current_idx += 1
         
@@ -953,173 +1498,333 @@ def record_vtt_classification(classification):
         st.rerun()
 
 def finish_vtt_evaluation():
-    """Görsel Turing Testini bitir ve sonuçları göster"""
+    """Görsel Turing Testini bitir ve sonuçları göster
+    
+    Oturumu sonlandırma adımları yalnızca ilk çalıştırmada yapılır (bkz. finish_apa_evaluation).
+    """
+    import pandas as pd
+    
+    stats = get_running_stats()
+    try:
+        charts = finish_charts('vtt', st.session_state.results.digest(), stats)
+    except (WorkerPoolBusy, WorkerTaskTimeout) as e:
+        show_busy_notice(e)
+        return
+    
     if not st.session_state.completed:
-        # Özet istatistikleri göster
-        df = pd.DataFrame(st.session_state.results)
-        accuracy = np.mean(df['correct']) * 100
+        complete_session(charts['summary'])
+        st.balloons()  # Kutlama animasyonu
+        st.session_state.completed = True
+    
+    st.success("🎉 Değerlendirme tamamlandı! Teşekkür ederiz.")
+    refresh_drive_file_ids()
+    
+    # Özet istatistikleri göster
+    df = st.session_state.results.to_frame()
+    
+    # Doğruluk, duyarlılık ve özgüllüğü hesapla
+    metrics = stats.vtt_metrics()
+    accuracy = metrics['accuracy']
+    sensitivity = metrics['sensitivity']
+    specificity = metrics['specificity']
+    
+    # Sonuçları sekmeli arayüzde göster
+    tab1, tab2, tab3 = st.tabs(["Özet", "Grafikler", "Detaylı Veriler"])
+    
+    with tab1:
+        st.subheader("Performans Özeti")
         
-        # Ek metrikleri hesapla
-        true_positive = np.sum((df['true_type'] == 'gerçek') & (df['classified_as'] == 'gerçek'))
-        false_positive = np.sum((df['true_type'] == 'sentetik') & (df['classified_as'] == 'gerçek'))
-        true_negative = np.sum((df['true_type'] == 'sentetik') & (df['classified_as'] == 'sentetik'))
-        false_negative = np.sum((df['true_type'] == 'gerçek') & (df['classified_as'] == 'sentetik'))
+        # Metrikler için üç sütunlu düzen
+        col1, col2, col3 = st.columns(3)
         
-        sensitivity = true_positive / (true_positive + false_negative) if (true_positive + false_negative) > 0 else 0
-        specificity = true_negative / (true_negative + false_positive) if (true_negative + false_positive) > 0 else 0
+        with col1:
+            st.metric(label="Genel Doğruluk", value=f"%{accuracy:.2f}")
         
-        # Sonuç ve grafikler dosyasını oluştur
-        try:
-            # Grafikler için bir figür oluştur
-            plt.figure(figsize=(12, 10))
-            
-            # Üst grafik: Görüntü türüne göre doğruluk
-            plt.subplot(2, 1, 1)
-            types = ['Gerçek Görüntüler', 'Sentetik Görüntüler']
-            values = [sensitivity*100, specificity*100]
-            colors = ['#2986cc', '#e06666']
-            plt.bar(types, values, color=colors)
-            plt.ylim([0, 100])
-            plt.ylabel('Doğruluk Oranı (%)')
-            plt.title('Görüntü Türüne Göre Doğruluk')
-            
-            # Alt grafik: Doğru/Yanlış oranı pasta grafiği
-            plt.subplot(2, 1, 2)
-            labels = ['Doğru', 'Yanlış']
-            sizes = [accuracy, 100-accuracy]
-            explode = (0.1, 0)  # Doğru dilimi vurgula
-            plt.pie(sizes, explode=explode, labels=labels, autopct='%1.1f%%',
-                   shadow=True, startangle=90, colors=['#60bd68', '#f15854'])
-            plt.axis('equal')  # Daire şeklinde olmasını sağla
-            plt.title('Genel Doğruluk Oranı')
-            
-            # Grafiği kaydet
-            graph_file_name = f"vtt_grafikler_{st.session_state.radiologist_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            graph_file_path = os.path.join(st.session_state.output_dir, graph_file_name)
-            plt.tight_layout()
-            plt.savefig(graph_file_path)
-            
-            # Grafiği Drive'a yükle
-            if st.session_state.save_to_drive and st.session_state.results_folder_id:
-                graph_id = upload_file_to_drive(
-                    st.session_state.drive_service,
-                    graph_file_path,
-                    st.session_state.results_folder_id,
-                    graph_file_name
-                )
-                if graph_id:
-                    st.session_state.drive_graph_file_id = graph_id
-        except Exception as e:
-            st.warning(f"Grafik dosyası oluşturulurken hata oluştu: {e}")
+        with col2:
+            st.metric(label="Duyarlılık (Gerçek Görüntüler)", value=f"%{sensitivity*100:.2f}")
         
-        st.balloons()  # Kutlama animasyonu
-        st.success("🎉 Değerlendirme tamamlandı! Teşekkür ederiz.")
+        with col3:
+            st.metric(label="Özgüllük (Sentetik Görüntüler)", value=f"%{specificity*100:.2f}")
         
-        # Sonuçları sekmeli arayüzde göster
-        tab1, tab2, tab3 = st.tabs(["Özet", "Grafikler", "Detaylı Veriler"])
+        st.markdown("""
+        **Tanımlar:**
+        - **Duyarlılık**: Gerçek görüntüleri doğru tanımlama yeteneği
+        - **Özgüllük**: Sentetik görüntüleri doğru tanımlama yeteneği
+        """)
         
-        with tab1:
-            st.subheader("Performans Özeti")
-            
-            # Metrikler için üç sütunlu düzen
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric(label="Genel Doğruluk", value=f"%{accuracy:.2f}")
-            
-            with col2:
-                st.metric(label="Duyarlılık (Gerçek Görüntüler)", value=f"%{sensitivity*100:.2f}")
-            
-            with col3:
-                st.metric(label="Özgüllük (Sentetik Görüntüler)", value=f"%{specificity*100:.2f}")
-            
-            st.markdown("""
-            **Tanımlar:**
-            - **Duyarlılık**: Gerçek görüntüleri doğru tanımlama yeteneği
-            - **Özgüllük**: Sentetik görüntüleri doğru tanımlama yeteneği
-            """)
-            
-            # Sonuçların nereye kaydedildiği bilgisi
-            st.subheader("Sonuç Dosyaları")
-            st.write(f"**Yerel sonuç dosyası**: {st.session_state.output_file}")
-            
-            if st.session_state.save_to_drive and st.session_state.drive_result_file_id:
-                st.write(f"**Google Drive sonuç dosyası ID**: {st.session_state.drive_result_file_id}")
-                drive_file_link = f"https://drive.google.com/file/d/{st.session_state.drive_result_file_id}/view"
-                st.markdown(f"[Google Drive'da Sonuç Dosyasını Aç]({drive_file_link})")
-            
-            if hasattr(st.session_state, 'drive_graph_file_id') and st.session_state.drive_graph_file_id:
-                st.write(f"**Google Drive grafik dosyası ID**: {st.session_state.drive_graph_file_id}")
-                graph_file_link = f"https://drive.google.com/file/d/{st.session_state.drive_graph_file_id}/view"
-                st.markdown(f"[Google Drive'da Grafik Dosyasını Aç]({graph_file_link})")
+        # Kesin binom ve bootstrap güven aralıkları
+        intervals = vtt_confidence_intervals(
+            st.session_state.results.column('true_type'),
+            st.session_state.results.column('classified_as')
+        )
+        if intervals:
+            st.subheader(f"%{CONFIDENCE_LEVEL * 100:.0f} Güven Aralıkları")
+            metric_labels = {
+                'accuracy': "Genel Doğruluk",
+                'sensitivity': "Duyarlılık (Gerçek Görüntüler)",
+                'specificity': "Özgüllük (Sentetik Görüntüler)"
+            }
+            st.dataframe(pd.DataFrame([
+                {
+                    'Metrik': label,
+                    'Değer (%)': f"{intervals[metric]['estimate'] * 100:.1f}",
+                    'Kesin Binom (Clopper-Pearson)': format_interval(intervals[metric]['exact'], percent=True),
+                    f'Bootstrap ({BOOTSTRAP_RESAMPLES} örneklem)': format_interval(intervals[metric]['bootstrap'], percent=True)
+                }
+                for metric, label in metric_labels.items()
+            ]), use_container_width=True, hide_index=True)
+        
+        display_response_times(st.session_state.results)
+        
+        # Sonuçların nereye kaydedildiği bilgisi
+        st.subheader("Sonuç Dosyaları")
+        st.write(f"**Yerel sonuç dosyası**: {st.session_state.output_file}")
+        parquet_file = parquet_path_for(st.session_state.output_file)
+        if os.path.exists(parquet_file):
+            st.write(f"**Yerel Parquet sonuç dosyası**: {parquet_file}")
+        
+        display_stored_files()
+    
+    with tab2:
+        st.subheader("Performans Grafikleri")
+        st.image(charts['summary'], use_container_width=True)
+    
+    with tab3:
+        st.subheader("Görüntü Değerlendirme Detayları")
+        
+        # Veri çerçevesini göster
+        show_df = df.copy()
+        show_df['image_path'] = show_df['image_path'].apply(lambda x: os.path.basename(x))  # Sadece dosya adını göster
+        show_df = show_df.rename(columns={
+            'radiologist_id': 'Radyolog',
+            'image_path': 'Görüntü',
+            'image_id': 'Görüntü ID',
+            'true_type': 'Gerçek Tür',
+            'classified_as': 'Değerlendirme',
+            'correct': 'Doğruluk',
+            'timestamp': 'Zaman',
+            'response_time': 'Okuma Süresi (sn)',
+            'wait_time': 'Bekleme Süresi (sn)'
+        })
+        
+        st.dataframe(show_df, use_container_width=True)
+    
+    # Sonuç verilerini CSV olarak indirmek için
+    st.download_button(
+        label="Sonuçları CSV Olarak İndir",
+        data=df.to_csv(index=False).encode('utf-8'),
+        file_name=st.session_state.result_file_name,
+        mime="text/csv",
+    )
+    
+    if parquet_supported():
+        st.download_button(
+            label="Sonuçları Parquet Olarak İndir",
+            data=st.session_state.results.to_parquet_bytes(),
+            file_name=parquet_path_for(st.session_state.result_file_name),
+            mime="application/vnd.apache.parquet",
+        )
+    
+    # Yeni değerlendirme başlatma butonu
+    if st.button("Yeni Değerlendirme Başlat", key="new_eval"):
+        stop_background_workers()
+        st.session_state.initialized = False
+        st.session_state.current_idx = 0
+        st.session_state.results = []
+        st.session_state.all_images = []
+        st.session_state.completed = False
+        st.session_state.radiologist_id = ""
+        clear_upload_state()
+        st.rerun()
 
-        with tab2:
-            st.subheader("Performans Grafikleri")
-            
-            # Görüntü türüne göre doğruluk grafiği
-            fig1, ax1 = plt.subplots(figsize=(10, 6))
-            types = ['Gerçek Görüntüler', 'Sentetik Görüntüler']
-            values = [sensitivity*100, specificity*100]
-            colors = ['#2986cc', '#e06666']
-            ax1.bar(types, values, color=colors)
-            ax1.set_ylim([0, 100])
-            ax1.set_ylabel('Doğruluk Oranı (%)')
-            ax1.set_title('Görüntü Türüne Göre Doğruluk')
-            
-            # Grafiği göster
-            st.pyplot(fig1)
+def vtt_cohort_sources(refresh=False):
+    """Kohort analizi için VTT sonuç dosyaları: depolamadaki sonuç klasörü ve yerel sonuç klasörü
+    
+    Aynı oturumun hem depolamada hem yerelde kopyası varsa yerel kopya kullanılır.
+    """
+    sources = {}
+    
+    storage = st.session_state.storage
+    if storage is None:
+        credentials = None
+        if hasattr(st, 'secrets') and 'google_service_account' in st.secrets:
+            credentials = dict(st.secrets["google_service_account"])
+        storage = connect_storage(credentials)
+    
+    if storage is not None and st.session_state.results_folder_id:
+        named_sources = []
+        for file in list_files_in_folder(storage, st.session_state.results_folder_id, refresh=refresh):
+            if not is_vtt_result_file(file['name']):
+                continue
             
-            # Pasta grafiği - Doğru/Yanlış oranı
-            fig2, ax2 = plt.subplots(figsize=(8, 8))
-            labels = ['Doğru', 'Yanlış']
-            sizes = [accuracy, 100-accuracy]
-            explode = (0.1, 0)  # Doğru dilimi vurgula
-            ax2.pie(sizes, explode=explode, labels=labels, autopct='%1.1f%%',
-                   shadow=True, startangle=90, colors=['#60bd68', '#f15854'])
-            ax2.axis('equal')  # Daire şeklinde olmasını sağla
+            def load(file=file):
+                # İndirme hatası istisna olarak CohortCache'e ulaşır ve dosya başına bir kez gösterilir
+                path = fetch_file_from_storage(
+                    storage, file['id'], file['name'], st.session_state.temp_dir,
+                    version=file_version(file)
+                )
+                return read_results(path)
             
-            st.pyplot(fig2)
+            named_sources.append((file['name'], (f"{storage.kind}:{file['id']}:{file_version(file)}", load)))
+        sources.update(prefer_parquet(named_sources))
+    
+    sources.update(local_result_sources(st.session_state.output_dir))
+    return sources
+
+def display_image_difficulty_index():
+    """Tüm oturumlarda biriken görüntü istatistiklerinden en zor/en kolay görüntüler"""
+    import pandas as pd
+    
+    metric_labels = {
+        'judged_real_rate': "Gerçek denme oranı (sentetik görüntülerde kandırma oranı)",
+        'mean_response_time': "Ortalama tepki süresi (sn)",
+        'vtt_shown': "VTT gösterim sayısı",
+        'apa_rated': "APA değerlendirme sayısı",
+    }
+    metric_labels.update({feature_key(feature): f"Ortalama puan: {feature}" for feature in APA_FEATURES})
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        metric = st.selectbox("Sıralama ölçütü:", list(metric_labels), format_func=metric_labels.get,
+                              key="difficulty_metric")
+        type_label = st.radio("Görüntü türü:", ["Sentetik", "Gerçek", "Tümü"], horizontal=True,
+                              key="difficulty_type")
+    with col2:
+        order = st.radio("Sıralama:", ["En yüksek", "En düşük"], horizontal=True, key="difficulty_order")
+        k = st.number_input("Görüntü sayısı (k):", min_value=1, max_value=500, value=20, key="difficulty_k")
+        min_count = st.number_input("En az gözlem sayısı:", min_value=1, value=3, key="difficulty_min_count")
+    
+    true_type = {"Sentetik": SYNTHETIC, "Gerçek": REAL}.get(type_label)
+    manifest = get_image_manifest()
+    top = manifest.top_images(metric, k=k, true_type=true_type, min_count=min_count, ascending=order == "En düşük")
+    
+    if not top:
+        st.info("Bu ölçüt için yeterli gözlemi olan görüntü yok.")
+        return
+    
+    st.dataframe(pd.DataFrame(top).set_index('name'), use_container_width=True)
+    
+    all_stats = pd.DataFrame(manifest.image_stats())
+    st.download_button(
+        label="Tüm görüntü istatistiklerini indir (CSV)",
+        data=all_stats.to_csv(index=False).encode('utf-8'),
+        file_name=f"goruntu_istatistikleri_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv",
+        key="difficulty_download"
+    )
+
+def display_vtt_cohort_dashboard():
+    """Tüm VTT oturumlarının kohort düzeyinde sonuçlarını göster"""
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    st.header("Görsel Turing Testi - Kohort Analizi")
+    
+    refresh = st.button("Sonuç Listesini Yenile", key="cohort_refresh")
+    
+    cohort_cache = get_cohort_cache()
+    with st.spinner("Sonuç dosyaları okunuyor..."):
+        update_stats = cohort_cache.update(vtt_cohort_sources(refresh=refresh))
+        cohort = cohort_cache.result()
+    
+    st.caption(
+        f"{update_stats['read']} dosya okundu, {update_stats['cached']} dosya önbellekten kullanıldı"
+        + (f", {update_stats['removed']} dosya çıkarıldı" if update_stats['removed'] else "")
+    )
+    for name, error in update_stats['errors']:
+        st.warning(f"{name} okunamadı: {error}")
+    
+    if cohort is None:
+        st.info("Henüz kaydedilmiş bir Görsel Turing Testi sonucu bulunamadı.")
+        return
+    
+    pooled = cohort['pooled']
+    low, high = pooled['accuracy_interval']
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(label="Oturum", value=cohort['sessions'])
+    with col2:
+        st.metric(label="Okuyucu", value=len(cohort['readers']))
+    with col3:
+        st.metric(label="Cevap", value=pooled['answers'])
+    with col4:
+        st.metric(label="Toplam Doğruluk", value=f"%{pooled['accuracy'] * 100:.1f}")
+    st.caption(
+        f"Toplam doğruluk %{CONFIDENCE_LEVEL * 100:.0f} kesin binom aralığı: %{low * 100:.1f} - %{high * 100:.1f} | "
+        f"Duyarlılık: %{pooled['sensitivity'] * 100:.1f} | Özgüllük: %{pooled['specificity'] * 100:.1f}"
+    )
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["Okuyucular", "Görüntüler", "Okuyucular Arası Uyum", "Zorluk Dizini"])
+    
+    with tab1:
+        st.subheader("Okuyucu Başına Performans")
+        readers = cohort['readers']
+        reader_df = pd.DataFrame({
+            'Cevap': readers['answers'],
+            'Doğruluk (%)': (readers['accuracy'] * 100).round(1),
+            'Duyarlılık (%)': (readers['sensitivity'] * 100).round(1),
+            'Özgüllük (%)': (readers['specificity'] * 100).round(1)
+        })
+        reader_df.index.name = 'Radyolog'
+        st.dataframe(reader_df, use_container_width=True)
         
-        with tab3:
-            st.subheader("Görüntü Değerlendirme Detayları")
-            
-            # Veri çerçevesini göster
-            show_df = df.copy()
-            show_df['image_path'] = show_df['image_path'].apply(lambda x: os.path.basename(x))  # Sadece dosya adını göster
-            show_df = show_df.rename(columns={
-                'radiologist_id': 'Radyolog',
-                'image_path': 'Görüntü',
-                'image_id': 'Görüntü ID',
-                'true_type': 'Gerçek Tür',
-                'classified_as': 'Değerlendirme',
-                'correct': 'Doğruluk',
-                'timestamp': 'Zaman'
-            })
-            
-            st.dataframe(show_df, use_container_width=True)
+        # Okuyucuların doğruluk dağılımı
+        fig, ax = plt.subplots(figsize=(10, 4))
+        ax.hist(readers['accuracy'].dropna() * 100, bins=20, range=(0, 100), color='#2986cc')
+        ax.axvline(x=50, linestyle='--', color='r', alpha=0.5)
+        ax.set_xlabel('Doğruluk (%)')
+        ax.set_ylabel('Okuyucu Sayısı')
+        ax.set_title('Okuyucu Doğruluğu Dağılımı (%50: şans düzeyi)')
+        show_chart(fig)
         
-        # Sonuç verilerini CSV olarak indirmek için
-        st.download_button(
-            label="Sonuçları CSV Olarak İndir",
-            data=df.to_csv(index=False).encode('utf-8'),
-            file_name=st.session_state.result_file_name,
-            mime="text/csv",
-        )
+        st.subheader("Okuyucu Başına Okuma Süreleri (sn)")
+        display_reader_times(cohort['response_times'])
+    
+    with tab2:
+        st.subheader("Sentetik Görüntülerin Kandırma Oranı")
+        synthetic = cohort['images'][~cohort['images']['true_real']]
         
-        # Yeni değerlendirme başlatma butonu
-        if st.button("Yeni Değerlendirme Başlat", key="new_eval"):
-            st.session_state.initialized = False
-            st.session_state.current_idx = 0
-            st.session_state.results = []
-            st.session_state.all_images = []
-            st.session_state.completed = False
-            st.session_state.radiologist_id = ""
-            st.session_state.drive_result_file_id = None
-            if hasattr(st.session_state, 'drive_graph_file_id'):
-                delattr(st.session_state, 'drive_graph_file_id')
-            st.rerun()
+        if synthetic.empty:
+            st.info("Sonuçlarda sentetik görüntü yok.")
+        else:
+            st.write(f"**Ortalama kandırma oranı:** %{synthetic['fooling_rate'].mean() * 100:.1f} "
+                     f"({len(synthetic)} sentetik görüntü)")
+            
+            min_shown = st.slider("En az gösterim sayısı:", 1, int(max(synthetic['shown'].max(), 1)), 1, key="cohort_min_shown")
+            top = synthetic[synthetic['shown'] >= min_shown].sort_values(['fooling_rate', 'shown'], ascending=False).head(25)
+            st.dataframe(pd.DataFrame({
+                'Gösterim': top['shown'],
+                'Gerçek Sanılma': top['classified_real'],
+                'Kandırma Oranı (%)': (top['fooling_rate'] * 100).round(1)
+            }).rename_axis('Görüntü'), use_container_width=True)
+            
+            fig, ax = plt.subplots(figsize=(10, 4))
+            ax.hist(synthetic['fooling_rate'] * 100, bins=20, range=(0, 100), color='#e06666')
+            ax.set_xlabel('Kandırma Oranı (%)')
+            ax.set_ylabel('Görüntü Sayısı')
+            ax.set_title('Sentetik Görüntülerin Kandırma Oranı Dağılımı')
+            show_chart(fig)
+    
+    with tab3:
+        st.subheader("Okuyucular Arası Uyum (Gerçek/Sentetik Kararları)")
+        st.write(f"**Fleiss' Kappa:** {cohort['fleiss_kappa']:.2f}")
         
-        st.session_state.completed = True
+        reader_ids = cohort['reader_ids']
+        if 2 <= len(reader_ids) <= 40:
+            fig, ax = plt.subplots(figsize=(max(6, len(reader_ids) * 0.5), max(5, len(reader_ids) * 0.4)))
+            sns.heatmap(cohort['pairwise_kappa'], annot=len(reader_ids) <= 15, fmt='.2f', cmap='YlGnBu',
+                       vmin=-1, vmax=1, xticklabels=reader_ids, yticklabels=reader_ids, ax=ax)
+            ax.set_title("Çift Bazında Cohen's Kappa (ortak görüntüler)")
+            show_chart(fig)
+        elif len(reader_ids) > 40:
+            st.info("Okuyucu sayısı ısı haritası için fazla; Fleiss' kappa tüm okuyucuları kapsar.")
+    
+    with tab4:
+        st.subheader("Görüntü Zorluk Dizini")
+        st.caption("Her kayıtla artımlı güncellenen, tüm oturumları kapsayan görüntü istatistikleri")
+        display_image_difficulty_index()
 
 # Yan panel ayarları
 with st.sidebar:
@@ -1156,44 +1861,60 @@ with st.sidebar:
         else:
             st.session_state.test_type = None
         
-        # Google Drive Bağlantı Durumu
-        st.subheader("Google Drive Durumu")
+        # Depolama bağlantı durumu
+        st.subheader("Depolama Durumu")
         if st.session_state.credentials_uploaded:
             st.success("✅ Kimlik bilgileri yüklendi")
         else:
             st.warning("❌ Kimlik bilgileri yüklenmedi")
+        display_upload_status()
+        
+        # Kohort analizi (VTT için)
+        if st.session_state.test_type == "vtt":
+            st.subheader("Kohort Analizi")
+            st.checkbox("Tüm VTT oturumlarını analiz et", key="show_cohort_dashboard")
         
         # Sonuç analizi (APA için)
         if st.session_state.test_type == "apa":
             st.subheader("Sonuç Analizi")
-            if st.checkbox("İki radyolog sonucunu analiz et"):
-                rad1_file = st.file_uploader("Radyolog 1 CSV Dosyası:", type=["csv"])
-                rad2_file = st.file_uploader("Radyolog 2 CSV Dosyası:", type=["csv"])
+            if st.checkbox("Radyolog sonuçlarını analiz et"):
+                uploaded_results = st.file_uploader(
+                    "Radyolog Sonuç Dosyaları (CSV/Parquet, en az iki radyolog):",
+                    type=["csv", "parquet"],
+                    accept_multiple_files=True
+                )
                 
-                if rad1_file is not None and rad2_file is not None:
-                    # Yüklenen dosyaları geçici dizine kaydet
-                    rad1_path = os.path.join(st.session_state.temp_dir, "rad1_results.csv")
-                    rad2_path = os.path.join(st.session_state.temp_dir, "rad2_results.csv")
-                    
-                    with open(rad1_path, "wb") as f:
-                        f.write(rad1_file.getbuffer())
-                    
-                    with open(rad2_path, "wb") as f:
-                        f.write(rad2_file.getbuffer())
+                if uploaded_results and len(uploaded_results) >= 2:
+                    # Yüklenen dosyaları (uzantılarıyla) geçici dizine kaydet
+                    result_paths = []
+                    for i, uploaded in enumerate(uploaded_results):
+                        path = os.path.join(
+                            st.session_state.temp_dir,
+                            f"analysis_{i}" + os.path.splitext(uploaded.name)[1].lower()
+                        )
+                        with open(path, "wb") as f:
+                            f.write(uploaded.getbuffer())
+                        result_paths.append(path)
                     
                     if st.button("Sonuçları Analiz Et"):
-                        analyze_apa_results(rad1_path, rad2_path)
+                        analyze_apa_results(result_paths)
     else:
         # Test süreci başlatıldıysa değerlendirme durumunu göster
         st.subheader("Değerlendirme Durumu")
         st.write(f"**Radyolog:** {st.session_state.radiologist_id}")
         st.write(f"**İlerleme:** {st.session_state.current_idx}/{len(st.session_state.all_images)} görüntü")
         
+        # Akış modunda okuyucunun ön yükleyiciyi kaç kez beklediğini göster
+        if st.session_state.get('prefetcher') is not None:
+            prefetcher = st.session_state.prefetcher
+            st.write(f"**Ön yükleme beklemesi:** {prefetcher.stalls} kez ({prefetcher.stall_seconds:.1f} sn)")
+        
         # Test türüne özgü bilgiler
         if st.session_state.test_type == "vtt":
             # VTT için sınıflandırma istatistikleri
-            completed_real = sum(1 for r in st.session_state.results if r['classified_as'] == 'gerçek')
-            completed_synth = sum(1 for r in st.session_state.results if r['classified_as'] == 'sentetik')
+            stats = get_running_stats()
+            completed_real = stats.classified_real
+            completed_synth = stats.classified_synthetic
             
             st.write(f"**Gerçek olarak değerlendirilen:** {completed_real}")
             st.write(f"**Sentetik olarak değerlendirilen:** {completed_synth}")
@@ -1201,19 +1922,27 @@ with st.sidebar:
             # APA için ortalama puanlar (eğer varsa sonuç)
             if st.session_state.results:
                 st.subheader("Mevcut Ortalama Puanlar")
-                df = pd.DataFrame(st.session_state.results)
+                mean_scores = get_running_stats().apa_means()
                 for feature in APA_FEATURES:
-                    feature_key = feature.replace(" ", "_").lower()
-                    if feature_key in df.columns:
-                        avg_score = np.mean(df[feature_key])
-                        st.write(f"**{feature}:** {avg_score:.2f}")
+                    st.write(f"**{feature}:** {mean_scores[feature]:.2f}")
+        
+        # Depolamaya kayıt durumu
+        writer = st.session_state.get('result_writer')
+        if writer is not None and writer.drive_file_id:
+            st.session_state.drive_result_file_id = writer.drive_file_id
         
-        # Drive'a kayıt durumu
         if st.session_state.save_to_drive:
+            label = st.session_state.storage.label if st.session_state.get('storage') is not None else "depolama"
             if st.session_state.drive_result_file_id:
-                st.success("✅ Sonuçlar Google Drive'a kaydediliyor")
+                st.success(f"✅ Sonuçlar kaydediliyor ({label})")
             else:
-                st.info("⏳ Sonuçlar henüz Drive'a kaydedilmedi")
+                st.info(f"⏳ Sonuçlar henüz kaydedilmedi ({label})")
+            
+            if writer is not None:
+                if writer.last_error:
+                    st.warning(f"Son eşitleme başarısız, yeniden denenecek: {writer.last_error}")
+                st.caption(f"Eşitlenmeyi bekleyen sonuç: {writer.pending_count}")
+            display_upload_status()
         
         # Değerlendirmeyi sıfırla
         st.markdown("---")
@@ -1221,6 +1950,7 @@ with st.sidebar:
             if st.session_state.current_idx > 0:
                 reset_confirm = st.checkbox("Eminim, değerlendirmeyi sıfırla")
                 if reset_confirm:
+                    stop_background_workers()
                     st.session_state.initialized = False
                     st.session_state.current_idx = 0
                     st.session_state.results = []
@@ -1228,12 +1958,13 @@ with st.sidebar:
                     st.session_state.completed = False
                     st.session_state.radiologist_id = ""
                     st.session_state.test_type = None
-                    st.session_state.drive_result_file_id = None
+                    clear_upload_state()
                     # APA puanlarını sıfırla
                     for feature in APA_FEATURES:
                         st.session_state.ratings[feature] = 3
                     st.rerun()
             else:
+                stop_background_workers()
                 st.session_state.initialized = False
                 st.session_state.current_idx = 0
                 st.session_state.results = []
@@ -1241,7 +1972,7 @@ with st.sidebar:
                 st.session_state.completed = False
                 st.session_state.radiologist_id = ""
                 st.session_state.test_type = None
-                st.session_state.drive_result_file_id = None
+                clear_upload_state()
                 # APA puanlarını sıfırla
                 for feature in APA_FEATURES:
                     st.session_state.ratings[feature] = 3
@@ -1254,18 +1985,40 @@ with st.sidebar:
 
 # Ana uygulama mantığı
 if not st.session_state.initialized:
-    # Uygulama henüz başlatılmadıysa, başlatma formunu göster
-    initialize_app()
+    cohort_selected = st.session_state.test_type == "vtt" and st.session_state.get('show_cohort_dashboard')
+    screen = "cohort" if cohort_selected else "start"
+elif not st.session_state.completed:
+    screen = "evaluation"
 else:
-    # Uygulama başlatıldıysa, test türüne göre değerlendirme arayüzünü göster
-    if not st.session_state.completed:
-        if st.session_state.test_type == "apa":
-            display_apa_image()
-        elif st.session_state.test_type == "vtt":
-            display_vtt_image()
+    screen = "finish"
+
+# Metrik dosyası yazıcısını (süreçte bir kez) başlat
+get_metrics_file_writer()
+
+try:
+    if not st.session_state.initialized:
+        if cohort_selected:
+            # Kohort analizi seçildiyse tüm VTT oturumlarının özetini göster
+            display_vtt_cohort_dashboard()
+        else:
+            # Uygulama henüz başlatılmadıysa, başlatma formunu göster
+            initialize_app()
     else:
-        # Tamamlanmış değerlendirme için sonuçları göster
-        if st.session_state.test_type == "apa":
-            finish_apa_evaluation()
-        elif st.session_state.test_type == "vtt":
-            finish_vtt_evaluation()
+        # Uygulama başlatıldıysa, test türüne göre değerlendirme arayüzünü göster
+        if not st.session_state.completed:
+            if st.session_state.test_type == "apa":
+                display_apa_image()
+            elif st.session_state.test_type == "vtt":
+                display_vtt_image()
+        else:
+            # Tamamlanmış değerlendirme için sonuçları göster
+            if st.session_state.test_type == "apa":
+                finish_apa_evaluation()
+            elif st.session_state.test_type == "vtt":
+                finish_vtt_evaluation()
+finally:
+    # Çalıştırmanın toplam süresi (kenar çubuğu dahil); st.rerun() ile kesilenler de sayılır
+    observe("app.rerun", clock() - RUN_STARTED_AT, test=st.session_state.test_type or "", screen=screen)
+
+if admin_panel_enabled():
+    display_admin_panel()
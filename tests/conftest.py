@@ -0,0 +1,7 @@
+"""Testlerin depo kökündeki core paketini ve kıyaslama yardımcılarını (benchmarks/) içe aktarabilmesi için yol ayarı"""
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "benchmarks"))
+sys.path.insert(0, REPO_DIR)
@@ -0,0 +1,82 @@
+"""Testler için bellek içi, S3 uyumlu sahte boto3 istemcisi
+
+S3Storage'ın kullandığı yüzeyi taklit eder: get_paginator('list_objects_v2'),
+download_file, upload_file ve delete_object. Listeleme sayfaları page_size
+nesne içerir; çağrı sayıları calls'ta tutulur. Olmayan nesneler için boto3
+ClientError gibi HTTP durum kodunu response'ta taşıyan hata fırlatılır.
+"""
+import hashlib
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+class FakeClientError(Exception):
+    """botocore.exceptions.ClientError gibi response['ResponseMetadata']['HTTPStatusCode'] taşır"""
+    
+    def __init__(self, status, code):
+        super().__init__(f"An error occurred ({code})")
+        self.response = {'Error': {'Code': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}
+
+class _Paginator:
+    def __init__(self, client):
+        self.client = client
+    
+    def paginate(self, Bucket, Prefix='', Delimiter=None, PaginationConfig=None):
+        with self.client.lock:
+            keys = sorted(key for key in self.client.objects
+                          if key.startswith(Prefix) and not (Delimiter and Delimiter in key[len(Prefix):]))
+        for start in range(0, max(len(keys), 1), self.client.page_size):
+            self.client.count('list')
+            page = keys[start:start + self.client.page_size]
+            yield {'Contents': [self.client.describe(key) for key in page]} if page else {}
+
+class FakeS3Client:
+    """Tek bir kovayı bellekte tutan sahte S3 istemcisi (iş parçacığı güvenli)"""
+    
+    def __init__(self, objects=None, page_size=1000, endpoint_url=None):
+        self.objects = dict(objects or {})
+        self.modified = {key: datetime(2025, 1, 1, tzinfo=timezone.utc) for key in self.objects}
+        self.page_size = page_size
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.meta = type('Meta', (), {'endpoint_url': endpoint_url})()
+    
+    def count(self, name):
+        with self.lock:
+            self.calls[name] += 1
+    
+    def describe(self, key):
+        data = self.objects[key]
+        return {
+            'Key': key,
+            'Size': len(data),
+            'ETag': f'"{hashlib.md5(data).hexdigest()}"',
+            'LastModified': self.modified[key],
+        }
+    
+    def get_paginator(self, name):
+        assert name == 'list_objects_v2'
+        return _Paginator(self)
+    
+    def download_file(self, bucket, key, file_path):
+        self.count('get')
+        with self.lock:
+            if key not in self.objects:
+                raise FakeClientError(404, 'NoSuchKey')
+            data = self.objects[key]
+        with open(file_path, 'wb') as f:
+            f.write(data)
+    
+    def upload_file(self, file_path, bucket, key, ExtraArgs=None):
+        self.count('put')
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        with self.lock:
+            self.objects[key] = data
+            self.modified[key] = datetime.now(timezone.utc)
+    
+    def delete_object(self, Bucket, Key):
+        self.count('delete')
+        with self.lock:
+            self.objects.pop(Key, None)
+            self.modified.pop(Key, None)
@@ -0,0 +1,40 @@
+"""Kohort sonuç kaynaklarının toplu okunması (core/cohort.py) testleri"""
+import pandas as pd
+
+from core.cohort import LocalParquetSource, load_sources
+from core.results import ResultStore
+from core.scoring import REAL, SYNTHETIC, build_vtt_result
+
+def write_session(path, radiologist_id, count):
+    records = [
+        build_vtt_result(radiologist_id, {'name': f"img{i}.png", 'drive_id': f"id{i}",
+                                          'true_type': REAL if i % 2 else SYNTHETIC}, REAL)
+        for i in range(count)
+    ]
+    ResultStore.from_records('vtt', records).to_parquet(str(path))
+    return LocalParquetSource(str(path))
+
+def test_parquet_sessions_are_read_in_one_scan(tmp_path, monkeypatch):
+    loads = {f"vtt_sonuclari_R{i}": write_session(tmp_path / f"vtt_sonuclari_R{i}.parquet", f"R{i}", i + 1)
+             for i in range(3)}
+    expected = {name: load() for name, load in loads.items()}
+    
+    def read_one_by_one(self):
+        raise AssertionError("toplu tarama kullanılmadı")
+    
+    monkeypatch.setattr(LocalParquetSource, '__call__', read_one_by_one)
+    frames = load_sources(loads)
+    
+    assert sorted(frames) == sorted(loads)
+    for name, frame in frames.items():
+        pd.testing.assert_frame_equal(frame, expected[name])
+
+def test_failed_source_is_reported_per_session(tmp_path):
+    good = write_session(tmp_path / "vtt_sonuclari_R1.parquet", "R1", 2)
+    
+    def broken():
+        raise OSError("indirilemedi")
+    
+    frames = load_sources({'iyi': good, 'bozuk': broken})
+    assert len(frames['iyi']) == 2
+    assert isinstance(frames['bozuk'], OSError)
@@ -0,0 +1,100 @@
+"""Eşzamanlı görüntü indirme (core/storage.py) testleri
+
+İndirmeler benchmarks/fake_drive.py'deki sahte Drive servisine karşı gerçek
+MediaIoBaseDownload akışıyla yapılır.
+"""
+import threading
+
+from core.storage import DriveStorage, download_file_with_retry, download_files_concurrently
+from fake_drive import REAL_FOLDER_ID, FakeDrive
+
+class FlakyDrive(FakeDrive):
+    """Eşzamanlı indirme sayısını ölçen; failures'taki dosyaları verilen sayıda başarısız kılan sahte Drive"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = {}  # dosya_id -> kalan başarısız deneme sayısı
+        self.attempts = {}
+        self.active = 0
+        self.max_active = 0
+    
+    def get_blob(self, file_id):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.attempts[file_id] = self.attempts.get(file_id, 0) + 1
+            failing = self.failures.get(file_id, 0)
+            if failing:
+                self.failures[file_id] = failing - 1
+        try:
+            if failing:
+                raise OSError(f"bağlantı koptu: {file_id}")
+            return super().get_blob(file_id)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+def drive_files(drive, count):
+    return drive.folders[REAL_FOLDER_ID][:count]
+
+def test_downloads_are_bounded_and_report_progress(tmp_path):
+    drive = FlakyDrive(n_real=12, n_synthetic=0, image_size=32, latency=0.02)
+    files = drive_files(drive, 12)
+    progress = []
+    main_thread = threading.current_thread()
+    
+    def on_progress(completed, total, file):
+        assert threading.current_thread() is main_thread
+        progress.append((completed, total, file['id']))
+    
+    paths, errors = download_files_concurrently(DriveStorage(lambda: drive), files, str(tmp_path),
+                                                max_workers=3, progress_callback=on_progress)
+    
+    assert errors == {}
+    assert sorted(paths) == sorted(f['id'] for f in files)
+    for f in files:
+        with open(paths[f['id']], 'rb') as downloaded:
+            assert downloaded.read() == drive.blobs[f['id']]
+    assert 1 < drive.max_active <= 3
+    assert [(completed, total) for completed, total, _ in progress] == [(i, 12) for i in range(1, 13)]
+    assert sorted(file_id for _, _, file_id in progress) == sorted(paths)
+
+def test_transient_failure_is_retried(tmp_path):
+    drive = FlakyDrive(n_real=1, n_synthetic=0, image_size=32)
+    file = drive_files(drive, 1)[0]
+    drive.failures[file['id']] = 2
+    
+    path = download_file_with_retry(DriveStorage(lambda: drive), file['id'], file['name'], str(tmp_path),
+                                    max_retries=3, backoff=0)
+    assert drive.attempts[file['id']] == 3
+    with open(path, 'rb') as downloaded:
+        assert downloaded.read() == drive.blobs[file['id']]
+
+def test_persistent_failure_is_reported_after_max_retries(tmp_path):
+    drive = FlakyDrive(n_real=3, n_synthetic=0, image_size=32)
+    files = drive_files(drive, 3)
+    broken = files[1]['id']
+    drive.failures[broken] = 100
+    progress = []
+    
+    paths, errors = download_files_concurrently(DriveStorage(lambda: drive), files, str(tmp_path),
+                                                progress_callback=lambda *args: progress.append(args),
+                                                max_retries=2, backoff=0)
+    
+    assert sorted(paths) == sorted(f['id'] for f in files if f['id'] != broken)
+    assert list(errors) == [broken] and isinstance(errors[broken], OSError)
+    assert drive.attempts[broken] == 3
+    # Başarısız dosya da ilerlemeye sayılır
+    assert [completed for completed, _, _ in progress] == [1, 2, 3]
+
+def test_invalid_image_is_an_error(tmp_path):
+    drive = FlakyDrive(n_real=1, n_synthetic=0, image_size=32)
+    file = drive_files(drive, 1)[0]
+    drive.blobs[file['id']] = b"resim degil"
+    
+    paths, errors = download_files_concurrently(DriveStorage(lambda: drive), [file], str(tmp_path),
+                                                max_retries=0, backoff=0)
+    assert paths == {} and list(errors) == [file['id']]
+
+def test_empty_file_list(tmp_path):
+    assert download_files_concurrently(DriveStorage(lambda: None), [], str(tmp_path)) == ({}, {})
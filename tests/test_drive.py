@@ -0,0 +1,134 @@
+"""Paylaşılan Drive klasör listesi önbelleği (core/drive.py) testleri"""
+import threading
+import time
+from collections import Counter
+
+from core.drive import FolderListingCache
+
+class _Call:
+    def __init__(self, fn):
+        self.fn = fn
+    
+    def execute(self):
+        return self.fn()
+
+class StubDrive:
+    """files().list ve changes() yüzeyini taklit eden Drive
+    
+    Değişiklikler bir günlükte tutulur; belirteç günlükteki sıradır. slow klasörünün
+    listelenmesi gate açılana kadar bekler.
+    """
+    
+    def __init__(self, folders):
+        self.folders = {folder_id: dict(files) for folder_id, files in folders.items()}
+        self.log = []
+        self.calls = Counter()
+        self.gate = threading.Event()
+        self.gate.set()
+        self.slow = None
+        self.entered = threading.Event()
+        self.changes_fail = False
+    
+    def add(self, folder_id, file_id):
+        file = {'id': file_id, 'name': f"{file_id}.png"}
+        self.folders[folder_id][file_id] = file
+        self.log.append({'fileId': file_id, 'removed': False, 'file': dict(file, parents=[folder_id])})
+    
+    def remove(self, folder_id, file_id):
+        del self.folders[folder_id][file_id]
+        self.log.append({'fileId': file_id, 'removed': True})
+    
+    def files(self):
+        return self
+    
+    def list(self, q=None, pageSize=None, pageToken=None, fields=None):
+        def run():
+            folder_id = q.split("'")[1]
+            self.calls['list', folder_id] += 1
+            if folder_id == self.slow:
+                self.entered.set()
+                self.gate.wait(5)
+            return {'files': list(self.folders[folder_id].values())}
+        return _Call(run)
+    
+    def changes(self):
+        return _Changes(self)
+
+class _Changes:
+    def __init__(self, drive):
+        self.drive = drive
+    
+    def getStartPageToken(self):
+        return _Call(lambda: {'startPageToken': str(len(self.drive.log))})
+    
+    def list(self, pageToken=None, pageSize=None, fields=None):
+        def run():
+            self.drive.calls['changes'] += 1
+            if self.drive.changes_fail:
+                raise OSError("changes API kullanılamıyor")
+            return {'changes': self.drive.log[int(pageToken):], 'newStartPageToken': str(len(self.drive.log))}
+        return _Call(run)
+
+def file_ids(files):
+    return sorted(f['id'] for f in files)
+
+def expire(cache):
+    for folder_id in cache.fetched_at:
+        cache.fetched_at[folder_id] -= cache.ttl + 1
+
+def test_listing_is_cached_until_ttl():
+    drive = StubDrive({'A': {'a1': {'id': 'a1'}}})
+    cache = FolderListingCache(ttl=60)
+    assert file_ids(cache.get(drive, 'A')) == ['a1']
+    drive.add('A', 'a2')
+    assert file_ids(cache.get(drive, 'A')) == ['a1']
+    assert drive.calls['list', 'A'] == 1
+
+def test_replay_updates_every_folder_it_covers():
+    drive = StubDrive({'A': {'a1': {'id': 'a1'}}, 'B': {'b1': {'id': 'b1'}}})
+    cache = FolderListingCache(ttl=60)
+    cache.get(drive, 'A')
+    cache.get(drive, 'B')
+    drive.add('B', 'b2')
+    drive.remove('A', 'a1')
+    expire(cache)
+    
+    assert file_ids(cache.get(drive, 'A')) == []
+    # B aynı akışla güncellendi: yeniden listelenmez, değişiklikler tekrar okunmaz
+    assert file_ids(cache.get(drive, 'B')) == ['b1', 'b2']
+    assert drive.calls['changes'] == 1
+    assert drive.calls['list', 'A'] == drive.calls['list', 'B'] == 1
+    assert cache.tokens == {'A': '2', 'B': '2'}
+
+def test_failed_replay_falls_back_to_full_listing():
+    drive = StubDrive({'A': {'a1': {'id': 'a1'}}})
+    cache = FolderListingCache(ttl=60)
+    cache.get(drive, 'A')
+    drive.add('A', 'a2')
+    drive.changes_fail = True
+    expire(cache)
+    assert file_ids(cache.get(drive, 'A')) == ['a1', 'a2']
+    assert drive.calls['list', 'A'] == 2
+
+def test_slow_listing_does_not_block_other_folders():
+    drive = StubDrive({'A': {'a1': {'id': 'a1'}}, 'B': {'b1': {'id': 'b1'}}})
+    cache = FolderListingCache(ttl=60)
+    cache.get(drive, 'B')
+    drive.slow = 'A'
+    drive.gate.clear()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(drive, 'A'))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    assert drive.entered.wait(5)
+    
+    started = time.monotonic()
+    assert file_ids(cache.get(drive, 'B')) == ['b1']
+    assert time.monotonic() - started < 1
+    
+    drive.gate.set()
+    for thread in threads:
+        thread.join(5)
+    # Aynı klasörü bekleyenler tek listelemenin sonucunu paylaşır
+    assert [file_ids(files) for files in results] == [['a1']] * 3
+    assert drive.calls['list', 'A'] == 1
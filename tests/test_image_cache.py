@@ -0,0 +1,109 @@
+"""Paylaşılan görüntü önbelleği (core/image_cache.py) testleri"""
+import os
+import threading
+import time
+
+import pytest
+
+from core.image_cache import ImageCache
+
+class Downloads:
+    """download_fn yerine geçen sayaçlı indirici; her dosya size baytlık içerik yazar"""
+    
+    def __init__(self, size=100, delay=0.0):
+        self.size = size
+        self.delay = delay
+        self.count = 0
+        self.lock = threading.Lock()
+    
+    def __call__(self, file_id):
+        def download(path):
+            with self.lock:
+                self.count += 1
+            time.sleep(self.delay)
+            with open(path, 'wb') as f:
+                f.write(file_id.encode('ascii').ljust(self.size, b'.'))
+        return download
+
+def test_miss_then_hit(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=10_000)
+    downloads = Downloads()
+    first = cache.fetch("a", "v1", "a.png", downloads("a"))
+    second = cache.fetch("a", "v1", "a.png", downloads("a"))
+    
+    assert first == second and first.endswith(".png")
+    assert downloads.count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Yeni sürüm ayrı bir anahtardır
+    assert cache.fetch("a", "v2", "a.png", downloads("a")) != first
+    assert downloads.count == 2
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=250)
+    downloads = Downloads(size=100)
+    path_a = cache.fetch("a", None, "a.png", downloads("a"))
+    path_b = cache.fetch("b", None, "b.png", downloads("b"))
+    cache.fetch("a", None, "a.png", downloads("a"))  # a en son kullanılan olur
+    path_c = cache.fetch("c", None, "c.png", downloads("c"))
+    
+    assert cache.total_bytes == 200
+    assert [path for path, _ in cache.entries.values()] == [path_a, path_c]
+    assert not os.path.exists(path_b)
+    assert os.path.exists(path_a) and os.path.exists(path_c)
+
+def test_single_entry_larger_than_limit_is_kept(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=50)
+    path = cache.fetch("a", None, "a.png", Downloads(size=100)("a"))
+    assert os.path.exists(path) and cache.total_bytes == 100
+
+def test_concurrent_requests_share_one_download(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=10_000)
+    downloads = Downloads(delay=0.05)
+    paths = []
+    threads = [threading.Thread(target=lambda i=i: paths.append(
+        cache.fetch(f"f{i % 3}", None, "x.png", downloads(f"f{i % 3}")))) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    
+    assert len(paths) == 12 and len(set(paths)) == 3
+    assert downloads.count == 3
+    # Anahtar kilitleri, onları bekleyen son istek bitince silinir
+    assert cache.key_locks == {}
+
+def test_failed_download_leaves_no_entry(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=10_000)
+    
+    def broken(path):
+        with open(path, 'wb') as f:
+            f.write(b"yar")
+        raise OSError("bağlantı koptu")
+    
+    with pytest.raises(OSError):
+        cache.fetch("a", None, "a.png", broken)
+    assert os.listdir(tmp_path) == []
+    assert cache.entries == {} and cache.key_locks == {}
+    assert os.path.exists(cache.fetch("a", None, "a.png", Downloads()("a")))
+
+def test_existing_files_are_reloaded_in_use_order(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=10_000)
+    downloads = Downloads()
+    paths = [cache.fetch(file_id, None, f"{file_id}.png", downloads(file_id)) for file_id in "abc"]
+    for age, path in zip((30, 10, 20), paths):
+        os.utime(path, (time.time() - age, time.time() - age))
+    (tmp_path / ".tmp-yarim.png").write_bytes(b"x")
+    
+    reloaded = ImageCache(str(tmp_path), max_bytes=10_000)
+    assert [path for path, _ in reloaded.entries.values()] == [paths[0], paths[2], paths[1]]
+    assert reloaded.total_bytes == 300
+
+def test_externally_deleted_file_is_downloaded_again(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=10_000)
+    downloads = Downloads()
+    path = cache.fetch("a", None, "a.png", downloads("a"))
+    os.remove(path)
+    
+    assert cache.fetch("a", None, "a.png", downloads("a")) == path
+    assert downloads.count == 2
+    assert cache.total_bytes == 100
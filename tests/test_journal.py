@@ -0,0 +1,109 @@
+"""Oturum günlüğü (core/journal.py) ve çökme sonrası sürdürme testleri"""
+import json
+
+from core.journal import ResultWriter, find_resumable_sessions, journal_file_for, load_session_journal
+from core.results import ResultStore
+from core.scoring import REAL, SYNTHETIC, build_vtt_result
+
+IMAGES = [
+    {'name': f"img{i}.png", 'drive_id': f"id{i}", 'version': '', 'true_type': REAL if i % 2 else SYNTHETIC}
+    for i in range(4)
+]
+
+def header(radiologist_id="R1", test_type="vtt", images=IMAGES):
+    return {'type': 'session', 'test_type': test_type, 'radiologist_id': radiologist_id, 'images': images}
+
+def result(idx, radiologist_id="R1"):
+    return {'type': 'result', 'idx': idx,
+            'result': build_vtt_result(radiologist_id, IMAGES[idx], REAL, response_time=1.5)}
+
+def write_journal(path, records, tail=""):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        f.write(tail)
+    return str(path)
+
+def test_load_rebuilds_session_state(tmp_path):
+    journal = write_journal(tmp_path / "oturum.jsonl", [
+        header(),
+        result(0),
+        {'type': 'skip', 'idx': 1},
+        result(2),
+        {'type': 'drive_file', 'id': "csv1"},
+        {'type': 'drive_file', 'format': 'parquet', 'id': "pq1"},
+        {'type': 'drive_file', 'id': "csv2"},
+    ])
+    state = load_session_journal(journal)
+    
+    assert state['header']['radiologist_id'] == "R1"
+    assert [r['image_path'] for r in state['results']] == ["img0.png", "img2.png"]
+    assert state['current_idx'] == 3
+    assert state['drive_file_id'] == "csv2"
+    assert state['parquet_drive_file_id'] == "pq1"
+    assert state['completed'] is False
+
+def test_torn_last_line_is_ignored(tmp_path):
+    journal = write_journal(tmp_path / "oturum.jsonl", [header(), result(0)],
+                            tail='{"type": "result", "idx": 1, "result": {"radiologist_id": "R')
+    state = load_session_journal(journal)
+    assert len(state['results']) == 1
+    assert state['current_idx'] == 1
+
+def test_skip_advances_without_result(tmp_path):
+    journal = write_journal(tmp_path / "oturum.jsonl", [header(), {'type': 'skip', 'idx': 0}])
+    state = load_session_journal(journal)
+    assert state['results'] == []
+    assert state['current_idx'] == 1
+
+def test_completed_flag(tmp_path):
+    journal = write_journal(tmp_path / "oturum.jsonl", [header(), result(0), {'type': 'completed'}])
+    assert load_session_journal(journal)['completed'] is True
+
+def test_find_resumable_sessions_filters_and_orders(tmp_path):
+    write_journal(tmp_path / "vtt_sonuclari_R1_20250101_100000.jsonl", [header(), result(0)])
+    write_journal(tmp_path / "vtt_sonuclari_R1_20250102_100000.jsonl", [header(), {'type': 'skip', 'idx': 0}])
+    # Tamamlanmış, tüm görüntüleri cevaplanmış ve başlığı yarım kalmış oturumlar sürdürülmez
+    write_journal(tmp_path / "vtt_sonuclari_R1_20250103_100000.jsonl", [header(), result(0), {'type': 'completed'}])
+    write_journal(tmp_path / "vtt_sonuclari_R1_20250104_100000.jsonl", [header()] + [result(i) for i in range(4)])
+    write_journal(tmp_path / "vtt_sonuclari_R1_20250105_100000.jsonl", [], tail='{"type": "sess')
+    # Öneki R1 ile başlayan başka bir radyolog, başka test türü ve günlük olmayan dosya
+    write_journal(tmp_path / "vtt_sonuclari_R1_2_20250106_100000.jsonl", [header("R1_2"), result(0, "R1_2")])
+    write_journal(tmp_path / "apa_sonuclari_R1_20250107_100000.jsonl", [header(test_type="apa")])
+    (tmp_path / "vtt_sonuclari_R1_20250108_100000.csv").write_text("radiologist_id\nR1\n")
+    
+    sessions = find_resumable_sessions(str(tmp_path), "R1", "vtt")
+    
+    assert [path.rsplit('/', 1)[-1] for path, _ in sessions] == [
+        "vtt_sonuclari_R1_20250102_100000.jsonl",
+        "vtt_sonuclari_R1_20250101_100000.jsonl",
+    ]
+    assert [state['current_idx'] for _, state in sessions] == [1, 1]
+    assert find_resumable_sessions(str(tmp_path / "yok"), "R1", "vtt") == []
+
+def test_result_writer_journal_round_trip(tmp_path):
+    output_file = str(tmp_path / "vtt_sonuclari_R1_20250101_100000.csv")
+    store = ResultStore('vtt', capacity=len(IMAGES))
+    writer = ResultWriter(output_file, "vtt_sonuclari_R1_20250101_100000.csv", store,
+                          header={k: v for k, v in header().items() if k != 'type'}, interval=60)
+    try:
+        first, third = result(0)['result'], result(2)['result']
+        store.append(first)
+        writer.append(first, 0)
+        writer.record_skip(1)
+        store.append(third)
+        writer.append(third, 2)
+        writer._csv_uploaded("csv1")
+        writer._parquet_uploaded("pq1")
+    finally:
+        writer.close()
+    
+    state = load_session_journal(journal_file_for(output_file))
+    assert state['header']['images'] == IMAGES
+    assert state['results'] == list(store)
+    assert state['current_idx'] == 3
+    assert (state['drive_file_id'], state['parquet_drive_file_id']) == ("csv1", "pq1")
+    assert state['completed'] is False
+    
+    writer.mark_completed()
+    assert load_session_journal(journal_file_for(output_file))['completed'] is True
@@ -0,0 +1,116 @@
+"""Kalıcı görüntü manifesti (core/manifest.py) testleri"""
+import pytest
+
+from core.config import APA_FEATURES
+from core.manifest import ImageManifest
+from core.scoring import REAL, SYNTHETIC, build_apa_result, build_vtt_result, feature_key
+
+def drive_file(file_id, md5="m1", name=None, mime_type='image/png'):
+    return {'id': file_id, 'name': name or f"{file_id}.png", 'mimeType': mime_type,
+            'size': "100", 'md5Checksum': md5, 'modifiedTime': '2025-01-01T00:00:00Z'}
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = ImageManifest(str(tmp_path / "manifest.sqlite3"))
+    yield manifest
+    manifest.conn.close()
+
+def test_sync_folder_applies_only_differences(manifest):
+    files = [drive_file(f"img{i}") for i in range(5)] + [drive_file("notlar", name="notlar.txt", mime_type='text/plain')]
+    assert manifest.sync_folder("F", files) == (6, 0)
+    assert manifest.count_images("F") == 5
+    # Değişmeyen liste hiçbir satıra dokunmaz
+    assert manifest.sync_folder("F", files) == (0, 0)
+    
+    manifest.conn.execute("UPDATE images SET local_path = 'yerel', width = 8 WHERE drive_id IN ('img0', 'img1')")
+    files = [drive_file("img0", md5="m2")] + files[1:4] + [drive_file("img9")]
+    assert manifest.sync_folder("F", files) == (2, 2)
+    
+    rows = dict(manifest.conn.execute("SELECT drive_id, local_path FROM images WHERE folder_id = 'F'"))
+    assert sorted(rows) == ["img0", "img1", "img2", "img3", "img9"]
+    # Sürümü değişen dosyanın yerel kopyası geçersiz, değişmeyeninki korunur
+    assert rows["img0"] is None and rows["img1"] == "yerel"
+
+def test_folders_are_synced_independently(manifest):
+    manifest.sync_folder("A", [drive_file("a1"), drive_file("a2")])
+    manifest.sync_folder("B", [drive_file("b1")])
+    assert manifest.sync_folder("A", [drive_file("a1")]) == (0, 1)
+    assert (manifest.count_images("A"), manifest.count_images("B")) == (1, 1)
+
+def test_sample_excludes_seen_images_per_radiologist_and_test(manifest):
+    manifest.sync_folder("F", [drive_file(f"img{i}") for i in range(6)]
+                         + [drive_file("notlar", name="notlar.txt", mime_type='text/plain')])
+    for i in range(4):
+        manifest.mark_seen("R1", "vtt", f"img{i}")
+    manifest.mark_seen("R1", "vtt", "img0")
+    
+    sample = manifest.sample("F", 10, radiologist_id="R1", test_type="vtt")
+    assert sorted(f['id'] for f in sample) == ["img4", "img5"]
+    assert set(sample[0]) == {'id', 'name', 'mimeType', 'size', 'md5Checksum', 'modifiedTime', 'localPath'}
+    
+    # Başka test türü veya radyolog etkilenmez; yalnızca desteklenen görüntüler örneklenir
+    assert len(manifest.sample("F", 10, radiologist_id="R1", test_type="apa")) == 6
+    assert len(manifest.sample("F", 10, radiologist_id="R2", test_type="vtt")) == 6
+    assert len(manifest.sample("F", 3)) == 3
+
+def test_record_local_file_stores_dimensions(manifest, tmp_path):
+    from PIL import Image
+    
+    path = str(tmp_path / "img0.png")
+    Image.new('L', (12, 7)).save(path)
+    manifest.sync_folder("F", [drive_file("img0")])
+    manifest.record_local_file("img0", path)
+    
+    assert manifest.conn.execute("SELECT local_path, width, height FROM images").fetchone() == (path, 12, 7)
+    assert manifest.sample("F", 1)[0]['localPath'] == path
+
+def image(drive_id, true_type=SYNTHETIC):
+    return {'name': f"{drive_id}.png", 'drive_id': drive_id, 'true_type': true_type}
+
+def record_vtt(manifest, drive_id, answers, true_type=SYNTHETIC, response_time=None):
+    for answer in answers:
+        img = image(drive_id, true_type)
+        manifest.record_result(img, build_vtt_result("R1", img, answer, response_time=response_time))
+
+def test_vtt_results_accumulate(manifest):
+    record_vtt(manifest, "s1", [REAL, REAL, SYNTHETIC], response_time=2.0)
+    record_vtt(manifest, "s1", [REAL], response_time=float('nan'))
+    record_vtt(manifest, "s1", [SYNTHETIC])
+    
+    [stats] = manifest.image_stats()
+    assert (stats['vtt_shown'], stats['judged_real'], stats['apa_rated']) == (5, 3, 0)
+    assert stats['judged_real_rate'] == pytest.approx(0.6)
+    # Ölçülemeyen süreler (None/NaN) ortalamaya katılmaz
+    assert stats['mean_response_time'] == pytest.approx(2.0)
+    assert stats[feature_key(APA_FEATURES[0])] is None
+
+def test_apa_results_accumulate_feature_means(manifest):
+    img = image("r1", REAL)
+    for score in (2, 4, 5):
+        ratings = {feature: score for feature in APA_FEATURES}
+        manifest.record_result(img, build_apa_result("R1", img, 1, ratings, response_time=score))
+    
+    [stats] = manifest.image_stats(true_type=REAL)
+    assert stats['apa_rated'] == 3 and stats['vtt_shown'] == 0
+    assert stats['judged_real_rate'] is None
+    assert stats['mean_response_time'] == pytest.approx(11 / 3)
+    for feature in APA_FEATURES:
+        assert stats[feature_key(feature)] == pytest.approx(11 / 3)
+    assert manifest.image_stats(true_type=SYNTHETIC) == []
+
+def test_top_images_ranking(manifest):
+    record_vtt(manifest, "s1", [REAL, SYNTHETIC])  # 0.5
+    record_vtt(manifest, "s2", [REAL, REAL, REAL, SYNTHETIC])  # 0.75
+    record_vtt(manifest, "s3", [REAL, SYNTHETIC, SYNTHETIC, SYNTHETIC])  # 0.25
+    record_vtt(manifest, "s4", [REAL])  # 1.0, tek gösterim
+    record_vtt(manifest, "s5", [REAL, REAL, SYNTHETIC, SYNTHETIC])  # 0.5, daha çok gösterim
+    record_vtt(manifest, "r1", [REAL, REAL], true_type=REAL)
+    
+    def ranked(**kwargs):
+        return [stats['drive_id'] for stats in manifest.top_images(**kwargs)]
+    
+    assert ranked(true_type=SYNTHETIC) == ["s4", "s2", "s5", "s1", "s3"]
+    assert ranked(true_type=SYNTHETIC, min_count=2, k=3) == ["s2", "s5", "s1"]
+    assert ranked(true_type=SYNTHETIC, min_count=2, ascending=True, k=2) == ["s3", "s5"]
+    assert ranked(metric='vtt_shown', k=1) == ["s2"]
+    assert ranked(metric='apa_rated') == []
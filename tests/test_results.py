@@ -0,0 +1,187 @@
+"""Sütunlu sonuç deposu (core/results.py) testleri"""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.config import APA_FEATURES
+from core.results import (
+    RESULT_SCHEMA_VERSION,
+    ResultStore,
+    arrow_schema,
+    read_result_files,
+    read_results,
+    read_results_by_file,
+    read_results_dataset,
+)
+from core.scoring import REAL, SYNTHETIC, build_apa_result, build_vtt_result
+
+def vtt_records(count, radiologists=("R1", "R2")):
+    records = []
+    for i in range(count):
+        image = {'name': f"img{i % 7}.png", 'drive_id': f"id{i % 7}", 'true_type': REAL if i % 3 else SYNTHETIC}
+        record = build_vtt_result(radiologists[i % len(radiologists)], image, REAL if i % 2 else SYNTHETIC,
+                                  response_time=0.25 * i if i % 4 else None, wait_time=0.5)
+        record['timestamp'] = f"2025-01-01 10:{i // 60:02d}:{i % 60:02d}"
+        records.append(record)
+    return records
+
+def apa_records(count):
+    records = []
+    for i in range(count):
+        image = {'name': f"img{i}.png", 'drive_id': f"id{i}"}
+        ratings = {feature: (i + j) % 5 + 1 for j, feature in enumerate(APA_FEATURES)}
+        record = build_apa_result("R1", image, i + 1, ratings, response_time=1.0 + i)
+        record['timestamp'] = f"2025-01-01 10:00:{i:02d}"
+        records.append(record)
+    return records
+
+def test_store_grows_by_doubling_and_keeps_rows():
+    records = vtt_records(9)
+    store = ResultStore('vtt', capacity=2)
+    capacities = []
+    for record in records:
+        store.append(record)
+        capacities.append(store.capacity)
+    
+    assert capacities == [2, 2, 4, 4, 8, 8, 8, 8, 16]
+    assert len(store) == 9
+    assert list(store) == records
+
+def test_grow_leaves_previous_arrays_for_readers():
+    store = ResultStore('vtt', capacity=2)
+    for record in vtt_records(2):
+        store.append(record)
+    snapshot = store.column('response_time')
+    store.append(vtt_records(3)[2])
+    assert store.capacity == 4
+    assert not np.shares_memory(snapshot, store.columns['response_time'])
+    np.testing.assert_array_equal(snapshot, store.column('response_time')[:2])
+
+def test_strings_are_interned_once():
+    records = vtt_records(30)
+    store = ResultStore.from_records('vtt', records)
+    
+    assert store.strings['radiologist_id'] == ["R1", "R2"]
+    assert len(store.strings['image_path']) == 7
+    codes = store.column('image_path')
+    assert codes.dtype == np.int32
+    assert [store.strings['image_path'][code] for code in codes] == [r['image_path'] for r in records]
+    assert list(store) == records
+
+def test_missing_durations_round_trip_as_none():
+    record = vtt_records(1)[0]
+    del record['response_time'], record['wait_time']
+    store = ResultStore.from_records('vtt', [record])
+    decoded = next(iter(store))
+    assert decoded['response_time'] is None and decoded['wait_time'] is None
+
+def test_to_frame_matches_records():
+    for test_type, records in (('vtt', vtt_records(20)), ('apa', apa_records(12))):
+        store = ResultStore.from_records(test_type, records)
+        frame = store.to_frame()
+        expected = pd.DataFrame(records)
+        
+        assert list(frame.columns) == [name for name, _ in store.schema]
+        for name in frame.columns:
+            if name == 'timestamp':
+                assert list(frame[name].astype(str)) == list(expected[name])
+            elif name in ('response_time', 'wait_time'):
+                np.testing.assert_allclose(frame[name].to_numpy(dtype=float),
+                                           expected[name].to_numpy(dtype=float), equal_nan=True)
+            else:
+                assert list(frame[name]) == list(expected[name])
+
+def test_digest_depends_only_on_content():
+    records = vtt_records(10)
+    first = ResultStore.from_records('vtt', records)
+    second = ResultStore('vtt', capacity=1)
+    for record in records:
+        second.append(record)
+    assert first.digest() == second.digest()
+    
+    second.append(vtt_records(11)[10])
+    assert first.digest() != second.digest()
+
+def test_arrow_table_uses_fixed_schema():
+    for test_type, records in (('vtt', vtt_records(5)), ('apa', apa_records(5))):
+        table = ResultStore.from_records(test_type, records).to_arrow()
+        assert table.schema.equals(arrow_schema(test_type), check_metadata=True)
+        assert table.schema.metadata[b'schema_version'] == RESULT_SCHEMA_VERSION.encode()
+    
+    # Ölçülemeyen süreler Parquet'te NaN değil null olarak yazılır
+    table = ResultStore.from_records('vtt', vtt_records(5)).to_arrow()
+    assert table.column('response_time').null_count == 2
+
+def test_parquet_round_trip(tmp_path):
+    store = ResultStore.from_records('vtt', vtt_records(20))
+    path = str(tmp_path / "vtt_sonuclari_R1.parquet")
+    store.to_parquet(path)
+    
+    # Parquet saniye çözünürlüklü zaman damgasını ms olarak saklar; okurken şemaya dönüştürülür
+    assert pq.read_schema(path).names == arrow_schema('vtt').names
+    assert pq.read_schema(path).metadata == arrow_schema('vtt').metadata
+    expected = store.to_frame()
+    for frame in (read_results(path), read_results_dataset([path], 'vtt')):
+        assert list(frame.columns) == list(expected.columns)
+        for name in expected.columns:
+            if name in ('response_time', 'wait_time'):
+                np.testing.assert_allclose(frame[name].to_numpy(dtype=float),
+                                           expected[name].to_numpy(dtype=float), equal_nan=True)
+            else:
+                assert list(frame[name].astype(str)) == list(expected[name].astype(str))
+    
+    assert pq.read_table(path, schema=arrow_schema('vtt')).equals(store.to_arrow())
+    assert ResultStore.from_records('vtt', []).to_parquet_bytes()
+
+def test_read_results_by_file_splits_one_scan(tmp_path):
+    paths = []
+    for i, radiologist in enumerate(("R1", "R2", "R3")):
+        path = str(tmp_path / f"vtt_sonuclari_{radiologist}.parquet")
+        ResultStore.from_records('vtt', vtt_records(3 + i, radiologists=(radiologist,))).to_parquet(path)
+        paths.append(path)
+    ResultStore('vtt').to_parquet(str(tmp_path / "bos.parquet"))
+    
+    frames = read_results_by_file(paths + [str(tmp_path / "bos.parquet")], 'vtt',
+                                  columns=['radiologist_id', 'correct'])
+    
+    assert sorted(frames) == sorted(os.path.abspath(path) for path in paths)
+    for i, path in enumerate(paths):
+        frame = frames[os.path.abspath(path)]
+        assert list(frame.columns) == ['radiologist_id', 'correct']
+        assert len(frame) == 3 + i
+        assert set(frame['radiologist_id']) == {f"R{i + 1}"}
+
+def test_read_result_files_mixes_csv_and_parquet(tmp_path):
+    csv_path = str(tmp_path / "vtt_sonuclari_R1.csv")
+    parquet_paths = [str(tmp_path / f"vtt_sonuclari_R{i}.parquet") for i in (2, 3)]
+    ResultStore.from_records('vtt', vtt_records(4, radiologists=("R1",))).to_csv(csv_path)
+    for i, path in enumerate(parquet_paths):
+        ResultStore.from_records('vtt', vtt_records(2 + i, radiologists=(f"R{i + 2}",))).to_parquet(path)
+    
+    frames = read_result_files([csv_path] + parquet_paths, 'vtt', columns=['radiologist_id', 'correct'])
+    
+    # CSV ayrı, Parquet dosyaları tek bir birleşik tablo olarak döner
+    assert [len(frame) for frame in frames] == [4, 5]
+    assert sorted(set(frames[1]['radiologist_id'])) == ["R2", "R3"]
+
+def test_schema_version_1_files_load_with_empty_durations(tmp_path):
+    current = arrow_schema('vtt')
+    version_1 = pa.schema([field for field in current if field.name not in ('response_time', 'wait_time')],
+                          metadata={'test_type': 'vtt', 'schema_version': '1'})
+    table = ResultStore.from_records('vtt', vtt_records(3)).to_arrow()
+    old_path = str(tmp_path / "vtt_sonuclari_eski.parquet")
+    pq.write_table(table.select(version_1.names).replace_schema_metadata(version_1.metadata), old_path)
+    new_path = str(tmp_path / "vtt_sonuclari_yeni.parquet")
+    ResultStore.from_records('vtt', vtt_records(2)).to_parquet(new_path)
+    
+    frame = read_results_dataset([old_path, new_path], 'vtt')
+    assert list(frame.columns) == current.names
+    assert len(frame) == 5
+    
+    frames = read_results_by_file([old_path, new_path], 'vtt', columns=['correct', 'response_time'])
+    old = frames[os.path.abspath(old_path)]
+    assert old['response_time'].isna().all()
+    assert frames[os.path.abspath(new_path)]['response_time'].notna().any()
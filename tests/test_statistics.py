@@ -0,0 +1,145 @@
+"""Güven aralıkları ve uyum metrikleri için referans değer testleri
+
+Referans değerler bağımsız uygulamalardan alınmıştır (testler bu paketleri
+gerektirmez): Clopper-Pearson için scipy.stats.binomtest(...).proportion_ci(
+method='exact'), ağırlıklı kappa için sklearn.metrics.cohen_kappa_score, Fleiss'
+kappa için statsmodels.stats.inter_rater.fleiss_kappa, Krippendorff's alpha için
+Krippendorff (2011) "Computing Krippendorff's Alpha-Reliability" örneği ve
+krippendorff paketi. Bootstrap aralıkları, aynı yeniden örnekleme ağırlıklarıyla
+örneklem başına yeniden hesaplanan (döngülü) sonuçlarla karşılaştırılır.
+"""
+import numpy as np
+import pytest
+
+from core.agreement import fleiss_kappa, krippendorff_alpha_ordinal, pairwise_weighted_kappa
+from core.confidence import (
+    agreement_confidence_intervals,
+    bootstrap_weights,
+    clopper_pearson_interval,
+    mean_confidence_intervals,
+    percentile_interval,
+    vtt_confidence_intervals,
+    weighted_kappa_interval,
+)
+
+RESAMPLES = 200
+
+# İki değerlendiricinin 1-5 puanları; 0 eksik puan (ortak 12 görüntü)
+RATER_A = np.array([1, 2, 3, 3, 4, 5, 2, 1, 4, 3, 0, 5, 2, 3], dtype=np.uint8)
+RATER_B = np.array([1, 3, 3, 2, 4, 4, 2, 2, 5, 3, 4, 0, 1, 3], dtype=np.uint8)
+
+# Dört değerlendirici, 14 görüntü, eksiksiz
+COMPLETE_RATINGS = np.array([
+    [1, 2, 3, 3, 2, 1, 4, 1, 2, 5, 1, 3, 2, 4],
+    [1, 2, 3, 3, 2, 2, 4, 1, 2, 5, 1, 3, 3, 4],
+    [2, 3, 3, 3, 2, 3, 4, 2, 2, 5, 1, 4, 2, 5],
+    [1, 2, 3, 3, 2, 4, 4, 1, 2, 5, 2, 3, 2, 4],
+], dtype=np.uint8)
+
+# Krippendorff (2011) örneği: 4 gözlemci, 12 birim, eksik veriyle
+KRIPPENDORFF_EXAMPLE = np.array([
+    [1, 2, 3, 3, 2, 1, 4, 1, 2, 0, 0, 0],
+    [1, 2, 3, 3, 2, 2, 4, 1, 2, 5, 0, 3],
+    [0, 3, 3, 3, 2, 3, 4, 2, 2, 5, 1, 0],
+    [1, 2, 3, 3, 2, 4, 4, 1, 2, 5, 1, 0],
+], dtype=np.uint8)
+
+def resampled_indices(n, n_resamples=RESAMPLES):
+    """bootstrap_weights ağırlıklarını örneklem başına indeks listelerine çevir"""
+    weights = np.concatenate(list(bootstrap_weights(n, n_resamples)))
+    return [np.repeat(np.arange(n), row.astype(np.int64)) for row in weights]
+
+@pytest.mark.parametrize("successes, trials, confidence, expected", [
+    (7, 20, 0.95, (0.1539092047845412, 0.5921885345328283)),
+    (0, 10, 0.95, (0.0, 0.30849710781876294)),
+    (10, 10, 0.95, (0.6915028921812371, 1.0)),
+    (45, 50, 0.95, (0.7818646335657977, 0.9667249064109785)),
+    (1, 3, 0.95, (0.008403758659612647, 0.9057006759492866)),
+    (30, 120, 0.90, (0.18605590531658067, 0.3234634126839933)),
+])
+def test_clopper_pearson_matches_reference(successes, trials, confidence, expected):
+    assert clopper_pearson_interval(successes, trials, confidence) == pytest.approx(expected, abs=1e-9)
+
+def test_clopper_pearson_without_trials_is_nan():
+    assert all(np.isnan(clopper_pearson_interval(0, 0)))
+
+@pytest.mark.parametrize("weights, expected", [
+    ('linear', 0.6129032258064516),
+    ('quadratic', 0.8153846153846154),
+    ('nominal', 0.34545454545454546),
+])
+def test_weighted_kappa_matches_reference(weights, expected):
+    kappa = pairwise_weighted_kappa(np.vstack([RATER_A, RATER_B]), weights=weights)
+    assert kappa[0, 1] == pytest.approx(expected, abs=1e-12)
+    assert kappa[1, 0] == pytest.approx(expected, abs=1e-12)
+
+def test_fleiss_kappa_matches_reference():
+    assert fleiss_kappa(COMPLETE_RATINGS) == pytest.approx(0.5817427385892117, abs=1e-12)
+
+def test_krippendorff_alpha_ordinal_matches_published_example():
+    # Krippendorff (2011): ordinal alpha = 0.815
+    assert krippendorff_alpha_ordinal(KRIPPENDORFF_EXAMPLE) == pytest.approx(0.8153875037548814, abs=1e-12)
+    assert krippendorff_alpha_ordinal(COMPLETE_RATINGS) == pytest.approx(0.8143402415631903, abs=1e-12)
+
+def test_agreement_metrics_without_pairable_items_are_nan():
+    single = np.array([[1, 0, 3], [0, 2, 0]], dtype=np.uint8)
+    assert np.isnan(fleiss_kappa(single))
+    assert np.isnan(krippendorff_alpha_ordinal(single))
+
+def test_bootstrap_weights_are_resample_counts_and_seeded():
+    weights = np.concatenate(list(bootstrap_weights(17, RESAMPLES, seed=3)))
+    assert weights.shape == (RESAMPLES, 17)
+    assert np.all(weights.sum(axis=1) == 17)
+    assert np.array_equal(weights, np.concatenate(list(bootstrap_weights(17, RESAMPLES, seed=3))))
+    assert not np.array_equal(weights, np.concatenate(list(bootstrap_weights(17, RESAMPLES, seed=4))))
+    # Parçalara bölmek örneklemeleri değiştirmez, yalnızca bellek kullanımını sınırlar
+    chunked = np.concatenate(list(bootstrap_weights(17, RESAMPLES, seed=3, chunk_elements=17 * 7)))
+    assert chunked.shape == weights.shape
+    assert np.all(chunked.sum(axis=1) == 17)
+
+def test_mean_intervals_match_naive_bootstrap():
+    scores = np.random.default_rng(0).integers(1, 6, size=(40, 3)).astype(np.float64)
+    intervals = mean_confidence_intervals(scores, n_resamples=RESAMPLES)
+    
+    naive = np.array([scores[idx].mean(axis=0) for idx in resampled_indices(len(scores))])
+    low, high = percentile_interval(naive)
+    for j, interval in enumerate(intervals):
+        assert interval['estimate'] == pytest.approx(scores[:, j].mean())
+        assert interval['bootstrap'] == pytest.approx((low[j], high[j]))
+
+def test_vtt_intervals_use_exact_binomial_and_naive_bootstrap():
+    rng = np.random.default_rng(1)
+    true_real = rng.random(60) < 0.5
+    classified_real = np.where(rng.random(60) < 0.7, true_real, ~true_real)
+    intervals = vtt_confidence_intervals(true_real, classified_real, n_resamples=RESAMPLES)
+    
+    correct = int((true_real == classified_real).sum())
+    assert intervals['accuracy']['estimate'] == pytest.approx(correct / 60)
+    assert intervals['accuracy']['exact'] == clopper_pearson_interval(correct, 60)
+    
+    naive = [(true_real[idx] == classified_real[idx]).mean() for idx in resampled_indices(60)]
+    assert intervals['accuracy']['bootstrap'] == pytest.approx(tuple(percentile_interval(np.array(naive))))
+
+def test_weighted_kappa_interval_matches_naive_bootstrap():
+    both = (RATER_A > 0) & (RATER_B > 0)
+    a, b = RATER_A[both], RATER_B[both]
+    interval = weighted_kappa_interval(RATER_A, RATER_B, n_resamples=RESAMPLES)
+    
+    assert interval['estimate'] == pytest.approx(0.6129032258064516)
+    naive = [pairwise_weighted_kappa(np.vstack([a[idx], b[idx]]))[0, 1] for idx in resampled_indices(len(a))]
+    assert interval['bootstrap'] == pytest.approx(tuple(percentile_interval(np.array(naive))))
+
+def test_agreement_intervals_match_naive_bootstrap():
+    ratings = np.stack([KRIPPENDORFF_EXAMPLE, COMPLETE_RATINGS[:, :12]])
+    intervals = agreement_confidence_intervals(ratings, n_resamples=RESAMPLES)
+    
+    for f, interval in enumerate(intervals):
+        assert interval['fleiss_kappa']['estimate'] == pytest.approx(fleiss_kappa(ratings[f]))
+        assert interval['krippendorff_alpha']['estimate'] == pytest.approx(krippendorff_alpha_ordinal(ratings[f]))
+        
+        # Yeniden örnekleme birimi görüntüdür: seçilen sütunlarla metrikler yeniden hesaplanır
+        indices = resampled_indices(ratings.shape[2])
+        naive_fleiss = np.array([fleiss_kappa(ratings[f][:, idx]) for idx in indices])
+        naive_alpha = np.array([krippendorff_alpha_ordinal(ratings[f][:, idx]) for idx in indices])
+        assert interval['fleiss_kappa']['bootstrap'] == pytest.approx(tuple(percentile_interval(naive_fleiss)))
+        assert interval['krippendorff_alpha']['bootstrap'] == pytest.approx(tuple(percentile_interval(naive_alpha)))
@@ -0,0 +1,127 @@
+"""Yerel ve S3 depolama arka uçları (core/storage.py) testleri"""
+import os
+import time
+
+import pytest
+
+import core.storage
+from core.storage import LocalStorage, S3Storage, download_file_with_retry, error_status, is_permanent_error
+from fake_drive import make_png
+from fake_s3 import FakeS3Client
+
+@pytest.fixture
+def local(tmp_path):
+    root = tmp_path / "depo"
+    (root / "gercek" / "alt").mkdir(parents=True)
+    (root / "gercek" / "img1.png").write_bytes(make_png(1, 16))
+    (root / "gercek" / ".gizli.png").write_bytes(b"x")
+    (root / "sirli.txt").write_text("kök dışı sayılmaz")
+    return LocalStorage(str(root))
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "kaynak.csv"
+    path.write_text("a,b\n1,2\n")
+    return str(path)
+
+@pytest.mark.parametrize("file_id", ["../disarida.txt", "gercek/../../disarida.txt", "gercek/../..", ".."])
+def test_local_storage_rejects_ids_outside_root(local, source, file_id):
+    with pytest.raises(ValueError):
+        local.local_path(file_id)
+    with pytest.raises(ValueError):
+        local.fetch(file_id, source)
+    with pytest.raises(ValueError):
+        local.update(file_id, source)
+    with pytest.raises(ValueError):
+        local.put(file_id, "x.csv", source)
+
+def test_local_storage_lists_files_like_drive(local):
+    [file] = local.list("gercek")
+    assert file['id'] == "gercek/img1.png" and file['name'] == "img1.png"
+    assert file['mimeType'] == "image/png"
+    assert file['size'] == str(os.path.getsize(local.local_path(file['id'])))
+    assert file['modifiedTime']
+
+def test_local_images_are_read_in_place(local, tmp_path):
+    path = download_file_with_retry(local, "gercek/img1.png", "img1.png", str(tmp_path / "hedef"))
+    assert path == os.path.join(local.root, "gercek", "img1.png")
+    assert not (tmp_path / "hedef").exists()
+
+def test_local_put_and_update(local, source, tmp_path):
+    file_id = local.put("sonuclar", "r.csv", source)
+    assert file_id == "sonuclar/r.csv"
+    
+    other = tmp_path / "yeni.csv"
+    other.write_text("a,b\n3,4\n")
+    assert local.update(file_id, str(other)) == file_id
+    with open(local.local_path(file_id)) as f:
+        assert f.read() == "a,b\n3,4\n"
+    
+    # Yeniden adlandırma: yeni adla yazılır, eski dosya silinir
+    assert local.update(file_id, str(other), file_name="r2.csv") == "sonuclar/r2.csv"
+    assert [f['name'] for f in local.list("sonuclar")] == ["r2.csv"]
+
+def test_local_write_is_atomic(local, source, monkeypatch):
+    file_id = local.put("sonuclar", "r.csv", source)
+    original = open(local.local_path(file_id)).read()
+    
+    def failing_copy(src, dst):
+        with open(dst, 'w') as f:
+            f.write("yarım")
+        raise OSError("disk dolu")
+    
+    monkeypatch.setattr(core.storage.shutil, 'copyfile', failing_copy)
+    with pytest.raises(OSError):
+        local.update(file_id, source)
+    
+    with open(local.local_path(file_id)) as f:
+        assert f.read() == original
+    assert os.listdir(os.path.join(local.root, "sonuclar")) == ["r.csv"]
+
+def s3_objects():
+    objects = {f"gercek/img{i}.png": make_png(i, 16) for i in range(5)}
+    objects["gercek/alt/derin.png"] = b"x"
+    return objects
+
+def test_s3_listing_is_cached_for_ttl(source):
+    client = FakeS3Client(s3_objects(), page_size=2)
+    storage = S3Storage("kova", client=client, ttl=0.2)
+    
+    files = storage.list("gercek")
+    assert sorted(f['name'] for f in files) == [f"img{i}.png" for i in range(5)]
+    assert client.calls['list'] == 3
+    assert files[0]['md5Checksum'] and '"' not in files[0]['md5Checksum']
+    
+    storage.list("gercek/")
+    assert client.calls['list'] == 3
+    storage.list("gercek", refresh=True)
+    assert client.calls['list'] == 6
+    
+    time.sleep(0.25)
+    storage.list("gercek")
+    assert client.calls['list'] == 9
+
+def test_s3_upload_invalidates_only_its_folder(source):
+    client = FakeS3Client(s3_objects())
+    storage = S3Storage("kova", client=client, ttl=60)
+    storage.list("gercek")
+    assert storage.list("sonuclar") == []
+    
+    file_id = storage.put("sonuclar", "r.csv", source)
+    assert file_id == "sonuclar/r.csv"
+    assert [f['name'] for f in storage.list("sonuclar")] == ["r.csv"]
+    assert client.calls['list'] == 3
+    
+    assert storage.update(file_id, source, file_name="r2.csv") == "sonuclar/r2.csv"
+    assert [f['name'] for f in storage.list("sonuclar")] == ["r2.csv"]
+    assert "sonuclar/r.csv" not in client.objects
+
+def test_s3_identity_and_errors(tmp_path):
+    client = FakeS3Client(endpoint_url="http://127.0.0.1:9000")
+    storage = S3Storage("kova", client=client)
+    assert storage.identity == "s3:http://127.0.0.1:9000/kova"
+    
+    with pytest.raises(Exception) as raised:
+        storage.fetch("gercek/yok.png", str(tmp_path / "yok.png"))
+    assert error_status(raised.value) == 404
+    assert is_permanent_error(raised.value)
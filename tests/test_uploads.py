@@ -0,0 +1,231 @@
+"""Kalıcı yükleme kuyruğu (core/uploads.py) testleri
+
+Sahte bir depolama arka ucuyla çalışır; yüklenen içerik bellekte tutulur.
+"""
+import os
+import threading
+
+import pytest
+
+from core.storage import StorageBackend, error_status, is_permanent_error
+from core.uploads import UploadQueue
+
+class HttpError(Exception):
+    """Drive HttpError gibi .resp.status taşıyan hata"""
+    
+    def __init__(self, status, message=''):
+        super().__init__(f"HTTP {status} {message}")
+        self.resp = type('Response', (), {'status': status})()
+
+class FakeStorage(StorageBackend):
+    """Dosyaları bellekte tutan arka uç; errors listesindeki hatalar sırayla fırlatılır
+    
+    gate verilirse put/update içerik okunmadan önce gate açılana kadar bekler.
+    """
+    
+    kind = "fake"
+    label = "Sahte depolama"
+    
+    def __init__(self, name="A", gate=None):
+        self.name = name
+        self.files = {}
+        self.errors = []
+        self.calls = []
+        self.gate = gate
+        self.entered = threading.Event()
+        self.created = 0
+    
+    @property
+    def identity(self):
+        return f"fake:{self.name}"
+    
+    def list(self, folder_id, refresh=False):
+        return []
+    
+    def fetch(self, file_id, file_path):
+        raise NotImplementedError
+    
+    def _read(self, file_path):
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.errors:
+            raise self.errors.pop(0)
+        with open(file_path, 'rb') as f:
+            return f.read()
+    
+    def put(self, folder_id, file_name, file_path):
+        self.calls.append(('put', file_name))
+        data = self._read(file_path)
+        self.created += 1
+        file_id = f"{self.name}{self.created}"
+        self.files[file_id] = data
+        return file_id
+    
+    def update(self, file_id, file_path, file_name=None):
+        self.calls.append(('update', file_id))
+        data = self._read(file_path)
+        if file_id not in self.files:
+            raise HttpError(404, "File not found")
+        self.files[file_id] = data
+        return file_id
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+    
+    def make(**kwargs):
+        options = dict(backoff=0.01, max_backoff=0.02, poll_interval=0.02)
+        options.update(kwargs)
+        queue = UploadQueue(str(tmp_path / "kuyruk"), **options)
+        queues.append(queue)
+        return queue
+    
+    yield make
+    for queue in queues:
+        queue.stop()
+        queue.thread.join(5)
+
+def test_coalescing_during_upload_keeps_in_flight_copy(make_queue):
+    storage = FakeStorage()
+    queue = make_queue()
+    uploads = queue.attach(storage)
+    key = uploads.enqueue("F", "a.csv", data=b"1")
+    assert queue.wait_idle(5)
+    file_id = queue.file_id(key)
+    
+    # İkinci sürüm yüklenirken üçüncüsü kuyruğa alınır ve ikincinin yerini alır
+    storage.gate = threading.Event()
+    storage.entered.clear()
+    uploads.enqueue("F", "a.csv", data=b"2")
+    assert storage.entered.wait(5)
+    uploads.enqueue("F", "a.csv", data=b"3")
+    storage.gate.set()
+    assert queue.wait_idle(5)
+    
+    status = queue.status()
+    assert storage.files == {file_id: b"3"}
+    assert queue.file_id(key) == file_id
+    assert status['dropped'] == 0 and status['last_drop_error'] is None
+    assert os.listdir(queue.spool_dir) == []
+
+def test_coalescing_uploads_only_newest_revision(make_queue):
+    storage = FakeStorage(gate=threading.Event())
+    queue = make_queue()
+    uploads = queue.attach(storage)
+    key = uploads.enqueue("F", "a.csv", data=b"1")
+    assert storage.entered.wait(5)
+    
+    # İlk yükleme sürerken gelen iki sürümden yalnızca sonuncusu yüklenir
+    uploads.enqueue("F", "a.csv", data=b"2")
+    uploads.enqueue("F", "a.csv", data=b"3")
+    assert queue.is_pending(key)
+    storage.gate.set()
+    assert queue.wait_idle(5)
+    
+    assert storage.calls == [('put', "a.csv"), ('update', queue.file_id(key))]
+    assert storage.files == {queue.file_id(key): b"3"}
+    assert queue.status()['coalesced'] == 2
+    assert not queue.is_pending(key)
+
+def test_restart_resumes_pending_uploads(make_queue):
+    queue = make_queue()
+    queue.stop()
+    queue.thread.join(5)
+    storage = FakeStorage()
+    key = queue.enqueue(storage, "F", "a.csv", data=b"1")
+    assert queue.status()['pending'] == 1
+    
+    restarted = make_queue()
+    assert restarted.status()['waiting'] == 1
+    restarted.attach(FakeStorage())
+    assert restarted.wait_idle(5)
+    assert restarted.file_id(key) == "A1"
+
+def test_missing_remote_file_is_recreated(make_queue):
+    storage = FakeStorage()
+    queue = make_queue()
+    uploads = queue.attach(storage)
+    key = uploads.enqueue("F", "a.csv", data=b"1")
+    assert queue.wait_idle(5)
+    del storage.files[queue.file_id(key)]
+    
+    reported = []
+    uploads.enqueue("F", "a.csv", data=b"2", on_uploaded=reported.append)
+    assert queue.wait_idle(5)
+    
+    assert storage.files == {"A2": b"2"}
+    assert queue.file_id(key) == "A2"
+    assert reported == ["A2"]
+    assert queue.status()['dropped'] == 0
+
+def test_permanent_error_drops_the_upload(make_queue):
+    storage = FakeStorage()
+    storage.errors = [HttpError(403, "forbidden")]
+    queue = make_queue()
+    uploads = queue.attach(storage)
+    key = uploads.enqueue("F", "a.csv", data=b"1")
+    assert queue.wait_idle(5)
+    
+    status = queue.status()
+    assert status['dropped'] == 1 and status['pending'] == 0
+    assert "a.csv" in status['last_drop_error']
+    assert len(storage.calls) == 1 and storage.files == {}
+    assert os.listdir(queue.spool_dir) == []
+    
+    # Yeni içerik kuyruğa alınırsa hedef yeniden denenir
+    uploads.enqueue("F", "a.csv", data=b"2")
+    assert queue.wait_idle(5)
+    assert storage.files == {queue.file_id(key): b"2"}
+
+def test_rate_limit_is_retried(make_queue):
+    storage = FakeStorage()
+    storage.errors = [HttpError(403, "userRateLimitExceeded"), HttpError(429), HttpError(503)]
+    queue = make_queue()
+    key = queue.attach(storage).enqueue("F", "a.csv", data=b"1")
+    assert queue.wait_idle(5)
+    assert storage.files == {queue.file_id(key): b"1"}
+    assert len(storage.calls) == 4
+    assert queue.status()['dropped'] == 0
+
+def test_upload_is_dropped_after_max_attempts(make_queue):
+    storage = FakeStorage()
+    storage.errors = [OSError("bağlantı koptu")] * 10
+    queue = make_queue(max_attempts=3)
+    queue.attach(storage).enqueue("F", "a.csv", data=b"1")
+    assert queue.wait_idle(5)
+    
+    status = queue.status()
+    assert len(storage.calls) == 3
+    assert status['dropped'] == 1 and status['pending'] == 0
+    assert "3 denemede" in status['last_drop_error']
+
+def test_jobs_upload_only_to_their_storage(make_queue):
+    first, second = FakeStorage("A"), FakeStorage("B")
+    queue = make_queue()
+    queue.attach(first).enqueue("F", "a.csv", data=b"a")
+    queue.attach(second).enqueue("F", "a.csv", data=b"b")
+    assert queue.wait_idle(5)
+    assert first.files == {"A1": b"a"}
+    assert second.files == {"B1": b"b"}
+
+@pytest.mark.parametrize("error, permanent", [
+    (HttpError(400), True),
+    (HttpError(404), True),
+    (HttpError(403, "forbidden"), True),
+    (HttpError(403, "rateLimitExceeded"), False),
+    (HttpError(408), False),
+    (HttpError(429), False),
+    (HttpError(500), False),
+    (ValueError("Depolama kök dizininin dışında"), True),
+    (FileNotFoundError("kuyruk kopyası"), False),
+    (OSError("bağlantı koptu"), False),
+])
+def test_permanent_error_classification(error, permanent):
+    assert is_permanent_error(error) is permanent
+
+def test_s3_client_error_status():
+    error = Exception("NoSuchKey")
+    error.response = {'ResponseMetadata': {'HTTPStatusCode': 404}}
+    assert error_status(error) == 404
+    assert is_permanent_error(error)
@@ -0,0 +1,52 @@
+"""Süreç havuzu (core/workers.py) testleri"""
+import os
+import sys
+import types
+from multiprocessing import spawn
+
+import pytest
+
+from core.workers import WorkerPool, WorkerPoolBusy
+
+@pytest.fixture
+def script_main(tmp_path, monkeypatch):
+    """Streamlit gibi bir betiği __main__ olarak kur; betik çalışırsa işaret dosyası yazar"""
+    marker = tmp_path / "betik_calisti"
+    script = tmp_path / "uygulama.py"
+    script.write_text(f"open({str(marker)!r}, 'w').close()\n")
+    module = types.ModuleType('__main__')
+    module.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, '__main__', module)
+    return module, marker
+
+def test_workers_do_not_rerun_the_main_script(script_main):
+    module, marker = script_main
+    pool = WorkerPool(max_workers=2, max_pending=2)
+    try:
+        pids = {pool.run(os.getpid) for _ in range(4)}
+    finally:
+        pool.shutdown()
+    
+    assert os.getpid() not in pids
+    assert not marker.exists()
+    # __main__ havuz kurulurken değiştirilmez
+    assert sys.modules['__main__'] is module
+
+def test_other_spawned_processes_keep_main_module(script_main):
+    module, _ = script_main
+    data = spawn.get_preparation_data("SpawnProcess-1")
+    assert data['init_main_from_path'] == module.__file__
+    assert 'init_main_from_path' not in spawn.get_preparation_data("cpu-worker-1")
+
+def test_inline_pool_runs_in_caller():
+    assert WorkerPool(max_workers=0).run(os.getpid) == os.getpid()
+
+def test_admission_limit_rejects_when_full():
+    pool = WorkerPool(max_workers=1, max_pending=0, admission_timeout=0.01)
+    assert pool.slots.acquire(timeout=1)
+    try:
+        with pytest.raises(WorkerPoolBusy):
+            pool.run(os.getpid)
+    finally:
+        pool.slots.release()
+    assert pool.status()['rejected'] == 1